@@ -1,7 +1,85 @@
 from django.contrib import admin
+from django.db.models import ExpressionWrapper, OuterRef, Subquery, Sum, Value
+
 from .models import *
+from .totals import add_totals, get_item_totals, rebuild_totals
+
 
 admin.site.register(Customer)
-admin.site.register(Product)
-admin.site.register(Order)
-admin.site.register(Order_item)
+
+
+@admin.register(Product)
+class ProductAdmin(admin.ModelAdmin):
+    def save_model(self, request, obj, form, change):
+        old_weight = Product.objects.get(pk=obj.pk).weight if change else None
+        super().save_model(request, obj, form, change)
+        if change and obj.weight != old_weight:
+            # Every order holding the product gains the weight difference
+            # times the quantity it holds.
+            quantities = (
+                Order_item.objects.filter(order=OuterRef("pk"), product=obj)
+                .values("order")
+                .annotate(quantity=Sum("quantity"))
+                .values("quantity")
+            )
+            add_totals(
+                Order.objects.filter(id__in=obj.order_item_set.values("order_id")),
+                ExpressionWrapper(
+                    Value(obj.weight - old_weight) * Subquery(quantities),
+                    output_field=Order._meta.get_field("total_weight"),
+                ),
+                0,
+            )
+
+    def delete_model(self, request, obj):
+        order_ids = list(obj.order_item_set.values_list("order_id", flat=True))
+        super().delete_model(request, obj)
+        rebuild_totals(Order.objects.filter(id__in=order_ids))
+
+    def delete_queryset(self, request, queryset):
+        order_ids = list(
+            Order_item.objects.filter(product__in=queryset).values_list(
+                "order_id", flat=True
+            )
+        )
+        super().delete_queryset(request, queryset)
+        rebuild_totals(Order.objects.filter(id__in=order_ids))
+
+
+class Order_itemInline(admin.TabularInline):
+    model = Order_item
+    extra = 0
+
+
+@admin.register(Order)
+class OrderAdmin(admin.ModelAdmin):
+    inlines = [Order_itemInline]
+    readonly_fields = ["total_weight", "item_count"]
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        rebuild_totals(Order.objects.filter(pk=form.instance.pk))
+
+
+@admin.register(Order_item)
+class Order_itemAdmin(admin.ModelAdmin):
+    def save_model(self, request, obj, form, change):
+        old = None
+        if change:
+            old = Order_item.objects.select_related("product").get(pk=obj.pk)
+        super().save_model(request, obj, form, change)
+        if old is not None:
+            weight, count = get_item_totals([(old.product, -old.quantity)])
+            add_totals(Order.objects.filter(pk=old.order_id), weight, count)
+        weight, count = get_item_totals([(obj.product, obj.quantity)])
+        add_totals(Order.objects.filter(pk=obj.order_id), weight, count)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        weight, count = get_item_totals([(obj.product, -obj.quantity)])
+        add_totals(Order.objects.filter(pk=obj.order_id), weight, count)
+
+    def delete_queryset(self, request, queryset):
+        order_ids = list(queryset.values_list("order_id", flat=True))
+        super().delete_queryset(request, queryset)
+        rebuild_totals(Order.objects.filter(id__in=order_ids))
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class AppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app'
+
+    def ready(self):
+        from . import schema  # noqa: F401 (registers the schema check)
+        from .signals import connect_signals
+
+        connect_signals()
@@ -0,0 +1,125 @@
+import functools
+
+from django.http import HttpResponse, HttpResponseNotAllowed
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+
+from .renderers import CompactJSONRenderer
+from .utils import get_status_msg
+from .pagination import apaginate, InvalidCursor
+from .views import filter_orders
+
+from .models import (
+    Customer,
+    Product,
+    Order,
+)
+
+from .fast_serializer import (
+    FastCustomerSerializer,
+    FastProductSerializer,
+    FastOrderSerializer,
+)
+
+
+# Async variants of the list and detail reads. They are plain Django views
+# using the async ORM, so under an ASGI server a request waiting on the
+# database or a slow client does not hold a worker thread. The response
+# envelope is rendered with the same renderer as ``get_response``.
+
+
+def render_response(code_status, payload, msg, **extra):
+    content = CompactJSONRenderer().render(
+        {
+            "code": code_status,
+            "data": payload,
+            "message": msg,
+            **extra,
+        }
+    )
+    return HttpResponse(content, content_type="application/json")
+
+
+def get_only(view):
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return HttpResponseNotAllowed(["GET"])
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+async def list_response(request, queryset, serializer_class, filters=None):
+    try:
+        fieldset = serializer_class.get_fieldset(request.GET)
+    except ValidationError as exc:
+        return render_response(
+            status.HTTP_400_BAD_REQUEST, exc.detail, get_status_msg("ERROR_400")
+        )
+    queryset = serializer_class.prepare(queryset, **fieldset)
+    try:
+        rows, cursors = await apaginate(queryset, request.GET, filters)
+    except InvalidCursor as exc:
+        return render_response(
+            status.HTTP_400_BAD_REQUEST,
+            {"cursor": [str(exc)]},
+            get_status_msg("ERROR_400"),
+        )
+
+    if not rows:
+        return render_response(
+            status.HTTP_404_NOT_FOUND, [], get_status_msg("DATA_NOT_FOUND")
+        )
+
+    data = await serializer_class(rows, many=True, **fieldset).adata()
+    return render_response(
+        status.HTTP_200_OK, data, get_status_msg("RETRIEVE"), **cursors
+    )
+
+
+async def detail_response(queryset, serializer_class):
+    row = await serializer_class.prepare(queryset).afirst()
+    if not row:
+        return render_response(
+            status.HTTP_404_NOT_FOUND, {}, get_status_msg("DATA_NOT_FOUND")
+        )
+
+    data = await serializer_class([row], many=True).adata()
+    return render_response(status.HTTP_200_OK, data[0], get_status_msg("RETRIEVE"))
+
+
+@get_only
+async def customers_list(request):
+    return await list_response(request, Customer.objects.all(), FastCustomerSerializer)
+
+
+@get_only
+async def customers_detail(request, id):
+    return await detail_response(Customer.objects.filter(id=id), FastCustomerSerializer)
+
+
+@get_only
+async def products_list(request):
+    return await list_response(request, Product.objects.all(), FastProductSerializer)
+
+
+@get_only
+async def products_detail(request, id):
+    return await detail_response(Product.objects.filter(id=id), FastProductSerializer)
+
+
+@get_only
+async def orders_list(request):
+    try:
+        orders, filters = filter_orders(Order.objects.all(), request.GET)
+    except ValidationError as exc:
+        return render_response(
+            status.HTTP_400_BAD_REQUEST, exc.detail, get_status_msg("ERROR_400")
+        )
+    return await list_response(request, orders, FastOrderSerializer, filters)
+
+
+@get_only
+async def orders_detail(request, id):
+    return await detail_response(Order.objects.filter(id=id), FastOrderSerializer)
@@ -0,0 +1,207 @@
+import contextlib
+import contextvars
+import functools
+import hashlib
+import time
+
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.db.models import F
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags, quote_etag
+
+from .db import get_read_alias
+from .metrics import registry
+from .models import Customer, Product, Order, Sequence
+
+
+RESPONSE_CACHE_ALIAS = "responses"
+
+
+def get_cache():
+    return caches[RESPONSE_CACHE_ALIAS]
+
+
+def version_key(model):
+    return f"version:{model._meta.label_lower}"
+
+
+def get_versions(*models):
+    """
+    Current change version of every model. Versions are ``Sequence`` rows,
+    so every worker process sees the same ones; a model that was never
+    written is at 0.
+
+    They are read from the database the rows are read from: a lagging
+    replica reports the versions it has caught up with, so what it serves
+    is never cached under a newer version.
+    """
+    keys = [version_key(model) for model in models]
+    versions = dict(
+        Sequence.objects.using(get_read_alias())
+        .filter(name__in=keys)
+        .values_list("name", "value")
+    )
+    return [versions.get(key, 0) for key in keys]
+
+
+def get_request_versions(request, models):
+    # conditional_get and cache_response share one query per request.
+    memo = request.__dict__.setdefault("_model_versions", {})
+    if models not in memo:
+        memo[models] = get_versions(*models)
+    return memo[models]
+
+
+# Models to bump when the innermost coalesce_bumps block exits.
+pending_bumps = contextvars.ContextVar("pending_bumps", default=None)
+
+
+@contextlib.contextmanager
+def coalesce_bumps():
+    """
+    Bump every model written inside the block once, when it exits without
+    an error. Use it inside the ``transaction.atomic`` of a write so the
+    bumps still commit with it.
+    """
+    models = {}
+    token = pending_bumps.set(models)
+    try:
+        yield
+    finally:
+        pending_bumps.reset(token)
+    for model in models:
+        bump_version(model)
+
+
+def bump_version(model):
+    """
+    Bump the version of ``model`` in the current transaction: it commits
+    together with the write, so no process can pair the new version with
+    the old rows, nor keep serving the old ones once the write is visible.
+    """
+    models = pending_bumps.get()
+    if models is not None:
+        models[model] = None
+        return
+
+    key = version_key(model)
+    versions = Sequence.objects.using(DEFAULT_DB_ALIAS).filter(name=key)
+    if versions.update(value=F("value") + 1):
+        return
+    try:
+        with transaction.atomic(using=DEFAULT_DB_ALIAS):
+            # Start from the clock so a recreated database does not repeat
+            # versions that responses are still cached under.
+            Sequence.objects.using(DEFAULT_DB_ALIAS).create(
+                name=key, value=time.time_ns()
+            )
+    except IntegrityError:
+        # Another process created the row first.
+        versions.update(value=F("value") + 1)
+
+
+def count(result):
+    # In the metrics registry rather than the response cache: cache entries
+    # are culled, and incr is not atomic across processes on the file backend.
+    registry.inc("app_response_cache_lookups_total", (result,))
+
+
+def get_stats():
+    # Per process, like every other metric.
+    return {
+        result: registry.get("app_response_cache_lookups_total", (result,))
+        for result in ("hits", "misses")
+    }
+
+
+def get_digest(request, versions):
+    # No process or database name: the versions come with the rows (see
+    # get_versions), so every worker and every caught up replica gives the
+    # same digest, and so the same ETag, for the same list.
+    raw = f"{request.accepted_media_type}:{request.get_full_path()}:{versions}"
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def response_key(request, versions):
+    return "response:" + get_digest(request, versions)
+
+
+def etag_matches(request, etag):
+    # Compressed responses carry the weak form: compare weakly.
+    tags = [
+        tag.removeprefix("W/")
+        for tag in parse_etags(request.headers.get("If-None-Match", ""))
+    ]
+    return etag in tags or "*" in tags
+
+
+def conditional_get(*models):
+    """
+    Tag successful ``get`` responses with an ETag made from the change
+    versions of ``models`` and answer a matching ``If-None-Match`` with a 304
+    before the view runs, so neither the query nor the serializer is paid.
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            etag = quote_etag(
+                get_digest(request, get_request_versions(request, models))
+            )
+            if etag_matches(request, etag):
+                return HttpResponseNotModified(headers={"ETag": etag})
+
+            response = method(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                response["ETag"] = etag
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def cache_response(*models):
+    """
+    Cache the rendered bytes of a successful ``get`` under a key that carries
+    the change versions of ``models``; any write to one of them makes the
+    entry unreachable.
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            renderer = request.accepted_renderer
+            if renderer.format != "json":
+                return method(self, request, *args, **kwargs)
+
+            cache = get_cache()
+            key = response_key(request, get_request_versions(request, models))
+            content = cache.get(key)
+            if content is not None:
+                count("hits")
+                return HttpResponse(content, content_type=renderer.media_type)
+
+            count("misses")
+            response = method(self, request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+            content = renderer.render(
+                response.data, request.accepted_media_type, self.get_renderer_context()
+            )
+            cache.set(key, content)
+            return HttpResponse(content, content_type=renderer.media_type)
+
+        return wrapper
+
+    return decorator
+
+
+def bump_on_change(sender, **kwargs):
+    if sender in (Customer, Product, Order):
+        bump_version(sender)
+    else:
+        # Order items are part of the order representation.
+        bump_version(Order)
@@ -0,0 +1,102 @@
+import contextvars
+import functools
+import random
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Run ``settings.SQLITE_PRAGMAS`` on every new SQLite connection."""
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for name, value in getattr(settings, "SQLITE_PRAGMAS", {}).items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+# Read replicas. Only views decorated with read_from_replica read from a
+# replica; everything else, writes included, uses the primary. A client that
+# wrote gets a cookie pinning its reads to the primary for
+# REPLICA_PIN_SECONDS, so it always sees its own writes despite replica lag.
+
+PIN_COOKIE = "primary_pin"
+
+replica = contextvars.ContextVar("replica", default=None)
+
+
+def get_replicas():
+    return getattr(settings, "DATABASE_REPLICAS", [])
+
+
+def get_read_alias():
+    return replica.get() or DEFAULT_DB_ALIAS
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return get_read_alias()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Replicas get their schema from the primary.
+        return db not in get_replicas()
+
+
+def choose_replica(request):
+    replicas = get_replicas()
+    if request.method not in ("GET", "HEAD") or not replicas:
+        return None
+    if request.COOKIES.get(PIN_COOKIE):
+        return None
+    return random.choice(replicas)
+
+
+def read_from_replica(method):
+    """Run a view method's reads on a replica unless the client is pinned."""
+
+    @functools.wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        token = replica.set(choose_replica(request))
+        try:
+            return method(self, request, *args, **kwargs)
+        finally:
+            replica.reset(token)
+
+    return wrapper
+
+
+class ReplicaPinMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.pin(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.pin(request, await self.get_response(request))
+
+    def pin(self, request, response):
+        if request.method not in ("GET", "HEAD", "OPTIONS") and get_replicas():
+            response.set_cookie(
+                PIN_COOKIE,
+                "1",
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
@@ -0,0 +1,236 @@
+import functools
+
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+
+from .serializer import OrderSerializer, SalesQuerySerializer
+from .views import (
+    CustomersAPI,
+    CustomersUpdateAPI,
+    ProductsAPI,
+    OrdersAPI,
+    OrdersExportAPI,
+    OrdersBulkAPI,
+    OrdersUpdateAPI,
+    SearchAPI,
+    SalesAPI,
+)
+
+
+# Swagger documentation of the API views. It is kept out of views.py so
+# workers that never serve the docs do not import drf_yasg or build these
+# objects; document_views() attaches it when the docs are first needed.
+
+PAGINATION_PARAMETERS = [
+    openapi.Parameter(
+        "cursor",
+        openapi.IN_QUERY,
+        description="Cursor returned as next/previous by the previous page",
+        type=openapi.TYPE_STRING,
+    ),
+    openapi.Parameter(
+        "limit",
+        openapi.IN_QUERY,
+        description="Number of results per page",
+        type=openapi.TYPE_INTEGER,
+    ),
+]
+
+FIELDS_PARAMETER = openapi.Parameter(
+    "fields",
+    openapi.IN_QUERY,
+    description="Fields to return, separated by commas (default: all)",
+    type=openapi.TYPE_STRING,
+)
+
+EXPAND_PARAMETER = openapi.Parameter(
+    "expand",
+    openapi.IN_QUERY,
+    description=(
+        "customer and/or order_items.product, separated by commas: embed "
+        "the objects instead of their ids"
+    ),
+    type=openapi.TYPE_STRING,
+)
+
+ORDER_REQUEST_SCHEMA = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        "customer": openapi.Schema(type=openapi.TYPE_INTEGER),
+        "order_date": openapi.Schema(type=openapi.TYPE_STRING, format="date"),
+        "address": openapi.Schema(type=openapi.TYPE_STRING),
+        "order_items": openapi.Schema(
+            type=openapi.TYPE_ARRAY,
+            items=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    "product": openapi.Schema(type=openapi.TYPE_INTEGER),
+                    "quantity": openapi.Schema(type=openapi.TYPE_INTEGER),
+                },
+            ),
+        ),
+    },
+)
+
+ORDER_FILTER_PARAMETERS = [
+    openapi.Parameter(
+        "products",
+        openapi.IN_QUERY,
+        description="List of products separated by commas",
+        type=openapi.TYPE_STRING,
+    ),
+    openapi.Parameter(
+        "products_match",
+        openapi.IN_QUERY,
+        description="Orders with any (default) or all of the products",
+        type=openapi.TYPE_STRING,
+        enum=["any", "all"],
+    ),
+    openapi.Parameter(
+        "customer",
+        openapi.IN_QUERY,
+        description="Customer name",
+        type=openapi.TYPE_STRING,
+    ),
+    openapi.Parameter(
+        "customer_id",
+        openapi.IN_QUERY,
+        description="Customer id",
+        type=openapi.TYPE_INTEGER,
+    ),
+    openapi.Parameter(
+        "start",
+        openapi.IN_QUERY,
+        description="Earliest order date (YYYY-MM-DD)",
+        type=openapi.TYPE_STRING,
+        format=openapi.FORMAT_DATE,
+    ),
+    openapi.Parameter(
+        "end",
+        openapi.IN_QUERY,
+        description="Latest order date (YYYY-MM-DD)",
+        type=openapi.TYPE_STRING,
+        format=openapi.FORMAT_DATE,
+    ),
+    openapi.Parameter(
+        "address",
+        openapi.IN_QUERY,
+        description="Start of the address, case-sensitive",
+        type=openapi.TYPE_STRING,
+    ),
+    openapi.Parameter(
+        "min_weight",
+        openapi.IN_QUERY,
+        description="Minimum total weight of the order in kg",
+        type=openapi.TYPE_NUMBER,
+    ),
+    openapi.Parameter(
+        "max_weight",
+        openapi.IN_QUERY,
+        description="Maximum total weight of the order in kg",
+        type=openapi.TYPE_NUMBER,
+    ),
+]
+
+VIEW_DOCS = {
+    (CustomersAPI, "get"): dict(
+        manual_parameters=[*PAGINATION_PARAMETERS, FIELDS_PARAMETER]
+    ),
+    (CustomersAPI, "post"): dict(
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                "name": openapi.Schema(type=openapi.TYPE_STRING),
+                "contact_number": openapi.Schema(type=openapi.TYPE_STRING),
+                "email": openapi.Schema(type=openapi.TYPE_STRING),
+            },
+        )
+    ),
+    (CustomersUpdateAPI, "put"): dict(
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                "name": openapi.Schema(type=openapi.TYPE_STRING),
+                "contact_number": openapi.Schema(type=openapi.TYPE_STRING),
+                "email": openapi.Schema(type=openapi.TYPE_STRING),
+            },
+        )
+    ),
+    (ProductsAPI, "get"): dict(
+        manual_parameters=[*PAGINATION_PARAMETERS, FIELDS_PARAMETER]
+    ),
+    (ProductsAPI, "post"): dict(
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                "name": openapi.Schema(type=openapi.TYPE_STRING),
+                "weight": openapi.Schema(type=openapi.TYPE_STRING),
+            },
+        )
+    ),
+    (OrdersAPI, "get"): dict(
+        manual_parameters=[
+            *ORDER_FILTER_PARAMETERS,
+            *PAGINATION_PARAMETERS,
+            FIELDS_PARAMETER,
+            EXPAND_PARAMETER,
+        ],
+        responses={
+            200: openapi.Response(
+                description="List of orders", schema=OrderSerializer(many=True)
+            ),
+            404: "Not Found",
+        },
+    ),
+    (OrdersAPI, "post"): dict(request_body=ORDER_REQUEST_SCHEMA),
+    (OrdersExportAPI, "get"): dict(
+        manual_parameters=[
+            *ORDER_FILTER_PARAMETERS,
+            openapi.Parameter(
+                "output",
+                openapi.IN_QUERY,
+                description="ndjson (default) or json",
+                type=openapi.TYPE_STRING,
+            ),
+        ]
+    ),
+    (OrdersBulkAPI, "post"): dict(
+        request_body=openapi.Schema(type=openapi.TYPE_ARRAY, items=ORDER_REQUEST_SCHEMA)
+    ),
+    (OrdersUpdateAPI, "put"): dict(request_body=ORDER_REQUEST_SCHEMA),
+    (SearchAPI, "get"): dict(
+        manual_parameters=[
+            openapi.Parameter(
+                "q",
+                openapi.IN_QUERY,
+                description="Words to search for, each matched as a prefix",
+                type=openapi.TYPE_STRING,
+                required=True,
+            ),
+            openapi.Parameter(
+                "type",
+                openapi.IN_QUERY,
+                description="customers (default), products or orders",
+                type=openapi.TYPE_STRING,
+            ),
+            *PAGINATION_PARAMETERS,
+        ]
+    ),
+    (SalesAPI, "get"): dict(
+        query_serializer=SalesQuerySerializer,
+        manual_parameters=[
+            openapi.Parameter(
+                "limit",
+                openapi.IN_QUERY,
+                description="Number of top products or customers",
+                type=openapi.TYPE_INTEGER,
+            ),
+        ],
+    ),
+}
+
+
+@functools.cache
+def document_views():
+    for (view, method), overrides in VIEW_DOCS.items():
+        swagger_auto_schema(**overrides)(getattr(view, method))
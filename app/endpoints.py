@@ -0,0 +1,90 @@
+import itertools
+from datetime import date
+
+from django.urls import reverse
+
+from .models import Customer, Product, Order
+
+
+def get_requests():
+    """
+    One request factory per ``(url name, method)`` of app/urls.py, on the
+    latest customer, product and order. Every call returns ``(url, data)``;
+    writes use fresh names so they keep succeeding. Shared by the query
+    budget tests and the bench_endpoints command.
+    """
+    customer = Customer.objects.order_by("-id").first()
+    product = Product.objects.order_by("-id").first()
+    order = Order.objects.order_by("-id").first()
+    counter = itertools.count(Customer.objects.count() + Product.objects.count())
+    order_data = {
+        "customer": customer.id,
+        "order_date": date.today().isoformat(),
+        "address": "street",
+        "order_items": [{"product": product.id, "quantity": 1}],
+    }
+
+    def customer_data():
+        return {
+            "name": f"bench customer {next(counter)}",
+            "contact_number": "9999999999",
+            "email": "bench@example.com",
+        }
+
+    return {
+        ("create-customers", "get"): lambda: (reverse("create-customers"), None),
+        ("create-customers", "post"): lambda: (
+            reverse("create-customers"),
+            customer_data(),
+        ),
+        ("update-customers", "put"): lambda: (
+            reverse("update-customers", args=[customer.id]),
+            customer_data(),
+        ),
+        ("create-products", "get"): lambda: (reverse("create-products"), None),
+        ("create-products", "post"): lambda: (
+            reverse("create-products"),
+            {"name": f"bench product {next(counter)}", "weight": "1.00"},
+        ),
+        ("create-orders", "get"): lambda: (
+            reverse("create-orders") + f"?customer={customer.name}",
+            None,
+        ),
+        ("create-orders", "post"): lambda: (reverse("create-orders"), order_data),
+        ("bulk-create-orders", "post"): lambda: (
+            reverse("bulk-create-orders"),
+            [order_data] * 10,
+        ),
+        ("export-orders", "get"): lambda: (reverse("export-orders"), None),
+        ("update-orders", "put"): lambda: (
+            reverse("update-orders", args=[order.id]),
+            order_data,
+        ),
+        ("cache-stats", "get"): lambda: (reverse("cache-stats"), None),
+        ("search", "get"): lambda: (
+            reverse("search") + f"?type=orders&q={customer.name}",
+            None,
+        ),
+        ("sales-analytics", "get"): lambda: (
+            reverse("sales-analytics") + f"?start={date.today().isoformat()}",
+            None,
+        ),
+        ("async-customers", "get"): lambda: (reverse("async-customers"), None),
+        ("async-customer-detail", "get"): lambda: (
+            reverse("async-customer-detail", args=[customer.id]),
+            None,
+        ),
+        ("async-products", "get"): lambda: (reverse("async-products"), None),
+        ("async-product-detail", "get"): lambda: (
+            reverse("async-product-detail", args=[product.id]),
+            None,
+        ),
+        ("async-orders", "get"): lambda: (
+            reverse("async-orders") + f"?customer={customer.name}",
+            None,
+        ),
+        ("async-order-detail", "get"): lambda: (
+            reverse("async-order-detail", args=[order.id]),
+            None,
+        ),
+    }
@@ -0,0 +1,186 @@
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from .metrics import serializer_timer, timed_serializer
+from .models import Order_item
+from .serializer import CustomerSerializer, ProductSerializer, OrderSerializer
+
+
+def split_names(value):
+    return [name.strip() for name in (value or "").split(",") if name.strip()]
+
+
+class FastListSerializer:
+    """
+    Read-only replacement for ``serializer_class(rows, many=True).data`` that
+    works on ``.values()`` rows instead of model instances. Decimals and
+    dates are left as stored: ``CompactJSONRenderer`` encodes them like the
+    DRF fields would, so the rendered output is identical to the
+    ModelSerializer's.
+
+    ``fields`` narrows the output (and the SELECT) to some of the fields,
+    ``expand`` replaces related ids with the related objects, joined in the
+    same query.
+    """
+
+    serializer_class = None
+    # Fields that are not columns of the row, built by ``data``.
+    nested_fields = ()
+    # ?expand= name: fast serializer of the related object.
+    expandable = {}
+
+    def __init__(self, rows, many=True, fields=None, expand=()):
+        self.rows = rows
+        self.fields = self.get_fields(fields)
+        self.expand = expand
+
+    @classmethod
+    def get_all_fields(cls):
+        if "_fields" not in cls.__dict__:
+            cls._fields = [
+                name
+                for name, field in cls.serializer_class().fields.items()
+                if not isinstance(field, serializers.BaseSerializer)
+            ]
+        return cls._fields
+
+    @classmethod
+    def get_fields(cls, fields=None):
+        return [
+            name for name in cls.get_all_fields() if fields is None or name in fields
+        ]
+
+    @classmethod
+    def get_fieldset(cls, query_params):
+        """
+        ``{"fields": ..., "expand": ...}`` from the ``fields`` and ``expand``
+        query parameters; ``fields`` is None when all fields are wanted.
+        """
+        fields = split_names(query_params.get("fields")) or None
+        expand = split_names(query_params.get("expand"))
+        names = [*cls.get_all_fields(), *cls.nested_fields]
+        errors = {}
+        unknown = [name for name in fields or () if name not in names]
+        if unknown:
+            errors["fields"] = [
+                f"Unknown fields: {', '.join(unknown)}. Expected some of: "
+                f"{', '.join(names)}."
+            ]
+        unknown = [name for name in expand if name not in cls.expandable]
+        if unknown:
+            errors["expand"] = [
+                f"Unknown expansions: {', '.join(unknown)}. Expected some of: "
+                f"{', '.join(cls.expandable) or 'none'}."
+            ]
+        if errors:
+            raise ValidationError(errors)
+        return {"fields": fields, "expand": expand}
+
+    @classmethod
+    def get_columns(cls, fields=None, expand=(), prefix=""):
+        # The id is always selected: pagination and nested fields need it.
+        columns = [prefix + "id"]
+        for name in cls.get_fields(fields):
+            if name in expand:
+                related = cls.expandable[name]
+                columns += related.get_columns(prefix=f"{prefix}{name}__")
+            elif name != "id":
+                columns.append(prefix + name)
+        return columns
+
+    @classmethod
+    def prepare(cls, queryset, fields=None, expand=()):
+        return queryset.prefetch_related(None).values(*cls.get_columns(fields, expand))
+
+    @classmethod
+    def represent(cls, row, fields, expand=(), prefix=""):
+        data = {}
+        for name in fields:
+            if name in expand:
+                related = cls.expandable[name]
+                data[name] = related.represent(
+                    row, related.get_fields(), prefix=f"{prefix}{name}__"
+                )
+            else:
+                data[name] = row[prefix + name]
+        return data
+
+    def to_representation(self, row):
+        if not self.expand:
+            return {name: row[name] for name in self.fields}
+        return self.represent(row, self.fields, self.expand)
+
+    @property
+    @timed_serializer
+    def data(self):
+        return [self.to_representation(row) for row in self.rows]
+
+    async def adata(self):
+        return self.data
+
+
+class FastCustomerSerializer(FastListSerializer):
+    serializer_class = CustomerSerializer
+
+
+class FastProductSerializer(FastListSerializer):
+    serializer_class = ProductSerializer
+
+
+class FastOrderSerializer(FastListSerializer):
+    serializer_class = OrderSerializer
+    nested_fields = ("order_items",)
+    expandable = {
+        "customer": FastCustomerSerializer,
+        "order_items.product": FastProductSerializer,
+    }
+
+    def __init__(self, rows, many=True, fields=None, expand=()):
+        super().__init__(rows, many, fields, expand)
+        self.with_items = fields is None or "order_items" in fields
+        self.expand_products = "order_items.product" in expand
+
+    def get_items(self):
+        # Fetch the items of every order on the page with one query, in the
+        # same order as the prefetch.
+        columns = ["order_id", "product_id", "quantity"]
+        if self.expand_products:
+            columns += FastProductSerializer.get_columns(prefix="product__")
+        return (
+            Order_item.objects.filter(order_id__in=[row["id"] for row in self.rows])
+            .order_by("id")
+            .values(*columns)
+        )
+
+    def build(self, items):
+        product_fields = FastProductSerializer.get_fields()
+        order_items = {row["id"]: [] for row in self.rows}
+        for item in items:
+            if self.expand_products:
+                product = FastProductSerializer.represent(
+                    item, product_fields, prefix="product__"
+                )
+            else:
+                product = item["product_id"]
+            order_items[item["order_id"]].append(
+                {"product": product, "quantity": item["quantity"]}
+            )
+
+        data = []
+        for row in self.rows:
+            order = self.to_representation(row)
+            if self.with_items:
+                order["order_items"] = order_items[row["id"]]
+            data.append(order)
+        return data
+
+    @property
+    @timed_serializer
+    def data(self):
+        return self.build(self.get_items() if self.with_items else [])
+
+    async def adata(self):
+        with serializer_timer():
+            if not self.with_items:
+                return self.build([])
+            return self.build([item async for item in self.get_items()])
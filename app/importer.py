@@ -0,0 +1,141 @@
+import csv
+import json
+
+from django.db import transaction
+
+from . import search
+from .cache import bump_version
+from .models import Customer
+from .serializer import (
+    CustomerSerializer,
+    ProductSerializer,
+    OrderSerializer,
+    preload_instances,
+)
+from .utils import Generate_Order_Numbers
+
+
+def read_rows(file, format, skip=0):
+    """
+    Yield ``(row number, row)`` from a CSV file with a header line or from
+    NDJSON, after the first ``skip`` rows. A line that is not valid JSON is
+    yielded as ``None``. In CSV the ``order_items`` column of orders holds
+    the items as JSON.
+    """
+    if format == "csv":
+        rows = csv.DictReader(file)
+    else:
+        rows = (line for line in file if line.strip())
+    for number, row in enumerate(rows, 1):
+        if number <= skip:
+            continue
+        if format != "csv":
+            try:
+                row = json.loads(row)
+            except ValueError:
+                row = None
+        yield number, row
+
+
+def _invalid_row(number, row):
+    return number, row, {"non_field_errors": ["Expected a JSON object."]}
+
+
+def import_named(serializer_class, chunk):
+    """
+    Validate a chunk of customers or products and insert the valid ones with
+    one ``bulk_create``. Names taken in the database or earlier in the chunk
+    are rejected with the serializer's message, checked with one query.
+    """
+    model = serializer_class.Meta.model
+    valid, rejected = [], []
+    for number, row in chunk:
+        if not isinstance(row, dict):
+            rejected.append(_invalid_row(number, row))
+            continue
+        serializer = serializer_class(data=row)
+        if serializer.is_valid():
+            valid.append((number, row, serializer.validated_data))
+        else:
+            rejected.append((number, row, serializer.errors))
+
+    taken = set(
+        model.objects.filter(
+            name__in=[data["name"] for _, _, data in valid]
+        ).values_list("name", flat=True)
+    )
+    instances = []
+    for number, row, data in valid:
+        if data["name"] in taken:
+            message = serializer_class.unique_name_message.format(value=data["name"])
+            rejected.append((number, row, {"name": [message]}))
+            continue
+        taken.add(data["name"])
+        instances.append(model(**data))
+
+    with transaction.atomic():
+        created = model.objects.bulk_create(instances)
+        # bulk_create sends no signals: index and invalidate explicitly.
+        search.index(model, created)
+        bump_version(model)
+    return len(created), sorted(rejected, key=lambda reject: reject[0])
+
+
+def import_customers(chunk):
+    return import_named(CustomerSerializer, chunk)
+
+
+def import_products(chunk):
+    return import_named(ProductSerializer, chunk)
+
+
+def import_orders(chunk):
+    """
+    Validate a chunk of orders like the bulk endpoint does, accepting past
+    order dates, and create the valid ones in one transaction.
+    """
+    rows = []
+    rejected = []
+    for number, row in chunk:
+        if isinstance(row, dict) and isinstance(row.get("order_items"), str):
+            try:
+                row = dict(row, order_items=json.loads(row["order_items"]))
+            except ValueError:
+                rejected.append(
+                    (number, row, {"order_items": ["Expected a JSON list."]})
+                )
+                continue
+        if isinstance(row, dict):
+            rows.append((number, row))
+        else:
+            rejected.append(_invalid_row(number, row))
+
+    # Resolve the customers and products of the chunk with two queries.
+    context = {"allow_past_dates": True}
+    OrderSerializer.preload(context, [row for _, row in rows])
+    preload_instances(
+        context, Customer.objects.all(), [row.get("customer") for _, row in rows]
+    )
+
+    valid_orders = []
+    for number, row in rows:
+        serializer = OrderSerializer(data=row, context=context)
+        if serializer.is_valid():
+            valid_orders.append(serializer.validated_data)
+        else:
+            rejected.append((number, row, serializer.errors))
+
+    if valid_orders:
+        order_numbers = Generate_Order_Numbers(len(valid_orders))
+        for validated_data, order_number in zip(valid_orders, order_numbers):
+            validated_data["order_number"] = order_number
+        with transaction.atomic():
+            OrderSerializer(many=True).create(valid_orders)
+    return len(valid_orders), sorted(rejected, key=lambda reject: reject[0])
+
+
+IMPORTERS = {
+    "customers": import_customers,
+    "products": import_products,
+    "orders": import_orders,
+}
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from app.models import Order
+from app.rollups import backfill_sales, clear_sales
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the daily sales rollups from the order history, one "
+        "transaction per batch of orders. Order writes made while it runs "
+        "can be counted twice, so run it with writes stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        clear_sales()
+        last_id = 0
+        processed = 0
+        while True:
+            ids = list(
+                Order.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                backfill_sales(Order.objects.filter(id__gte=ids[0], id__lte=ids[-1]))
+            processed += len(ids)
+            last_id = ids[-1]
+
+        self.stdout.write(f"Added the items of {processed} orders to the rollups.")
@@ -0,0 +1,147 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.testing import ApplicationCommunicator
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from app.models import Order
+from app.seed import seed
+
+
+ENDPOINTS = {
+    "customers": ("create-customers", "async-customers"),
+    "products": ("create-products", "async-products"),
+    "orders": ("create-orders", "async-orders"),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the throughput of the sync list views served from a pool of "
+        "WSGI worker threads with the async views served by Django's ASGI "
+        "handler on one event loop. Every client is slow: it sends its "
+        "request over --latency ms. A WSGI worker is blocked reading it, an "
+        "ASGI connection stays open in the handler while other requests run. "
+        "Reads the configured database; --seed inserts (and commits) rows "
+        "when there are fewer."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--endpoint", choices=ENDPOINTS, default="orders")
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument(
+            "--concurrency", type=int, nargs="+", default=[1, 10, 50, 200]
+        )
+        parser.add_argument(
+            "--threads", type=int, default=8, help="WSGI worker threads"
+        )
+        parser.add_argument(
+            "--latency", type=float, default=50, help="Client latency in ms"
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def run_wsgi(self, url, requests, workers, latency):
+        local = threading.local()
+
+        def handle(_):
+            if not hasattr(local, "client"):
+                local.client = Client()
+            # The worker thread waits for the rest of the request.
+            time.sleep(latency)
+            response = local.client.get(url)
+            assert response.status_code == 200, response.status_code
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(handle, range(requests)))
+        return time.perf_counter() - started
+
+    def run_asgi(self, url, requests, concurrency, latency):
+        application = get_asgi_application()
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": url,
+            "raw_path": url.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"host", b"testserver")],
+            "client": ("127.0.0.1", 0),
+            "server": ("testserver", 80),
+        }
+
+        async def handle(slots):
+            async with slots:
+                communicator = ApplicationCommunicator(application, dict(scope))
+                # The handler holds the connection until the body is complete.
+                await communicator.send_input(
+                    {"type": "http.request", "body": b"", "more_body": True}
+                )
+                await asyncio.sleep(latency)
+                await communicator.send_input({"type": "http.request", "body": b""})
+                start = await communicator.receive_output(timeout=60)
+                assert start["status"] == 200, start["status"]
+                more_body = True
+                while more_body:
+                    body = await communicator.receive_output(timeout=60)
+                    more_body = body.get("more_body", False)
+                await communicator.wait(timeout=60)
+
+        async def run():
+            slots = asyncio.Semaphore(concurrency)
+            await asyncio.gather(*(handle(slots) for _ in range(requests)))
+
+        started = time.perf_counter()
+        asyncio.run(run())
+        return time.perf_counter() - started
+
+    def handle(self, *args, **options):
+        if options["seed"]:
+            missing = options["seed"] - Order.objects.count()
+            seed(customers=missing, products=missing, orders=missing)
+        if not Order.objects.exists():
+            raise CommandError("No orders to read, run with --seed N.")
+
+        sync_name, async_name = ENDPOINTS[options["endpoint"]]
+        requests, latency = options["requests"], options["latency"] / 1000
+
+        # Measure the views, not the response cache of the sync views: a
+        # timeout of 0 stores no responses.
+        caches = dict(
+            settings.CACHES,
+            responses={
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "bench",
+                "TIMEOUT": 0,
+            },
+        )
+        self.stdout.write(
+            f"{'clients':>8} {'wsgi req/s':>11} {'asgi req/s':>11} {'speedup':>8}"
+        )
+        with override_settings(CACHES=caches, ALLOWED_HOSTS=["testserver"]):
+            for concurrency in options["concurrency"]:
+                # A WSGI server never has more requests in flight than it
+                # has worker threads; the event loop takes them all.
+                wsgi = self.run_wsgi(
+                    reverse(sync_name),
+                    requests,
+                    min(concurrency, options["threads"]),
+                    latency,
+                )
+                asgi = self.run_asgi(
+                    reverse(async_name), requests, concurrency, latency
+                )
+                self.stdout.write(
+                    f"{concurrency:>8} {requests / wsgi:>11.1f} "
+                    f"{requests / asgi:>11.1f} {wsgi / asgi:>7.1f}x"
+                )
@@ -0,0 +1,122 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from app.fast_serializer import FastOrderSerializer
+from app.models import Order
+from app.renderers import CompactJSONRenderer
+from app.seed import seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Report bytes on the wire and CPU time per response of a few list "
+        "endpoints for each Accept-Encoding, and compare the JSON renderers "
+        "on a page of orders. Rows are inserted in a transaction that is "
+        "rolled back."
+    )
+
+    encodings = ["identity", "gzip", "deflate"]
+
+    def add_arguments(self, parser):
+        parser.add_argument("--customers", type=int, default=200)
+        parser.add_argument("--products", type=int, default=500)
+        parser.add_argument("--orders", type=int, default=2_000)
+        parser.add_argument("--requests", type=int, default=50)
+
+    def measure(self, client, url, data, encoding, requests):
+        started = time.process_time()
+        for _ in range(requests):
+            response = client.get(url, data, HTTP_ACCEPT_ENCODING=encoding)
+            content = (
+                b"".join(response.streaming_content)
+                if response.streaming
+                else response.content
+            )
+        return len(content), (time.process_time() - started) / requests * 1000
+
+    def measure_renderer(self, render, rows, requests):
+        started = time.process_time()
+        for _ in range(requests):
+            content = render(rows)
+        return len(content), (time.process_time() - started) / requests * 1000
+
+    def drf_render(self, rows):
+        # The previous read path: decimals and dates converted by the DRF
+        # fields, then rendered by DRF's JSONRenderer.
+        fields = [
+            (name, field.to_representation)
+            for name, field in FastOrderSerializer.serializer_class().fields.items()
+            if isinstance(field, (serializers.DecimalField, serializers.DateField))
+        ]
+        data = []
+        for row in rows:
+            row = dict(row)
+            for name, convert in fields:
+                if row[name] is not None:
+                    row[name] = convert(row[name])
+            data.append(row)
+        return JSONRenderer().render(data)
+
+    def run(self, options):
+        seed(
+            customers=options["customers"],
+            products=options["products"],
+            orders=options["orders"],
+        )
+        endpoints = [
+            ("create-customers", {"limit": 100}),
+            ("create-products", {"limit": 100}),
+            ("create-orders", {"limit": 100}),
+            ("export-orders", None),
+        ]
+        client = Client()
+        self.stdout.write(
+            f"{'endpoint':<18} {'encoding':<9} {'bytes':>9} {'ratio':>6} "
+            f"{'cpu ms':>7}"
+        )
+        for name, data in endpoints:
+            url = reverse(name)
+            client.get(url, data)  # warm up
+            identity = None
+            for encoding in self.encodings:
+                size, cpu_ms = self.measure(
+                    client, url, data, encoding, options["requests"]
+                )
+                identity = identity or size
+                self.stdout.write(
+                    f"{name:<18} {encoding:<9} {size:>9} {size / identity:>6.2f} "
+                    f"{cpu_ms:>7.2f}"
+                )
+
+        queryset = FastOrderSerializer.prepare(Order.objects.order_by("id"))[:100]
+        rows = FastOrderSerializer(list(queryset), many=True).data
+        self.stdout.write(f"\n{'100 orders':<30} {'bytes':>9} {'cpu ms':>7}")
+        for label, render in [
+            ("DRF fields + JSONRenderer", self.drf_render),
+            ("CompactJSONRenderer", CompactJSONRenderer().render),
+        ]:
+            size, cpu_ms = self.measure_renderer(render, rows, options["requests"])
+            self.stdout.write(f"{label:<30} {size:>9} {cpu_ms:>7.2f}")
+
+    def handle(self, *args, **options):
+        # Measure rendering and compression, not the response cache.
+        caches = dict(
+            settings.CACHES,
+            responses={
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "bench",
+                "TIMEOUT": 0,
+            },
+        )
+        with override_settings(CACHES=caches, ALLOWED_HOSTS=["testserver"]):
+            with transaction.atomic():
+                self.run(options)
+                transaction.set_rollback(True)
@@ -0,0 +1,169 @@
+import json
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from app.endpoints import get_requests
+from app.seed import seed
+
+
+def percentile(quantiles, p):
+    return round(quantiles[p - 1] * 1000, 3)
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=settings.BASE_DIR,
+        ).stdout.strip()
+    except OSError:
+        return ""
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive every endpoint through the test client on generated data and "
+        "report p50/p95/p99 latency, queries per request and peak memory. "
+        "Rows are inserted in a transaction that is rolled back. The response "
+        "cache is off unless --cache is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--customers", type=int, default=1000)
+        parser.add_argument("--products", type=int, default=1000)
+        parser.add_argument("--orders", type=int, default=10000)
+        parser.add_argument("--requests", type=int, default=50)
+        parser.add_argument(
+            "--endpoint", nargs="+", help="Only these url names (default: all)"
+        )
+        parser.add_argument("--cache", action="store_true")
+        parser.add_argument("--output", help="Write the results as JSON")
+        parser.add_argument(
+            "--compare", help="Results JSON of an earlier run to compare with"
+        )
+
+    def send(self, client, method, url, data):
+        response = getattr(client, method)(url, data, content_type="application/json")
+        if response.streaming:
+            b"".join(response.streaming_content)
+        return response
+
+    def measure(self, client, method, request, count):
+        # Latency and query counts first, then memory in a second pass so
+        # tracemalloc does not slow down the timed requests.
+        timings, queries = [], []
+        for _ in range(count):
+            url, data = request()
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = self.send(client, method, url, data)
+                timings.append(time.perf_counter() - started)
+            queries.append(len(captured))
+
+        peak = 0
+        tracemalloc.start()
+        try:
+            for _ in range(min(count, 5)):
+                url, data = request()
+                tracemalloc.reset_peak()
+                current = tracemalloc.get_traced_memory()[0]
+                self.send(client, method, url, data)
+                peak = max(peak, tracemalloc.get_traced_memory()[1] - current)
+        finally:
+            tracemalloc.stop()
+
+        quantiles = statistics.quantiles(timings, n=100, method="inclusive")
+        return {
+            "status": response.status_code,
+            "p50_ms": percentile(quantiles, 50),
+            "p95_ms": percentile(quantiles, 95),
+            "p99_ms": percentile(quantiles, 99),
+            "mean_ms": round(statistics.fmean(timings) * 1000, 3),
+            "queries": max(queries),
+            "peak_memory_kb": round(peak / 1024, 1),
+        }
+
+    def run(self, options):
+        seed(
+            customers=options["customers"],
+            products=options["products"],
+            orders=options["orders"],
+        )
+        requests = get_requests()
+        selected = options["endpoint"]
+        if selected:
+            unknown = set(selected) - {name for name, _ in requests}
+            if unknown:
+                raise CommandError(f"Unknown url names: {', '.join(sorted(unknown))}")
+
+        client = Client()
+        results = {}
+        for (name, method), request in requests.items():
+            if selected and name not in selected:
+                continue
+            self.send(client, method, *request())  # warm up
+            results[f"{name} {method}"] = self.measure(
+                client, method, request, max(options["requests"], 2)
+            )
+        return results
+
+    def handle(self, *args, **options):
+        caches = dict(settings.CACHES)
+        if not options["cache"]:
+            # A timeout of 0 stores no responses; the versions are Sequence
+            # rows and are not affected.
+            caches["responses"] = {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "bench",
+                "TIMEOUT": 0,
+            }
+
+        with override_settings(CACHES=caches, ALLOWED_HOSTS=["testserver"]):
+            with transaction.atomic():
+                results = self.run(options)
+                transaction.set_rollback(True)
+
+        report = {
+            "commit": get_commit(),
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "options": {
+                key: options[key]
+                for key in ("customers", "products", "orders", "requests", "cache")
+            },
+            "results": results,
+        }
+        previous = {}
+        if options["compare"]:
+            with open(options["compare"]) as file:
+                previous = json.load(file)["results"]
+
+        self.stdout.write(
+            f"{'endpoint':<32} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+            f"{'queries':>7} {'peak kb':>8}"
+        )
+        for key, result in results.items():
+            line = (
+                f"{key:<32} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} "
+                f"{result['p99_ms']:>8.2f} {result['queries']:>7} "
+                f"{result['peak_memory_kb']:>8.1f}"
+            )
+            if key in previous and previous[key]["p50_ms"]:
+                line += f"  p50 {result['p50_ms'] / previous[key]['p50_ms']:.2f}x"
+                if result["queries"] != previous[key]["queries"]:
+                    line += f", queries were {previous[key]['queries']}"
+            self.stdout.write(line)
+
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump(report, file, indent=2)
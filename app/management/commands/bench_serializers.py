@@ -0,0 +1,95 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Prefetch
+
+from app.fast_serializer import (
+    FastCustomerSerializer,
+    FastProductSerializer,
+    FastOrderSerializer,
+)
+from app.renderers import CompactJSONRenderer
+from app.models import Customer, Product, Order, Order_item
+from app.seed import seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the ModelSerializer and .values() read paths on generated "
+        "data. Rows are inserted in a transaction that is rolled back."
+    )
+
+    page_size = 1000
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000]
+        )
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def pages(self, queryset):
+        # Walk the table in keyset pages like the list endpoints do.
+        last_id = 0
+        while True:
+            page = list(
+                queryset.filter(id__gt=last_id).order_by("id")[: self.page_size]
+            )
+            if not page:
+                return
+            yield page
+            last_id = page[-1]["id"] if isinstance(page[-1], dict) else page[-1].id
+
+    def render(self, serializer_class, queryset):
+        renderer = CompactJSONRenderer()
+        return b"".join(
+            renderer.render(serializer_class(page, many=True).data)
+            for page in self.pages(queryset)
+        )
+
+    def measure(self, serializer_class, queryset, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            content = self.render(serializer_class, queryset)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, content
+
+    def handle(self, *args, **options):
+        cases = [
+            ("customers", Customer.objects.all(), FastCustomerSerializer),
+            ("products", Product.objects.all(), FastProductSerializer),
+            (
+                "orders",
+                Order.objects.prefetch_related(
+                    Prefetch("order_items", queryset=Order_item.objects.order_by("id"))
+                ),
+                FastOrderSerializer,
+            ),
+        ]
+
+        self.stdout.write(
+            f"{'rows':>8} {'endpoint':<10} {'serializer':>11} {'fast':>9} {'speedup':>8}"
+        )
+        with transaction.atomic():
+            for rows in sorted(options["rows"]):
+                seed(
+                    customers=rows - Customer.objects.count(),
+                    products=rows - Product.objects.count(),
+                    orders=rows - Order.objects.count(),
+                )
+                for name, queryset, fast_class in cases:
+                    slow, expected = self.measure(
+                        fast_class.serializer_class, queryset, options["repeat"]
+                    )
+                    fast, content = self.measure(
+                        fast_class, fast_class.prepare(queryset), options["repeat"]
+                    )
+                    if content != expected:
+                        self.stderr.write(f"{name}: outputs differ at {rows} rows")
+                    self.stdout.write(
+                        f"{rows:>8} {name:<10} {slow:>10.3f}s {fast:>8.3f}s "
+                        f"{slow / fast:>7.1f}x"
+                    )
+            transaction.set_rollback(True)
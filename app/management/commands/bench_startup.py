@@ -0,0 +1,116 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Runs in a fresh interpreter: boot the WSGI application, then time the first
+# API request and the first docs request.
+WORKER = """
+import json, os, sys, time
+from wsgiref.util import setup_testing_defaults
+
+started = time.perf_counter()
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "e_commerce.settings")
+from django.core.wsgi import get_wsgi_application
+
+application = get_wsgi_application()
+booted = time.perf_counter()
+
+
+def get(path):
+    environ = {"PATH_INFO": path}
+    setup_testing_defaults(environ)
+    statuses = []
+    b"".join(application(environ, lambda status, *args: statuses.append(status)))
+    return statuses[0]
+
+
+api_status = get("/app/api/cache/stats/")
+first_request = time.perf_counter()
+docs_status = get("/swagger/") if "--no-docs" not in sys.argv else ""
+first_docs = time.perf_counter()
+print(json.dumps({
+    "boot_ms": (booted - started) * 1000,
+    "first_request_ms": (first_request - booted) * 1000,
+    "first_docs_ms": (first_docs - first_request) * 1000,
+    "api_status": api_status,
+    "docs_status": docs_status,
+}))
+"""
+
+
+def parse_importtime(stderr):
+    """Total import time and the cumulative time of each top-level package."""
+    total, packages = 0, {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:") :].split("|")
+        total += int(own)
+        if not name.startswith("  "):
+            packages[name.strip()] = int(cumulative)
+    return total / 1000, packages
+
+
+class Command(BaseCommand):
+    help = (
+        "Start fresh interpreters under each API_DOCS mode and report the "
+        "`python -X importtime` total up to the first API request and the "
+        "time to boot the WSGI application, answer the first API request and "
+        "the first /swagger/ request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--modes", nargs="+", default=["eager", "lazy", "off"])
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument(
+            "--top", type=int, default=5, help="Slowest top-level imports to list"
+        )
+
+    def run_worker(self, mode, *flags, args=()):
+        process = subprocess.run(
+            [sys.executable, *flags, "-c", WORKER, *args],
+            env=dict(os.environ, API_DOCS=mode),
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+        )
+        if process.returncode:
+            raise CommandError(process.stderr)
+        return json.loads(process.stdout.splitlines()[-1]), process.stderr
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'mode':<6} {'imports ms':>10} {'boot ms':>8} {'1st request ms':>14} "
+            f"{'1st docs ms':>11}"
+        )
+        slowest = {}
+        for mode in options["modes"]:
+            # Imports up to the first API request, the docs come on top.
+            _, stderr = self.run_worker(mode, "-X", "importtime", args=["--no-docs"])
+            import_ms, packages = parse_importtime(stderr)
+            slowest[mode] = sorted(packages.items(), key=lambda item: -item[1])
+            runs = [self.run_worker(mode)[0] for _ in range(options["runs"])]
+
+            def median(key):
+                return statistics.median(run[key] for run in runs)
+
+            docs = (
+                f"{median('first_docs_ms'):>11.1f}"
+                if runs[0]["docs_status"].startswith("200")
+                else f"{'-':>11}"
+            )
+            self.stdout.write(
+                f"{mode:<6} {import_ms:>10.1f} {median('boot_ms'):>8.1f} "
+                f"{median('first_request_ms'):>14.1f} {docs}"
+            )
+
+        for mode, packages in slowest.items():
+            self.stdout.write(f"\nSlowest imports ({mode}):")
+            for name, cumulative in packages[: options["top"]]:
+                self.stdout.write(f"  {cumulative / 1000:8.1f} ms  {name}")
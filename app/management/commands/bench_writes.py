@@ -0,0 +1,168 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, OperationalError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from app.models import Customer, Product, Order
+from app.seed import seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure OrdersAPI.post throughput with concurrent writers, and "
+        "readers listing orders, under each DB_PROFILE. Every profile runs in "
+        "a subprocess on a fresh SQLite file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profiles", nargs="+", default=["default", "production"])
+        parser.add_argument("--writers", type=int, default=8)
+        parser.add_argument("--readers", type=int, default=4)
+        parser.add_argument("--seconds", type=float, default=5)
+        parser.add_argument(
+            "--worker", action="store_true", help="Internal: run one profile here"
+        )
+
+    def handle(self, *args, **options):
+        if options["worker"]:
+            result = self.run_worker(options)
+            self.stdout.write(json.dumps(result))
+            return
+
+        self.stdout.write(
+            f"{'profile':<12} {'writes/s':>9} {'p95 ms':>8} {'errors':>7} "
+            f"{'reads/s':>9}"
+        )
+        for profile in options["profiles"]:
+            result = self.run_profile(profile, options)
+            self.stdout.write(
+                f"{profile:<12} {result['writes'] / result['seconds']:>9.1f} "
+                f"{result['write_p95_ms']:>8.1f} {result['errors']:>7} "
+                f"{result['reads'] / result['seconds']:>9.1f}"
+            )
+
+    def run_profile(self, profile, options):
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(
+                os.environ,
+                DB_PROFILE=profile,
+                DATABASE_PATH=os.path.join(directory, "bench.sqlite3"),
+            )
+            process = subprocess.run(
+                [
+                    sys.executable,
+                    os.path.join(settings.BASE_DIR, "manage.py"),
+                    "bench_writes",
+                    "--worker",
+                    f"--writers={options['writers']}",
+                    f"--readers={options['readers']}",
+                    f"--seconds={options['seconds']}",
+                ],
+                env=env,
+                capture_output=True,
+                text=True,
+            )
+        if process.returncode:
+            raise CommandError(process.stderr)
+        return json.loads(process.stdout.splitlines()[-1])
+
+    def run_worker(self, options):
+        call_command("migrate", verbosity=0)
+        seed(customers=100, products=100, orders=1000)
+        customer_ids = list(Customer.objects.values_list("id", flat=True))
+        product_ids = list(Product.objects.values_list("id", flat=True))
+        connection.close()
+
+        deadline = time.perf_counter() + options["seconds"]
+        latencies, reads, errors = [], [], []
+
+        def write(number):
+            client = Client()
+            try:
+                while time.perf_counter() < deadline:
+                    data = {
+                        "customer": customer_ids[number % len(customer_ids)],
+                        "order_date": date.today().isoformat(),
+                        "address": "street",
+                        "order_items": [
+                            {
+                                "product": product_ids[number % len(product_ids)],
+                                "quantity": 1,
+                            }
+                        ],
+                    }
+                    started = time.perf_counter()
+                    try:
+                        response = client.post(
+                            reverse("create-orders"),
+                            data,
+                            content_type="application/json",
+                        )
+                        ok = response.json()["code"] == 200
+                    except OperationalError:
+                        ok = False
+                    if ok:
+                        latencies.append(time.perf_counter() - started)
+                    else:
+                        errors.append(number)
+            finally:
+                connection.close()
+
+        def read():
+            client = Client()
+            try:
+                while time.perf_counter() < deadline:
+                    try:
+                        client.get(reverse("create-orders"), {"limit": 100})
+                        reads.append(1)
+                    except OperationalError:
+                        errors.append(-1)
+            finally:
+                connection.close()
+
+        # Measure the database, not the response cache of the order list.
+        caches = dict(
+            settings.CACHES,
+            responses={
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "bench",
+                "TIMEOUT": 0,
+            },
+        )
+        with override_settings(CACHES=caches, ALLOWED_HOSTS=["testserver"]):
+            threads = [
+                threading.Thread(target=write, args=[number])
+                for number in range(options["writers"])
+            ] + [threading.Thread(target=read) for _ in range(options["readers"])]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            seconds = time.perf_counter() - started
+
+        return {
+            "seconds": seconds,
+            "writes": len(latencies),
+            "write_p95_ms": (
+                statistics.quantiles(latencies, n=20)[-1] * 1000
+                if len(latencies) > 1
+                else 0
+            ),
+            "errors": len(errors),
+            "reads": len(reads),
+            "orders": Order.objects.count(),
+        }
@@ -0,0 +1,33 @@
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from app.schema import generate_schema, read_schema
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the OpenAPI schema served by /openapi.json to "
+        "OPENAPI_SCHEMA_PATH. With --check, only exit non-zero when the "
+        "stored schema is out of date."
+    )
+    # The schema check would only report what this command fixes.
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", action="store_true")
+
+    def handle(self, *args, **options):
+        path = settings.OPENAPI_SCHEMA_PATH
+        content = generate_schema()
+        if content == read_schema():
+            self.stdout.write(f"{path} is up to date.")
+            return
+        if options["check"]:
+            self.stderr.write(f"{path} is out of date, run generate_schema.")
+            sys.exit(1)
+
+        with open(path, "wb") as file:
+            file.write(content)
+        self.stdout.write(f"Wrote {path}.")
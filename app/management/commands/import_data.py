@@ -0,0 +1,99 @@
+import itertools
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.utils import encoders
+
+from app.importer import IMPORTERS, read_rows
+from app.models import ImportProgress
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream customers, products or orders from a CSV or NDJSON file, "
+        "validate them with the API serializers and insert them in chunks. "
+        "Rejected rows go to a side file. The progress is saved in the "
+        "transaction of every chunk, so an interrupted import resumes after "
+        "the last committed chunk."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("model", choices=IMPORTERS)
+        parser.add_argument("path")
+        parser.add_argument(
+            "--format", choices=["csv", "ndjson"], help="Default: from the extension"
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--rejects", help="Default: <path>.rejects.ndjson")
+        parser.add_argument(
+            "--restart", action="store_true", help="Ignore the saved progress"
+        )
+
+    def get_progress(self, path, model, rejects_path, restart):
+        progress, _ = ImportProgress.objects.get_or_create(
+            path=path, model=model, defaults={"rejects_path": rejects_path}
+        )
+        if restart:
+            progress.rows = progress.imported = progress.rejected = 0
+            progress.rejects_size = 0
+            progress.rejects_path = rejects_path
+        elif progress.rows and progress.rejects_path != rejects_path:
+            raise CommandError(
+                f"The import of {path} wrote its rejects to "
+                f"{progress.rejects_path}, use --restart to start over."
+            )
+        return progress
+
+    def handle(self, *args, **options):
+        path = os.path.abspath(options["path"])
+        format = options["format"] or ("csv" if path.endswith(".csv") else "ndjson")
+        rejects_path = os.path.abspath(
+            options["rejects"] or options["path"] + ".rejects.ndjson"
+        )
+        import_chunk = IMPORTERS[options["model"]]
+
+        progress = self.get_progress(
+            path, options["model"], rejects_path, options["restart"]
+        )
+        if progress.rows:
+            self.stdout.write(f"Resuming after row {progress.rows}.")
+
+        with open(path, newline="") as file, open(
+            rejects_path, "a" if progress.rows else "w"
+        ) as rejects:
+            # Drop the rejects of a chunk that was not committed.
+            if os.fstat(rejects.fileno()).st_size > progress.rejects_size:
+                rejects.truncate(progress.rejects_size)
+
+            rows = read_rows(file, format, skip=progress.rows)
+            while True:
+                chunk = list(itertools.islice(rows, options["batch_size"]))
+                if not chunk:
+                    break
+                with transaction.atomic():
+                    imported, rejected = import_chunk(chunk)
+
+                    # The rejects are on disk before the chunk commits; the
+                    # progress records how much of the file is committed.
+                    for number, row, errors in rejected:
+                        rejects.write(
+                            json.dumps(
+                                {"row": number, "data": row, "errors": errors},
+                                cls=encoders.JSONEncoder,
+                            )
+                            + "\n"
+                        )
+                    rejects.flush()
+                    os.fsync(rejects.fileno())
+                    progress.rows = chunk[-1][0]
+                    progress.imported += imported
+                    progress.rejected += len(rejected)
+                    progress.rejects_size = os.fstat(rejects.fileno()).st_size
+                    progress.save()
+
+        self.stdout.write(
+            f"Imported {progress.imported} {options['model']}, rejected "
+            f"{progress.rejected} (see {rejects_path})."
+        )
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from app.models import Order
+from app.totals import rebuild_totals
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute total_weight and item_count of every order from its items, "
+        "one transaction per batch of orders."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        last_id = 0
+        rebuilt = 0
+        while True:
+            ids = list(
+                Order.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                rebuild_totals(Order.objects.filter(id__gte=ids[0], id__lte=ids[-1]))
+            rebuilt += len(ids)
+            last_id = ids[-1]
+
+        self.stdout.write(f"Rebuilt the totals of {rebuilt} orders.")
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from app.search import SEARCH_TABLES, rebuild_index, search_enabled
+
+
+class Command(BaseCommand):
+    help = (
+        "Refill the full text search tables of customers and products from "
+        "their rows, one transaction per table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if not search_enabled():
+            self.stdout.write("The database has no search index.")
+            return
+
+        for model in SEARCH_TABLES:
+            with transaction.atomic():
+                rebuild_index(model, batch_size=options["batch_size"])
+            self.stdout.write(
+                f"Rebuilt the search index of {model._meta.verbose_name_plural}."
+            )
@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from app.seed import seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Insert N synthetic customers, products and orders with skewed item "
+        "counts, product popularity and quantities. Rows are added to what "
+        "is already in the database; the same arguments always generate the "
+        "same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--customers", type=int, default=1000)
+        parser.add_argument("--products", type=int, default=1000)
+        parser.add_argument("--orders", type=int, default=10000)
+        parser.add_argument("--items-per-order", type=int, default=3)
+        parser.add_argument(
+            "--days", type=int, default=365, help="Spread orders over this many days"
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            with transaction.atomic():
+                seed(
+                    customers=options["customers"],
+                    products=options["products"],
+                    orders=options["orders"],
+                    items_per_order=options["items_per_order"],
+                    days=options["days"],
+                    batch_size=options["batch_size"],
+                )
+        except ValueError as exc:
+            raise CommandError(exc)
+        self.stdout.write(
+            f"Seeded {options['customers']} customers, {options['products']} "
+            f"products and {options['orders']} orders in "
+            f"{time.perf_counter() - started:.1f}s."
+        )
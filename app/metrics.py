@@ -0,0 +1,299 @@
+import bisect
+import contextvars
+import functools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+
+
+# Per-route request metrics in Prometheus text format. Every worker process
+# keeps its own registry, so each one has to be scraped (or the counts are
+# per process when behind a load balancer).
+
+logger = logging.getLogger("app.slow_requests")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# name: (type, help, label names, buckets)
+METRICS = {
+    "app_request_duration_seconds": (
+        "histogram",
+        "Request latency.",
+        ("route", "method"),
+        DURATION_BUCKETS,
+    ),
+    "app_requests_total": (
+        "counter",
+        "Requests by response status.",
+        ("route", "method", "status"),
+        None,
+    ),
+    "app_sql_queries": (
+        "histogram",
+        "SQL queries per request.",
+        ("route", "method"),
+        QUERY_BUCKETS,
+    ),
+    "app_sql_duration_seconds_total": (
+        "counter",
+        "Time spent executing SQL.",
+        ("route", "method"),
+        None,
+    ),
+    "app_serializer_duration_seconds_total": (
+        "counter",
+        "Time spent producing serializer data, including the SQL it runs.",
+        ("route", "method"),
+        None,
+    ),
+    "app_response_size_bytes": (
+        "histogram",
+        "Response body size.",
+        ("route", "method"),
+        SIZE_BUCKETS,
+    ),
+    "app_response_cache_lookups_total": (
+        "counter",
+        "Response cache lookups by result (hits, misses).",
+        ("result",),
+        None,
+    ),
+}
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.values = {name: {} for name in METRICS}
+
+    def observe(self, name, labels, value):
+        with self.lock:
+            values = self.values[name]
+            if labels not in values:
+                values[labels] = Histogram(METRICS[name][3])
+            values[labels].observe(value)
+
+    def inc(self, name, labels, value=1):
+        with self.lock:
+            values = self.values[name]
+            values[labels] = values.get(labels, 0) + value
+
+    def get(self, name, labels):
+        with self.lock:
+            return self.values[name].get(labels, 0)
+
+    def render(self):
+        lines = []
+        with self.lock:
+            for name, (kind, help, label_names, buckets) in METRICS.items():
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in sorted(self.values[name].items()):
+                    label = ",".join(
+                        f'{key}="{escape(label_value)}"'
+                        for key, label_value in zip(label_names, labels)
+                    )
+                    if kind == "counter":
+                        lines.append(f"{name}{{{label}}} {value}")
+                        continue
+                    cumulative = 0
+                    for bound, count in zip((*buckets, "+Inf"), value.counts):
+                        cumulative += count
+                        lines.append(
+                            f'{name}_bucket{{{label},le="{bound}"}} {cumulative}'
+                        )
+                    lines.append(f"{name}_sum{{{label}}} {value.sum}")
+                    lines.append(f"{name}_count{{{label}}} {value.count}")
+        return "\n".join(lines) + "\n"
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = Registry()
+
+
+class RequestMetrics:
+    def __init__(self, capture_sql):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_seconds = 0
+        self.serializer_seconds = 0
+        self.serializer_depth = 0
+        # (seconds, sql) of every query, only kept for the slow request log.
+        self.sql = [] if capture_sql else None
+
+
+current = contextvars.ContextVar("request_metrics", default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper, installed on every connection."""
+    state = current.get()
+    if state is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        state.queries += 1
+        state.sql_seconds += elapsed
+        if state.sql is not None:
+            state.sql.append((elapsed, sql))
+
+
+def install_query_wrapper(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def serializer_timer():
+    # Only the outermost serializer counts, nested ones are part of it.
+    state = current.get()
+    if state is None:
+        yield
+        return
+    state.serializer_depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        state.serializer_depth -= 1
+        if not state.serializer_depth:
+            state.serializer_seconds += time.perf_counter() - started
+
+
+def timed_serializer(method):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        with serializer_timer():
+            return method(*args, **kwargs)
+
+    return wrapper
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = RequestMetrics(get_slow_request_seconds() is not None)
+        token = current.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            current.reset(token)
+        return self.finish(request, response, state)
+
+    async def __acall__(self, request):
+        state = RequestMetrics(get_slow_request_seconds() is not None)
+        token = current.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current.reset(token)
+        return self.finish(request, response, state)
+
+    def finish(self, request, response, state):
+        if response.streaming and not response.is_async:
+            # Streamed bodies run their queries while being sent: record the
+            # request once the last chunk is out.
+            response.streaming_content = self.stream(
+                request, response, state, response.streaming_content
+            )
+        else:
+            size = 0 if response.streaming else len(response.content)
+            record(request, response, state, size)
+        return response
+
+    def stream(self, request, response, state, content):
+        size = 0
+        try:
+            while True:
+                token = current.set(state)
+                try:
+                    chunk = next(content)
+                except StopIteration:
+                    return
+                finally:
+                    current.reset(token)
+                size += len(chunk)
+                yield chunk
+        finally:
+            record(request, response, state, size)
+
+
+def get_slow_request_seconds():
+    return getattr(settings, "SLOW_REQUEST_SECONDS", None)
+
+
+def record(request, response, state, size):
+    duration = time.perf_counter() - state.started
+    match = request.resolver_match
+    labels = ((match.url_name or "") if match else "", request.method)
+    registry.observe("app_request_duration_seconds", labels, duration)
+    registry.inc("app_requests_total", (*labels, str(response.status_code)))
+    registry.observe("app_sql_queries", labels, state.queries)
+    registry.inc("app_sql_duration_seconds_total", labels, state.sql_seconds)
+    registry.inc(
+        "app_serializer_duration_seconds_total", labels, state.serializer_seconds
+    )
+    registry.observe("app_response_size_bytes", labels, size)
+
+    slow = get_slow_request_seconds()
+    if slow is not None and duration >= slow:
+        queries = "\n".join(
+            f"  {seconds * 1000:8.2f} ms  {sql}"
+            for seconds, sql in sorted(state.sql or [], reverse=True)
+        )
+        logger.warning(
+            "Slow request %s %s took %.3fs: %d queries in %.3fs, serializers "
+            "%.3fs\n%s",
+            request.method,
+            request.get_full_path(),
+            duration,
+            state.queries,
+            state.sql_seconds,
+            state.serializer_seconds,
+            queries,
+        )
+
+
+def metrics(request):
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
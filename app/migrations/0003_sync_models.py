@@ -0,0 +1,56 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0002_alter_order_order_data"),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name="order",
+            old_name="order_data",
+            new_name="order_date",
+        ),
+        migrations.AlterField(
+            model_name="customer",
+            name="name",
+            field=models.CharField(max_length=200),
+        ),
+        migrations.AlterField(
+            model_name="order",
+            name="customer",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, to="app.customer"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="order_item",
+            name="order",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="order_items",
+                to="app.order",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="order_item",
+            name="product",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, to="app.product"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="product",
+            name="name",
+            field=models.CharField(max_length=200),
+        ),
+        migrations.AlterField(
+            model_name="product",
+            name="weight",
+            field=models.DecimalField(decimal_places=2, max_digits=5),
+        ),
+    ]
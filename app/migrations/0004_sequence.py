@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:45
+
+from django.db import migrations, models
+
+
+def create_order_number_sequence(apps, schema_editor):
+    Order = apps.get_model("app", "Order")
+    Sequence = apps.get_model("app", "Sequence")
+    numbers = Order.objects.values_list("order_number", flat=True)
+    value = max((int(number[3:]) for number in numbers.iterator()), default=0)
+    Sequence.objects.create(name="order_number", value=value)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0003_sync_models"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Sequence",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=50, unique=True)),
+                ("value", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_order_number_sequence, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:50
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def rename_duplicates(model, field, rename):
+    """
+    Give every row but the first of each duplicated ``field`` value a new
+    value from ``rename(row, taken)``, so the unique constraint can be added.
+    """
+    duplicates = (
+        model.objects.values(field)
+        .annotate(rows=Count("id"))
+        .filter(rows__gt=1)
+        .values_list(field, flat=True)
+    )
+    taken = set(model.objects.values_list(field, flat=True))
+    for value in list(duplicates):
+        for row in model.objects.filter(**{field: value}).order_by("id")[1:]:
+            setattr(row, field, rename(row, taken))
+            taken.add(getattr(row, field))
+            row.save(update_fields=[field])
+
+
+def suffix_name(row, taken):
+    # "<name> (<id>)", cut to the column length, for the later duplicates.
+    suffix = f" ({row.id})"
+    name = row.name[: 200 - len(suffix)] + suffix
+    while name in taken:
+        suffix = f" ({row.id}){suffix}"
+        name = row.name[: 200 - len(suffix)] + suffix
+    return name
+
+
+def dedupe(apps, schema_editor):
+    Customer = apps.get_model("app", "Customer")
+    Product = apps.get_model("app", "Product")
+    Order = apps.get_model("app", "Order")
+    Sequence = apps.get_model("app", "Sequence")
+
+    rename_duplicates(Customer, "name", suffix_name)
+    rename_duplicates(Product, "name", suffix_name)
+
+    # Later orders sharing a number get the next numbers of the sequence.
+    sequence = Sequence.objects.get(name="order_number")
+
+    def renumber(row, taken):
+        while True:
+            sequence.value += 1
+            number = f"ORD{sequence.value:05d}"
+            if number not in taken:
+                return number
+
+    rename_duplicates(Order, "order_number", renumber)
+    sequence.save(update_fields=["value"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0004_sequence"),
+    ]
+
+    operations = [
+        # Databases created before the constraints may hold duplicates.
+        migrations.RunPython(dedupe, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="customer",
+            name="name",
+            field=models.CharField(max_length=200, unique=True),
+        ),
+        migrations.AlterField(
+            model_name="order",
+            name="order_number",
+            field=models.CharField(max_length=10, unique=True),
+        ),
+        migrations.AlterField(
+            model_name="product",
+            name="name",
+            field=models.CharField(max_length=200, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name="order_item",
+            index=models.Index(
+                fields=["order", "product"], name="app_order_item_order_product"
+            ),
+        ),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations
+
+
+TABLES = [
+    ("app_customer_search", "app_customer", ["name", "email"]),
+    ("app_product_search", "app_product", ["name"]),
+]
+
+
+def create_search_tables(apps, schema_editor):
+    # FTS5 is SQLite only; other databases fall back to icontains lookups.
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for table, source, columns in TABLES:
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {table} USING fts5({', '.join(columns)})"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {table} (rowid, {', '.join(columns)}) "
+            f"SELECT id, {', '.join(columns)} FROM {source}"
+        )
+
+
+def drop_search_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for table, _, _ in TABLES:
+        schema_editor.execute(f"DROP TABLE {table}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0005_unique_names_and_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_tables, drop_search_tables),
+    ]
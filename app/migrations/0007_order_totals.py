@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:00
+
+from django.db import migrations, models
+
+
+# Fill in the totals of existing orders; rebuild_order_totals does the same
+# in batches.
+BACKFILL_TOTALS = """
+UPDATE app_order SET
+    total_weight = COALESCE((
+        SELECT SUM(app_product.weight * app_order_item.quantity)
+        FROM app_order_item
+        JOIN app_product ON app_product.id = app_order_item.product_id
+        WHERE app_order_item.order_id = app_order.id
+    ), 0),
+    item_count = COALESCE((
+        SELECT SUM(app_order_item.quantity)
+        FROM app_order_item
+        WHERE app_order_item.order_id = app_order.id
+    ), 0)
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0006_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="item_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="order",
+            name="total_weight",
+            field=models.DecimalField(
+                db_index=True, decimal_places=2, default=0, max_digits=10
+            ),
+        ),
+        migrations.RunSQL(BACKFILL_TOTALS, migrations.RunSQL.noop),
+    ]
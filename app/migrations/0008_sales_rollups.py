@@ -0,0 +1,86 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0007_order_totals"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyCustomerSales",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("quantity", models.BigIntegerField(default=0)),
+                (
+                    "weight",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "customer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="app.customer"
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="DailyProductSales",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("quantity", models.BigIntegerField(default=0)),
+                (
+                    "weight",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="app.product"
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["day"], name="app_dailyproductsales_day")
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="dailyproductsales",
+            constraint=models.UniqueConstraint(
+                fields=("product", "day"), name="app_dailyproductsales_product_day"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dailycustomersales",
+            index=models.Index(fields=["day"], name="app_dailycustomersales_day"),
+        ),
+        migrations.AddConstraint(
+            model_name="dailycustomersales",
+            constraint=models.UniqueConstraint(
+                fields=("customer", "day"), name="app_dailycustomersales_customer_day"
+            ),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0008_sales_rollups"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["customer", "order_date"], name="app_order_customer_date"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(fields=["order_date"], name="app_order_order_date"),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(fields=["address"], name="app_order_address"),
+        ),
+    ]
@@ -0,0 +1,41 @@
+import time
+
+from django.db import migrations
+
+
+# Models whose change versions key the cached responses (app.cache).
+VERSIONED_MODELS = [
+    "app.customer",
+    "app.product",
+    "app.order",
+    "app.dailyproductsales",
+    "app.dailycustomersales",
+]
+
+
+def create_versions(apps, schema_editor):
+    Sequence = apps.get_model("app", "Sequence")
+    # Start from the clock so a recreated database does not repeat versions
+    # that responses are still cached under.
+    value = time.time_ns()
+    for label in VERSIONED_MODELS:
+        Sequence.objects.get_or_create(
+            name=f"version:{label}", defaults={"value": value}
+        )
+
+
+def delete_versions(apps, schema_editor):
+    Sequence = apps.get_model("app", "Sequence")
+    Sequence.objects.filter(
+        name__in=[f"version:{label}" for label in VERSIONED_MODELS]
+    ).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0009_order_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_versions, delete_versions),
+    ]
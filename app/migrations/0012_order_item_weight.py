@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:00
+
+from django.db import migrations, models
+
+
+# Record the lines of existing items at the current product weights; run
+# backfill_sales to rebuild the rollups from them.
+BACKFILL_WEIGHTS = """
+UPDATE app_order_item SET weight = app_order_item.quantity * (
+    SELECT app_product.weight
+    FROM app_product
+    WHERE app_product.id = app_order_item.product_id
+)
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app", "0011_import_progress"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order_item",
+            name="weight",
+            field=models.DecimalField(
+                decimal_places=2, default=0, editable=False, max_digits=14
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunSQL(BACKFILL_WEIGHTS, migrations.RunSQL.noop),
+    ]
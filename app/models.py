@@ -3,7 +3,7 @@ from django.core.validators import MinValueValidator, MaxValueValidator
 
 
 class Customer(models.Model):
-    name = models.CharField(max_length=200)
+    name = models.CharField(max_length=200, unique=True)
     contact_number = models.CharField(max_length=15)
     email = models.EmailField()
 
@@ -12,7 +12,7 @@ class Customer(models.Model):
 
 
 class Product(models.Model):
-    name = models.CharField(max_length=200)
+    name = models.CharField(max_length=200, unique=True)
     weight = models.DecimalField(
         max_digits=5,
         decimal_places=2,
@@ -23,10 +23,25 @@ class Product(models.Model):
 
 
 class Order(models.Model):
-    order_number = models.CharField(max_length=10)
+    order_number = models.CharField(max_length=10, unique=True)
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE)
     order_date = models.DateField()
     address = models.CharField(max_length=300)
+    # Kept up to date by every write path, see app/totals.py.
+    total_weight = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0, db_index=True
+    )
+    item_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        # The order list filters, see app.views.filter_orders.
+        indexes = [
+            models.Index(
+                fields=["customer", "order_date"], name="app_order_customer_date"
+            ),
+            models.Index(fields=["order_date"], name="app_order_order_date"),
+            models.Index(fields=["address"], name="app_order_address"),
+        ]
 
     def __str__(self):
         return self.order_number + " " + self.customer.name
@@ -38,6 +53,88 @@ class Order_item(models.Model):
     )
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField()
+    # Weight of the line as counted in the sales rollups (app/rollups.py),
+    # so they subtract exactly that when the line changes or goes away.
+    weight = models.DecimalField(max_digits=14, decimal_places=2, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["order", "product"], name="app_order_item_order_product"
+            )
+        ]
 
     def __str__(self):
         return self.order.customer.name + " " + self.order.order_number
+
+
+class Sequence(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} {self.value}"
+
+
+class ImportProgress(models.Model):
+    """
+    How far ``manage.py import_data`` got in a file, saved in the transaction
+    of every imported chunk so a resumed import never repeats one.
+    """
+
+    path = models.CharField(max_length=500)
+    model = models.CharField(max_length=20)
+    rejects_path = models.CharField(max_length=500)
+    rows = models.PositiveBigIntegerField(default=0)
+    imported = models.PositiveBigIntegerField(default=0)
+    rejected = models.PositiveBigIntegerField(default=0)
+    # Bytes of the rejects file written by the committed chunks.
+    rejects_size = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["path", "model"], name="app_importprogress_path_model"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.model} {self.path} {self.rows}"
+
+
+# Daily sales rollups, updated in the transaction of every order write (see
+# app/rollups.py) so analytics never aggregate over Order_item.
+class DailyProductSales(models.Model):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    day = models.DateField()
+    quantity = models.BigIntegerField(default=0)
+    weight = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["product", "day"], name="app_dailyproductsales_product_day"
+            )
+        ]
+        indexes = [models.Index(fields=["day"], name="app_dailyproductsales_day")]
+
+    def __str__(self):
+        return f"{self.day} {self.product_id} {self.quantity}"
+
+
+class DailyCustomerSales(models.Model):
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE)
+    day = models.DateField()
+    quantity = models.BigIntegerField(default=0)
+    weight = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["customer", "day"], name="app_dailycustomersales_customer_day"
+            )
+        ]
+        indexes = [models.Index(fields=["day"], name="app_dailycustomersales_day")]
+
+    def __str__(self):
+        return f"{self.day} {self.customer_id} {self.quantity}"
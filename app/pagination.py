@@ -0,0 +1,104 @@
+import base64
+import binascii
+import json
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(position, reverse, filters):
+    payload = {"id": position, "r": int(reverse), "f": filters}
+    raw = json.dumps(payload, separators=(",", ":"), sort_keys=True)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, filters):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        position = int(payload["id"])
+        reverse = bool(payload["r"])
+        cursor_filters = payload["f"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise InvalidCursor("Invalid cursor")
+    # Ids are 64 bit signed integers; a larger one would fail the query.
+    if not 0 <= position < 2**63:
+        raise InvalidCursor("Invalid cursor")
+
+    # A cursor is only valid for the filters it was issued with.
+    if cursor_filters != filters:
+        raise InvalidCursor("Cursor does not match the current filters")
+    return position, reverse
+
+
+def get_page_size(query_params):
+    try:
+        page_size = int(query_params.get("limit", DEFAULT_PAGE_SIZE))
+    except (TypeError, ValueError):
+        return DEFAULT_PAGE_SIZE
+    return min(max(page_size, 1), MAX_PAGE_SIZE)
+
+
+def _row_id(row):
+    return row["id"] if isinstance(row, dict) else row.id
+
+
+def get_page_queryset(queryset, query_params, filters=None):
+    """
+    Keyset pagination on ``id``: narrow ``queryset`` to the rows of one page
+    with ``WHERE id > cursor ORDER BY id LIMIT n + 1``, so no OFFSET or
+    COUNT(*) query is ever issued. Returns the page queryset and the state
+    ``get_page`` needs to build the cursors.
+    """
+    filters = filters or {}
+    limit = get_page_size(query_params)
+    cursor = query_params.get("cursor")
+
+    reverse = False
+    if cursor:
+        position, reverse = decode_cursor(cursor, filters)
+        if reverse:
+            queryset = queryset.filter(id__lt=position).order_by("-id")
+        else:
+            queryset = queryset.filter(id__gt=position).order_by("id")
+    else:
+        queryset = queryset.order_by("id")
+
+    return queryset[: limit + 1], (limit, cursor, reverse, filters)
+
+
+def get_page(rows, state):
+    limit, cursor, reverse, filters = state
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if reverse:
+        rows.reverse()
+
+    if not rows:
+        return rows, {"next": None, "previous": None}
+
+    first_id, last_id = _row_id(rows[0]), _row_id(rows[-1])
+    if reverse:
+        next_cursor = encode_cursor(last_id, False, filters)
+        previous_cursor = encode_cursor(first_id, True, filters) if has_more else None
+    else:
+        next_cursor = encode_cursor(last_id, False, filters) if has_more else None
+        previous_cursor = encode_cursor(first_id, True, filters) if cursor else None
+
+    return rows, {"next": next_cursor, "previous": previous_cursor}
+
+
+def paginate(queryset, query_params, filters=None):
+    """Rows of one page together with the ``next`` and ``previous`` cursors."""
+    queryset, state = get_page_queryset(queryset, query_params, filters)
+    return get_page(list(queryset), state)
+
+
+async def apaginate(queryset, query_params, filters=None):
+    queryset, state = get_page_queryset(queryset, query_params, filters)
+    return get_page([row async for row in queryset], state)
@@ -0,0 +1,207 @@
+import contextlib
+import contextvars
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models import QuerySet, Sum
+
+from .cache import bump_version
+from .models import (
+    Customer,
+    Product,
+    Order,
+    Order_item,
+    DailyProductSales,
+    DailyCustomerSales,
+)
+
+
+# Rollup model, its key column and the lookup of that key from Order_item.
+ROLLUPS = [
+    (DailyProductSales, "product_id", "product_id"),
+    (DailyCustomerSales, "customer_id", "order__customer_id"),
+]
+
+# Lookup from Order_item to each model whose deletion removes items.
+ITEM_LOOKUPS = {
+    Customer: "order__customer_id",
+    Product: "product_id",
+    Order: "order_id",
+    Order_item: "pk",
+}
+
+# Set by writes that add their own rollup lines, see writing_sales.
+sales_written = contextvars.ContextVar("sales_written", default=False)
+
+
+@contextlib.contextmanager
+def writing_sales():
+    """
+    The block adds the rollup lines of its own writes; the save and delete
+    signals leave the rollups alone.
+    """
+    token = sales_written.set(True)
+    try:
+        yield
+    finally:
+        sales_written.reset(token)
+
+
+def get_line_weight(product, quantity):
+    return product.weight * quantity
+
+
+def get_sales_lines(day, customer_id, items, sign=1):
+    """
+    Rollup lines of the ``Order_item`` rows of one order, from the weight
+    recorded on each row. ``sign=-1`` gives the lines that remove them.
+    """
+    return [
+        (day, customer_id, item.product_id, sign * item.quantity, sign * item.weight)
+        for item in items
+    ]
+
+
+def get_stored_sales_lines(items, sign=1):
+    """Rollup lines of ``items`` (a queryset) as stored in the database."""
+    rows = (
+        items.values("order__order_date", "order__customer_id", "product_id")
+        .annotate(total_quantity=Sum("quantity"), total_weight=Sum("weight"))
+        .order_by()
+    )
+    return [
+        (
+            row["order__order_date"],
+            row["order__customer_id"],
+            row["product_id"],
+            sign * row["total_quantity"],
+            sign * row["total_weight"],
+        )
+        for row in rows
+    ]
+
+
+def _upsert(model, column, rows):
+    if not rows:
+        return
+    table = model._meta.db_table
+    ops = connection.ops
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {table} ({column}, day, quantity, weight) "
+            f"VALUES (%s, %s, %s, %s) "
+            f"ON CONFLICT ({column}, day) DO UPDATE SET "
+            f"quantity = {table}.quantity + excluded.quantity, "
+            f"weight = {table}.weight + excluded.weight",
+            [
+                [
+                    key,
+                    ops.adapt_datefield_value(day),
+                    quantity,
+                    ops.adapt_decimalfield_value(weight, 14, 2),
+                ]
+                for key, day, quantity, weight in rows
+            ],
+        )
+    bump_version(model)
+
+
+def add_sales(lines):
+    """
+    Add ``(day, customer_id, product_id, quantity, weight)`` lines to the
+    rollups. Negative lines subtract; lines that cancel out are not written.
+    Runs in the caller's transaction.
+    """
+    product_rows = defaultdict(lambda: [0, Decimal(0)])
+    customer_rows = defaultdict(lambda: [0, Decimal(0)])
+    for day, customer_id, product_id, quantity, weight in lines:
+        for row in (product_rows[product_id, day], customer_rows[customer_id, day]):
+            row[0] += quantity
+            row[1] += weight
+
+    for (model, column, _), rows in zip(ROLLUPS, (product_rows, customer_rows)):
+        _upsert(
+            model,
+            column,
+            [
+                (key, day, quantity, weight)
+                for (key, day), (quantity, weight) in rows.items()
+                if quantity or weight
+            ],
+        )
+
+
+def backfill_sales(orders):
+    """Add the items of ``orders`` (a queryset) to the rollups."""
+    items = Order_item.objects.filter(order__in=orders)
+    for model, column, lookup in ROLLUPS:
+        rows = (
+            items.values(lookup, "order__order_date")
+            .annotate(total_quantity=Sum("quantity"), total_weight=Sum("weight"))
+            .order_by()
+        )
+        _upsert(
+            model,
+            column,
+            [
+                (
+                    row[lookup],
+                    row["order__order_date"],
+                    row["total_quantity"],
+                    row["total_weight"],
+                )
+                for row in rows
+            ],
+        )
+
+
+def clear_sales():
+    for model, _, _ in ROLLUPS:
+        model.objects.all().delete()
+        bump_version(model)
+
+
+# Signal receivers for the writes that do not go through the serializers:
+# admin edits, shell saves and deletes, and the cascades of deletes.
+
+
+def remove_sales_on_delete(sender, instance, origin=None, **kwargs):
+    # A delete is subtracted once, with every item under the deleted object;
+    # the objects its cascade deletes are skipped.
+    if sales_written.get():
+        return
+    if origin is not instance and not (
+        isinstance(origin, QuerySet) and origin.model is sender
+    ):
+        return
+    items = Order_item.objects.filter(**{ITEM_LOOKUPS[sender]: instance.pk})
+    add_sales(get_stored_sales_lines(items, sign=-1))
+
+
+def remember_sales_on_save(sender, instance, **kwargs):
+    # The lines as stored before the save, subtracted again on post_save.
+    if sales_written.get():
+        return
+    if sender is Order_item:
+        instance.weight = get_line_weight(instance.product, instance.quantity)
+    instance._removed_sales = []
+    if instance.pk is not None:
+        items = Order_item.objects.filter(**{ITEM_LOOKUPS[sender]: instance.pk})
+        instance._removed_sales = get_stored_sales_lines(items, sign=-1)
+
+
+def move_sales_on_save(sender, instance, **kwargs):
+    removed = instance.__dict__.pop("_removed_sales", None)
+    if removed is None:
+        return
+    if sender is Order_item:
+        order = instance.order
+        added = get_sales_lines(order.order_date, order.customer_id, [instance])
+    else:
+        # Only the day and the customer of the lines can change.
+        added = [
+            (instance.order_date, instance.customer_id, product_id, -quantity, -weight)
+            for _, _, product_id, quantity, weight in removed
+        ]
+    add_sales(removed + added)
@@ -0,0 +1,121 @@
+import functools
+import hashlib
+
+from django.conf import settings
+from django.core.checks import Warning, register
+from django.http import HttpResponse
+
+from .cache import etag_matches
+
+
+# The OpenAPI schema is generated by `manage.py generate_schema` into
+# settings.OPENAPI_SCHEMA_PATH and served from memory as bytes; the docs UIs
+# load it from there instead of inspecting every view per request.
+#
+# drf_yasg and the view documentation (app.docs) are imported on first use,
+# so with API_DOCS = "lazy" workers only pay for them when someone opens the
+# docs.
+
+
+@functools.cache
+def get_info():
+    from drf_yasg import openapi
+
+    return openapi.Info(
+        title="e-commerce",
+        default_version="v1",
+        description="swagger interface for project api testing",
+        terms_of_service="https://www.google.com/",
+        contact=openapi.Contact(email="contact@yourapp.com"),
+        license=openapi.License(name="Your License"),
+    )
+
+
+@functools.cache
+def get_schema_view():
+    from drf_yasg.views import get_schema_view
+    from rest_framework import permissions
+
+    from .docs import document_views
+
+    document_views()
+    return get_schema_view(
+        get_info(),
+        public=True,
+        permission_classes=(permissions.AllowAny,),
+    )
+
+
+def docs_view(renderer):
+    """The swagger or redoc page, built on the first request unless eager."""
+
+    @functools.cache
+    def get_view():
+        # The page is cached too, so a stray ?format=openapi does not
+        # regenerate the schema on every hit.
+        return get_schema_view().with_ui(renderer, cache_timeout=3600)
+
+    def view(request, *args, **kwargs):
+        return get_view()(request, *args, **kwargs)
+
+    if settings.API_DOCS == "eager":
+        get_view()
+    return view
+
+
+def generate_schema():
+    """The schema as the docs UIs see it, without a host (any host works)."""
+    from drf_yasg.codecs import OpenAPICodecJson
+    from drf_yasg.generators import OpenAPISchemaGenerator
+
+    from .docs import document_views
+
+    document_views()
+    schema = OpenAPISchemaGenerator(get_info()).get_schema(request=None, public=True)
+    return OpenAPICodecJson(validators=[], pretty=True).encode(schema) + b"\n"
+
+
+def read_schema():
+    try:
+        with open(settings.OPENAPI_SCHEMA_PATH, "rb") as file:
+            return file.read()
+    except FileNotFoundError:
+        return None
+
+
+@functools.cache
+def get_schema():
+    # Without a generated file, generate once per process.
+    content = read_schema() or generate_schema()
+    return content, f'"{hashlib.sha1(content).hexdigest()}"'
+
+
+def schema_json(request):
+    content, etag = get_schema()
+    if etag_matches(request, etag):
+        return HttpResponse(status=304, headers={"ETag": etag})
+    return HttpResponse(
+        content,
+        content_type="application/json",
+        headers={"ETag": etag, "Cache-Control": "public, max-age=3600"},
+    )
+
+
+# A deployment check (manage.py check --deploy): generating the schema needs
+# drf_yasg, which would defeat the lazy loading at every startup.
+@register("openapi", deploy=True)
+def check_schema(app_configs, **kwargs):
+    stored = read_schema()
+    if stored is None:
+        message = f"{settings.OPENAPI_SCHEMA_PATH} does not exist."
+    elif stored != generate_schema():
+        message = f"{settings.OPENAPI_SCHEMA_PATH} does not match the API."
+    else:
+        return []
+    return [
+        Warning(
+            message,
+            hint="Run manage.py generate_schema and commit the result.",
+            id="app.W001",
+        )
+    ]
@@ -0,0 +1,132 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Customer, Product
+
+
+# FTS5 tables are keyed by the model's primary key (rowid) and hold the
+# searchable columns only. They are created by migration 0006.
+SEARCH_TABLES = {
+    Customer: ("app_customer_search", ["name", "email"]),
+    Product: ("app_product_search", ["name"]),
+}
+
+
+def search_enabled():
+    return connection.vendor == "sqlite"
+
+
+def index(model, instances):
+    if not search_enabled() or not instances:
+        return
+    table, columns = SEARCH_TABLES[model]
+    placeholders = ", ".join(["%s"] * (len(columns) + 1))
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT OR REPLACE INTO {table} (rowid, {', '.join(columns)}) "
+            f"VALUES ({placeholders})",
+            [
+                [instance.pk, *(getattr(instance, column) for column in columns)]
+                for instance in instances
+            ],
+        )
+
+
+def unindex(model, pks):
+    if not search_enabled() or not pks:
+        return
+    table, _ = SEARCH_TABLES[model]
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"DELETE FROM {table} WHERE rowid = %s", [[pk] for pk in pks]
+        )
+
+
+def rebuild_index(model, batch_size=1000):
+    if not search_enabled():
+        return
+    table, columns = SEARCH_TABLES[model]
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table}")
+    batch = []
+    for instance in model.objects.only(*columns).iterator(chunk_size=batch_size):
+        batch.append(instance)
+        if len(batch) == batch_size:
+            index(model, batch)
+            batch = []
+    index(model, batch)
+
+
+def get_tokens(query):
+    return re.findall(r"\w+", query)
+
+
+def get_match(tokens):
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def get_condition(model, tokens):
+    # Fallback for databases without FTS5.
+    _, columns = SEARCH_TABLES[model]
+    condition = Q()
+    for token in tokens:
+        token_condition = Q()
+        for column in columns:
+            token_condition |= Q(**{f"{column}__icontains": token})
+        condition &= token_condition
+    return condition
+
+
+def search_ids(model, query, limit):
+    """
+    Primary keys of the best ``limit`` matches for ``query``. Every word is
+    a prefix match and all words must match.
+    """
+    tokens = get_tokens(query)
+    if not tokens:
+        return []
+
+    if not search_enabled():
+        return list(
+            model.objects.filter(get_condition(model, tokens))
+            .order_by("id")
+            .values_list("id", flat=True)[:limit]
+        )
+
+    table, _ = SEARCH_TABLES[model]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM {table} WHERE {table} MATCH %s ORDER BY rank LIMIT %s",
+            [get_match(tokens), limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_queryset(model, query):
+    """
+    Every match for ``query``, unordered, to be used as a subquery.
+    """
+    tokens = get_tokens(query)
+    if not tokens:
+        return model.objects.none()
+
+    if not search_enabled():
+        return model.objects.filter(get_condition(model, tokens))
+
+    table, _ = SEARCH_TABLES[model]
+    return model.objects.filter(
+        pk__in=RawSQL(
+            f"SELECT rowid FROM {table} WHERE {table} MATCH %s", [get_match(tokens)]
+        )
+    )
+
+
+def index_on_save(sender, instance, **kwargs):
+    index(sender, [instance])
+
+
+def unindex_on_delete(sender, instance, **kwargs):
+    unindex(sender, [instance.pk])
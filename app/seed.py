@@ -0,0 +1,114 @@
+import itertools
+import random
+from datetime import date, timedelta
+
+from . import search
+from .cache import bump_version
+from .models import Customer, Product, Order, Order_item
+from .totals import rebuild_totals
+from .rollups import backfill_sales
+from .utils import Generate_Order_Numbers
+
+
+MAX_ITEMS_PER_ORDER = 20
+QUANTITIES = [1, 2, 3, 4, 5]
+QUANTITY_WEIGHTS = [60, 20, 10, 6, 4]
+
+
+def seed(
+    customers=0,
+    products=0,
+    orders=0,
+    items_per_order=3,
+    days=365,
+    batch_size=1000,
+):
+    """
+    Bulk insert synthetic rows on top of whatever is already in the database.
+    Orders are spread over all existing customers and the last ``days`` days.
+    Like real order data they are skewed: most orders have few items (about
+    ``items_per_order`` on average), a few products sell far more than the
+    rest and most quantities are 1.
+    """
+    rng = random.Random(0)
+
+    start = Customer.objects.count()
+    new_customers = Customer.objects.bulk_create(
+        (
+            Customer(
+                name=f"customer {start + i}",
+                contact_number=f"{9000000000 + start + i}",
+                email=f"customer{start + i}@example.com",
+            )
+            for i in range(customers)
+        ),
+        batch_size=batch_size,
+    )
+
+    start = Product.objects.count()
+    new_products = Product.objects.bulk_create(
+        (
+            Product(name=f"product {start + i}", weight=f"{rng.randint(1, 500) / 100}")
+            for i in range(products)
+        ),
+        batch_size=batch_size,
+    )
+
+    # bulk_create sends no signals: index and invalidate explicitly.
+    search.index(Customer, new_customers)
+    search.index(Product, new_products)
+    bump_version(Customer)
+    bump_version(Product)
+    if not orders:
+        return
+
+    customer_ids = list(Customer.objects.values_list("id", flat=True))
+    product_weights = dict(Product.objects.values_list("id", "weight"))
+    product_ids = list(product_weights)
+    if not customer_ids or not product_ids:
+        raise ValueError("Orders need at least one customer and one product.")
+    # Zipf-like popularity: the n-th product sells about 1/n as often as the
+    # first one.
+    popularity = list(
+        itertools.accumulate(1 / rank for rank in range(1, len(product_ids) + 1))
+    )
+    today = date.today()
+
+    def get_items(order):
+        count = min(
+            1 + int(rng.expovariate(1 / max(items_per_order - 1, 0.1))),
+            MAX_ITEMS_PER_ORDER,
+            len(product_ids),
+        )
+        chosen = set(rng.choices(product_ids, cum_weights=popularity, k=count))
+        items = []
+        for product_id in chosen:
+            quantity = rng.choices(QUANTITIES, QUANTITY_WEIGHTS)[0]
+            items.append(
+                Order_item(
+                    order=order,
+                    product_id=product_id,
+                    quantity=quantity,
+                    weight=product_weights[product_id] * quantity,
+                )
+            )
+        return items
+
+    new_orders = Order.objects.bulk_create(
+        (
+            Order(
+                order_number=order_number,
+                customer_id=rng.choice(customer_ids),
+                order_date=today - timedelta(days=rng.randrange(days + 1)),
+                address=f"{rng.randint(1, 999)} main street",
+            )
+            for order_number in Generate_Order_Numbers(orders)
+        ),
+        batch_size=batch_size,
+    )
+    Order_item.objects.bulk_create(
+        (item for order in new_orders for item in get_items(order)),
+        batch_size=batch_size,
+    )
+    rebuild_totals(Order.objects.filter(id__gte=new_orders[0].id))
+    backfill_sales(Order.objects.filter(id__gte=new_orders[0].id))
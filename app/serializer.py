@@ -1,5 +1,9 @@
+import itertools
+
 from rest_framework import serializers
 from rest_framework.serializers import ValidationError
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
 from django.db.models import Sum
 from .models import (
     Customer,
@@ -7,11 +11,63 @@ from .models import (
     Order,
     Order_item,
 )
+from .cache import bump_version, coalesce_bumps
+from .totals import get_item_totals, add_totals
+from .rollups import get_line_weight, get_sales_lines, add_sales, writing_sales
+from .metrics import timed_serializer
 from django.utils import timezone
 from datetime import date
 
 
-class CustomerSerializer(serializers.ModelSerializer):
+class TimedDataMixin:
+    """Counts the time spent producing ``data`` in the request metrics."""
+
+    @property
+    @timed_serializer
+    def data(self):
+        return super().data
+
+
+class TimedListSerializer(TimedDataMixin, serializers.ListSerializer):
+    pass
+
+
+class UniqueNameSerializer(TimedDataMixin, serializers.ModelSerializer):
+    """
+    Name uniqueness is enforced by the database constraint instead of a
+    pre-check query; a clash on save is reported as a ``name`` error, any
+    other integrity error is raised as is.
+    """
+
+    unique_name_message = "{value} is already exists"
+
+    def name_is_taken(self):
+        others = self.Meta.model.objects.filter(name=self.validated_data.get("name"))
+        if self.instance is not None:
+            others = others.exclude(pk=self.instance.pk)
+        return others.exists()
+
+    def save(self, **kwargs):
+        try:
+            with transaction.atomic():
+                return super().save(**kwargs)
+        except IntegrityError:
+            if "name" not in self.validated_data or not self.name_is_taken():
+                raise
+            raise ValidationError(
+                {
+                    "name": [
+                        self.unique_name_message.format(
+                            value=self.validated_data["name"]
+                        )
+                    ]
+                }
+            )
+
+
+class CustomerSerializer(UniqueNameSerializer):
+    unique_name_message = "{value} name is already exists"
+
     class Meta:
         model = Customer
         fields = [
@@ -20,14 +76,13 @@ class CustomerSerializer(serializers.ModelSerializer):
             "contact_number",
             "email",
         ]
+        extra_kwargs = {"name": {"validators": []}}
+        list_serializer_class = TimedListSerializer
 
-    def validate_name(self, value):
-        if Customer.objects.filter(name=value).exists():
-            raise serializers.ValidationError(f"{value} name is already exists")
-        return value
 
+class ProductSerializer(UniqueNameSerializer):
+    unique_name_message = "{value} is already exists in products"
 
-class ProductSerializer(serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = [
@@ -35,11 +90,8 @@ class ProductSerializer(serializers.ModelSerializer):
             "name",
             "weight",
         ]
-
-    def validate_name(self, value):
-        if Product.objects.filter(name=value).exists():
-            raise serializers.ValidationError(f"{value} is already exists in products")
-        return value
+        extra_kwargs = {"name": {"validators": []}}
+        list_serializer_class = TimedListSerializer
 
     def validate_weight(self, value):
         if value < 0 or value > 25:
@@ -49,13 +101,93 @@ class ProductSerializer(serializers.ModelSerializer):
         return value
 
 
+def preload_instances(context, queryset, values):
+    """
+    Fetch every instance referenced by ``values`` with a single ``IN`` query
+    and remember it (or its absence) in ``context["instances"]`` for
+    ``CachedPrimaryKeyRelatedField``.
+    """
+    model = queryset.model
+    cache = context.setdefault("instances", {}).setdefault(model, {})
+    pks = set()
+    for value in values:
+        try:
+            pk = model._meta.pk.to_python(value)
+        except (TypeError, ValueError, DjangoValidationError):
+            continue
+        if pk is not None and pk not in cache:
+            pks.add(pk)
+
+    if pks:
+        found = queryset.in_bulk(pks)
+        for pk in pks:
+            cache[pk] = found.get(pk)
+
+
+class CachedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    def to_internal_value(self, data):
+        model = self.get_queryset().model
+        cache = self.context.get("instances", {}).get(model, {})
+        if self.pk_field is None and not isinstance(data, bool):
+            try:
+                pk = model._meta.pk.to_python(data)
+            except (TypeError, ValueError, DjangoValidationError):
+                pk = None
+            if pk in cache:
+                if cache[pk] is None:
+                    self.fail("does_not_exist", pk_value=data)
+                return cache[pk]
+
+        return super().to_internal_value(data)
+
+
 class OrderItemSerializer(serializers.ModelSerializer):
+    product = CachedPrimaryKeyRelatedField(queryset=Product.objects.all())
+
     class Meta:
         model = Order_item
         fields = ["product", "quantity"]
 
 
-class OrderSerializer(serializers.ModelSerializer):
+def create_order_items(orders, order_items_data):
+    """
+    Insert the items of ``orders`` with one query, add them to the sales
+    rollups and bump the order version once. The items are kept as the
+    prefetched ``order_items`` of their order, so the response does not
+    read them back.
+    """
+    items = Order_item.objects.bulk_create(
+        Order_item(
+            order=order,
+            weight=get_line_weight(data["product"], data["quantity"]),
+            **data,
+        )
+        for order, items_data in zip(orders, order_items_data)
+        for data in items_data
+    )
+
+    items = iter(items)
+    lines = []
+    for order, items_data in zip(orders, order_items_data):
+        order_items = list(itertools.islice(items, len(items_data)))
+        order._prefetched_objects_cache = {"order_items": order_items}
+        lines += get_sales_lines(order.order_date, order.customer_id, order_items)
+    add_sales(lines)
+    bump_version(Order)
+
+
+class OrderListSerializer(TimedListSerializer):
+    def create(self, validated_data):
+        order_items_data = [data.pop("order_items") for data in validated_data]
+        with coalesce_bumps(), writing_sales():
+            orders = Order.objects.bulk_create(Order(**data) for data in validated_data)
+            create_order_items(orders, order_items_data)
+
+        return orders
+
+
+class OrderSerializer(TimedDataMixin, serializers.ModelSerializer):
+    customer = CachedPrimaryKeyRelatedField(queryset=Customer.objects.all())
     order_items = OrderItemSerializer(many=True)
 
     class Meta:
@@ -66,44 +198,134 @@ class OrderSerializer(serializers.ModelSerializer):
             "customer",
             "order_date",
             "address",
+            "total_weight",
+            "item_count",
             "order_items",
         ]
+        read_only_fields = ["order_number", "total_weight", "item_count"]
+        list_serializer_class = OrderListSerializer
+
+    @staticmethod
+    def preload(context, orders_data):
+        """Resolve the products of all ``orders_data`` with one query."""
+        preload_instances(
+            context,
+            Product.objects.all(),
+            [
+                order_item.get("product")
+                for order_data in orders_data
+                if isinstance(order_data, dict)
+                and isinstance(order_data.get("order_items"), list)
+                for order_item in order_data["order_items"]
+                if isinstance(order_item, dict)
+            ],
+        )
+
+    def to_internal_value(self, data):
+        self.preload(self.context, [data])
+        return super().to_internal_value(data)
 
     def create(self, validated_data):
         order_items_data = validated_data.pop("order_items")
-        order = Order.objects.create(**validated_data)
-        for order_item_data in order_items_data:
-            Order_item.objects.create(order=order, **order_item_data)
+        with transaction.atomic(), coalesce_bumps(), writing_sales():
+            order = Order.objects.create(**validated_data)
+            create_order_items([order], [order_items_data])
 
         return order
 
     def update(self, instance, validated_data):
         order_items_data = validated_data.pop("order_items")
-        instance.customer = validated_data.get("customer", instance.customer)
-        instance.order_date = validated_data.get("order_date", instance.order_date)
-        instance.address = validated_data.get("address", instance.address)
+        with transaction.atomic(), coalesce_bumps(), writing_sales():
+            # Lock the order and read it and its items again inside the
+            # transaction, so concurrent updates apply their diffs one after
+            # the other (SQLite has no row locks but lets one writer at a
+            # time commit and fails the others).
+            stored = Order.objects.select_for_update().get(pk=instance.pk)
+            current_items = {
+                item.product_id: item
+                for item in Order_item.objects.filter(order=stored).select_related(
+                    "product"
+                )
+            }
+            for attr in ("customer", "order_date", "address"):
+                if attr in validated_data:
+                    setattr(instance, attr, validated_data[attr])
 
-        for order_item_data in order_items_data:
-            product = order_item_data["product"]
-            quantity = order_item_data["quantity"]
-            Order_item.objects.update_or_create(
-                order=instance, product=product, defaults={"quantity": quantity}
+            # Move every old line out of the rollups with the weight it was
+            # counted with. Unchanged items keep their weight, so their
+            # lines cancel out and are not written.
+            sales = get_sales_lines(
+                stored.order_date,
+                stored.customer_id,
+                current_items.values(),
+                sign=-1,
             )
 
-        instance.save()
+            # Diff the payload against the stored items: unchanged lines are
+            # not written, and lines missing from the payload are removed.
+            # The totals are shifted by the weight and count of the changed
+            # lines.
+            items = []
+            new_items = []
+            changed_items = []
+            changes = []
+            for order_item_data in order_items_data:
+                product = order_item_data["product"]
+                quantity = order_item_data["quantity"]
+                item = current_items.pop(product.pk, None)
+                if item is None:
+                    item = Order_item(
+                        order=instance,
+                        product=product,
+                        quantity=quantity,
+                        weight=get_line_weight(product, quantity),
+                    )
+                    new_items.append(item)
+                    changes.append((product, quantity))
+                elif item.quantity != quantity:
+                    changes.append((product, quantity - item.quantity))
+                    item.quantity = quantity
+                    item.weight = get_line_weight(product, quantity)
+                    changed_items.append(item)
+                items.append(item)
+            for item in current_items.values():
+                changes.append((item.product, -item.quantity))
+            weight, count = get_item_totals(changes)
+            sales += get_sales_lines(instance.order_date, instance.customer_id, items)
+
+            instance.save(update_fields=["customer", "order_date", "address"])
+            add_totals(Order.objects.filter(pk=instance.pk), weight, count)
+            add_sales(sales)
+            if current_items:
+                Order_item.objects.filter(
+                    id__in=[item.id for item in current_items.values()]
+                ).delete()
+            if changed_items:
+                Order_item.objects.bulk_update(changed_items, ["quantity", "weight"])
+            if new_items:
+                Order_item.objects.bulk_create(new_items)
+
+        instance.total_weight = stored.total_weight + weight
+        instance.item_count = stored.item_count + count
+        # Drop items prefetched before the update so the response is fresh.
+        getattr(instance, "_prefetched_objects_cache", {}).pop("order_items", None)
         return instance
 
     def validate_order_date(self, value):
-        if value < date.today():
+        # Imports of historical orders pass allow_past_dates in the context.
+        if value < date.today() and not self.context.get("allow_past_dates"):
             raise serializers.ValidationError("Date must not be in the past.")
         return value
 
     def validate(self, value):
-        total_weight = sum(
-            [prod["product"].weight * prod["quantity"] for prod in value["order_items"]]
+        total_weight, item_count = get_item_totals(
+            (prod["product"], prod["quantity"]) for prod in value["order_items"]
         )
         if total_weight > 150:
             raise ValidationError("In a order wight can not be more than 150kg.")
+        # Stored on create; update applies the difference instead.
+        value["total_weight"] = total_weight
+        value["item_count"] = item_count
         return value
 
     def validate_order_items(self, order_items_data):
@@ -115,3 +337,53 @@ class OrderSerializer(serializers.ModelSerializer):
             product_set.add(product)
 
         return order_items_data
+
+
+# Primary keys are 64 bit signed integers in the database; larger values
+# fail the query instead of matching nothing.
+MAX_ID = 2**63 - 1
+
+
+class SalesQuerySerializer(serializers.Serializer):
+    by = serializers.ChoiceField(choices=["products", "customers"], default="products")
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    id = serializers.IntegerField(required=False, min_value=1, max_value=MAX_ID)
+
+    def validate(self, value):
+        if "start" in value and "end" in value and value["start"] > value["end"]:
+            raise ValidationError("start must not be after end.")
+        return value
+
+
+class OrderFilterSerializer(serializers.Serializer):
+    products = serializers.CharField(required=False)
+    products_match = serializers.ChoiceField(choices=["any", "all"], default="any")
+    customer = serializers.CharField(required=False)
+    customer_id = serializers.IntegerField(
+        required=False, min_value=1, max_value=MAX_ID
+    )
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    address = serializers.CharField(required=False, trim_whitespace=False)
+    min_weight = serializers.DecimalField(
+        max_digits=None, decimal_places=None, required=False
+    )
+    max_weight = serializers.DecimalField(
+        max_digits=None, decimal_places=None, required=False
+    )
+
+    def validate(self, value):
+        if "start" in value and "end" in value and value["start"] > value["end"]:
+            raise ValidationError("start must not be after end.")
+        return value
+
+
+class SalesSerializer(serializers.Serializer):
+    """A day of one product or customer, or their sum over a date range."""
+
+    day = serializers.DateField(required=False)
+    product = serializers.IntegerField(required=False)
+    customer = serializers.IntegerField(required=False)
+    quantity = serializers.IntegerField()
+    weight = serializers.DecimalField(max_digits=14, decimal_places=2)
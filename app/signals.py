@@ -0,0 +1,30 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save
+
+from .cache import bump_on_change
+from .db import apply_sqlite_pragmas
+from .metrics import install_query_wrapper
+from .models import Customer, Product, Order, Order_item
+from .rollups import (
+    move_sales_on_save,
+    remember_sales_on_save,
+    remove_sales_on_delete,
+)
+from .search import index_on_save, unindex_on_delete
+
+
+def connect_signals():
+    for model in (Customer, Product, Order, Order_item):
+        post_save.connect(bump_on_change, sender=model)
+        post_delete.connect(bump_on_change, sender=model)
+        pre_delete.connect(remove_sales_on_delete, sender=model)
+    for model in (Order, Order_item):
+        pre_save.connect(remember_sales_on_save, sender=model)
+        post_save.connect(move_sales_on_save, sender=model)
+
+    for model in (Customer, Product):
+        post_save.connect(index_on_save, sender=model)
+        post_delete.connect(unindex_on_delete, sender=model)
+
+    connection_created.connect(install_query_wrapper)
+    connection_created.connect(apply_sqlite_pragmas)
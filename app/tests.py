@@ -1,3 +1,2228 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import math
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import zlib
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock, skipUnless
+from urllib.parse import urlencode
 
-# Create your tests here.
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command, CommandError
+from django.db import IntegrityError, connection, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models import Count, Prefetch
+from django.http import QueryDict
+from django.test import (
+    Client,
+    SimpleTestCase,
+    TestCase as DjangoTestCase,
+    TransactionTestCase,
+)
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+
+from . import pagination, search, urls
+from .cache import get_cache, get_versions
+from .compression import get_encoding
+from .endpoints import get_requests
+from .fast_serializer import FastOrderSerializer
+from .db import PIN_COOKIE, get_read_alias
+from .metrics import CONTENT_TYPE, registry
+from .models import (
+    Customer,
+    Product,
+    Order,
+    Order_item,
+    ImportProgress,
+    Sequence,
+    DailyProductSales,
+    DailyCustomerSales,
+)
+from .renderers import CompactJSONRenderer
+from .schema import check_schema, get_schema, read_schema
+from .seed import seed
+from .serializer import CustomerSerializer, OrderSerializer, ProductSerializer
+from .totals import rebuild_totals
+from .utils import SequenceAllocator
+from .views import (
+    CustomersAPI,
+    ProductsAPI,
+    OrdersAPI,
+    OrdersExportAPI,
+    filter_orders,
+)
+
+
+class TestCase(DjangoTestCase):
+    """Starts every test with an empty response cache and metrics registry."""
+
+    def setUp(self):
+        super().setUp()
+        get_cache().clear()
+        registry.clear()
+
+
+class PaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customers = Customer.objects.bulk_create(
+            Customer(name=f"customer {i}", contact_number="9999999999", email="a@b.c")
+            for i in range(7)
+        )
+        cls.product = Product.objects.create(name="pen", weight="1.00")
+        cls.orders = Order.objects.bulk_create(
+            Order(
+                order_number=f"ORD{i:05d}",
+                customer=cls.customers[i % 2],
+                order_date=date.today(),
+                address="street",
+            )
+            for i in range(7)
+        )
+        Order_item.objects.bulk_create(
+            Order_item(order=order, product=cls.product, quantity=1, weight="1.00")
+            for order in cls.orders[::2]
+        )
+
+    def walk(self, url, params=None, key="next"):
+        ids, pages = [], 0
+        params = dict(params or {}, limit=3)
+        while True:
+            body = self.client.get(url, params).json()
+            self.assertEqual(body["code"], 200)
+            ids.extend(row["id"] for row in body["data"])
+            pages += 1
+            if not body[key]:
+                return ids, pages, body
+            params["cursor"] = body[key]
+
+    def test_customers_are_paged_forward_by_id(self):
+        ids, pages, _ = self.walk(reverse("create-customers"))
+        self.assertEqual(ids, [c.id for c in self.customers])
+        self.assertEqual(pages, 3)
+
+    def test_previous_cursor_returns_the_preceding_page(self):
+        url = reverse("create-products")
+        Product.objects.bulk_create(
+            Product(name=f"product {i}", weight="1.00") for i in range(5)
+        )
+        first = self.client.get(url, {"limit": 2}).json()
+        self.assertIsNone(first["previous"])
+        second = self.client.get(url, {"limit": 2, "cursor": first["next"]}).json()
+        back = self.client.get(url, {"limit": 2, "cursor": second["previous"]}).json()
+        self.assertEqual(back["data"], first["data"])
+        self.assertEqual(back["next"], first["next"])
+
+    def test_orders_are_paginated_within_filters(self):
+        ids, _, _ = self.walk(reverse("create-orders"), {"customer": "customer 0"})
+        self.assertEqual(ids, [o.id for o in self.orders[::2]])
+
+        ids, _, _ = self.walk(reverse("create-orders"), {"products": "pen"})
+        self.assertEqual(ids, [o.id for o in self.orders[::2]])
+
+    def test_cursor_from_other_filters_is_rejected(self):
+        url = reverse("create-orders")
+        page = self.client.get(url, {"limit": 1}).json()
+        body = self.client.get(
+            url, {"customer": "customer 0", "cursor": page["next"]}
+        ).json()
+        self.assertEqual(body["code"], 400)
+        self.assertIn("cursor", body["data"])
+
+    def test_garbage_cursor_is_rejected(self):
+        body = self.client.get(reverse("create-customers"), {"cursor": "???"}).json()
+        self.assertEqual(body["code"], 400)
+
+    def test_cursor_out_of_the_id_range_is_rejected(self):
+        for position in (2**64, -(2**64)):
+            cursor = pagination.encode_cursor(position, False, {})
+            body = self.client.get(
+                reverse("create-customers"), {"cursor": cursor}
+            ).json()
+            self.assertEqual(body["code"], 400)
+            self.assertIn("cursor", body["data"])
+
+    def test_pages_do_not_use_offset_or_count(self):
+        page = self.client.get(reverse("create-customers"), {"limit": 2}).json()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(
+                reverse("create-customers"), {"limit": 2, "cursor": page["next"]}
+            )
+        for query in queries.captured_queries:
+            self.assertNotIn("OFFSET", query["sql"])
+            self.assertNotIn("COUNT(", query["sql"])
+
+
+class QueryBudgetMixin:
+    """
+    Runs one request per ``(url name, method)`` in ``query_budgets`` at every
+    size in ``row_counts`` and fails when a request goes over its budget.
+    A budget is a number of queries, or a callable taking the row count for
+    endpoints that are expected to scale (exports).
+    Subclasses provide ``budget_requests()`` returning ``{key: (url, data)}``.
+    """
+
+    query_budgets = {}
+    row_counts = (10, 100, 1_000, 10_000)
+
+    def seed_rows(self, count):
+        seed(
+            customers=count - Customer.objects.count(),
+            products=count - Product.objects.count(),
+            orders=count - Order.objects.count(),
+        )
+
+    def assertWithinQueryBudgets(self):
+        for count in self.row_counts:
+            self.seed_rows(count)
+            for (name, method), (url, data) in self.budget_requests().items():
+                budget = self.query_budgets[(name, method)]
+                if callable(budget):
+                    budget = budget(count)
+                with self.subTest(rows=count, url=name, method=method):
+                    with CaptureQueriesContext(connection) as queries:
+                        response = getattr(self.client, method)(
+                            url, data, content_type="application/json"
+                        )
+                        if response.streaming:
+                            b"".join(response.streaming_content)
+                    if not response.streaming:
+                        self.assertIn(response.json()["code"], (200, 404))
+                    self.assertLessEqual(
+                        len(queries),
+                        budget,
+                        "\n".join(query["sql"] for query in queries),
+                    )
+
+
+class OrderDataMixin:
+    """
+    Order payloads over ``self.products``: ``quantities[i]`` of the i-th
+    product, zero quantities left out. The customer defaults to
+    ``self.customer``.
+    """
+
+    def order_data(self, quantities=(2,), customer=None, day=None, **overrides):
+        customer = self.customer if customer is None else customer
+        return dict(
+            {
+                "customer": getattr(customer, "id", customer),
+                "order_date": (day or date.today()).isoformat(),
+                "address": "street",
+                "order_items": [
+                    {"product": product.id, "quantity": quantity}
+                    for product, quantity in zip(self.products, quantities)
+                    if quantity
+                ],
+            },
+            **overrides,
+        )
+
+    def create_order(self, quantities, **kwargs):
+        body = self.client.post(
+            reverse("create-orders"),
+            self.order_data(quantities, **kwargs),
+            content_type="application/json",
+        ).json()
+        self.assertEqual(body["code"], 200, body)
+        return Order.objects.get(id=body["data"]["id"])
+
+
+class EndpointQueryBudgetTests(QueryBudgetMixin, TestCase):
+    # Budgets include the SAVEPOINT / RELEASE statements of atomic blocks,
+    # the search index write of customer and product saves, the two sales
+    # rollup upserts of order writes, the version query of cached reads and
+    # the version bumps of writes.
+    query_budgets = {
+        ("create-customers", "get"): 2,
+        ("create-customers", "post"): 5,
+        ("update-customers", "put"): 6,
+        ("create-products", "get"): 2,
+        ("create-products", "post"): 5,
+        ("create-orders", "get"): 2,
+        ("create-orders", "post"): 15,
+        ("cache-stats", "get"): 0,
+        ("search", "get"): 3,
+        # One orders query plus one items query per exported chunk (the
+        # orders created by the other budget requests may add a chunk).
+        ("export-orders", "get"): lambda rows: 2 + rows // 500,
+        ("bulk-create-orders", "post"): 15,
+        # Includes the locked read of the order and the UPDATE that shifts
+        # its totals.
+        ("update-orders", "put"): 18,
+        ("sales-analytics", "get"): 2,
+        ("async-customers", "get"): 1,
+        ("async-customer-detail", "get"): 1,
+        ("async-products", "get"): 1,
+        ("async-product-detail", "get"): 1,
+        ("async-orders", "get"): 2,
+        ("async-order-detail", "get"): 2,
+    }
+
+    def budget_requests(self):
+        return {key: request() for key, request in get_requests().items()}
+
+    def test_every_route_has_a_budget(self):
+        budgeted = {name for name, _ in self.query_budgets}
+        for pattern in urls.urlpatterns:
+            self.assertIn(pattern.name, budgeted)
+
+    def test_endpoints_stay_within_query_budgets(self):
+        self.assertWithinQueryBudgets()
+
+    def test_order_create_query_count_is_constant(self):
+        customer = Customer.objects.create(
+            name="ann", contact_number="9999999999", email="a@example.com"
+        )
+        products = Product.objects.bulk_create(
+            Product(name=f"product {i}", weight="1.00") for i in range(5)
+        )
+        counts = []
+        for count in (1, 5):
+            data = {
+                "customer": customer.id,
+                "order_date": date.today().isoformat(),
+                "address": "street",
+                "order_items": [
+                    {"product": product.id, "quantity": 1}
+                    for product in products[:count]
+                ],
+            }
+            # Leave out the order number block the allocator may fetch.
+            with mock.patch(
+                "app.views.Generate_Order_Number", return_value=f"ORD9000{count}"
+            ), CaptureQueriesContext(connection) as queries:
+                body = self.client.post(
+                    reverse("create-orders"), data, content_type="application/json"
+                ).json()
+            self.assertEqual(len(body["data"]["order_items"]), count)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_order_list_query_count_is_constant(self):
+        counts = []
+        for rows in (10, 200):
+            self.seed_rows(rows)
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse("create-orders"), {"limit": 500})
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+
+class BulkOrderTests(OrderDataMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = Customer.objects.create(
+            name="customer", contact_number="9999999999", email="a@b.c"
+        )
+        cls.products = [Product.objects.create(name="pen", weight="1.00")]
+
+    def post(self, orders):
+        return self.client.post(
+            reverse("bulk-create-orders"), orders, content_type="application/json"
+        ).json()
+
+    def test_reports_result_per_order(self):
+        body = self.post(
+            [self.order_data(), self.order_data(customer=0), self.order_data()]
+        )
+        self.assertEqual(body["code"], 200)
+        self.assertEqual(
+            [result["status"] for result in body["data"]],
+            ["created", "error", "created"],
+        )
+        self.assertIn("customer", body["data"][1]["errors"])
+        self.assertEqual(
+            [body["data"][0]["order_number"], body["data"][2]["order_number"]],
+            ["ORD00001", "ORD00002"],
+        )
+        self.assertEqual(Order_item.objects.filter(quantity=2).count(), 2)
+
+    def test_rejects_payload_that_is_not_a_list(self):
+        body = self.post(self.order_data())
+        self.assertEqual(body["code"], 400)
+        self.assertFalse(Order.objects.exists())
+
+    def test_writes_are_batched(self):
+        for count in (10, 100):
+            with CaptureQueriesContext(connection) as queries:
+                self.post([self.order_data() for _ in range(count)])
+            inserts = [q for q in queries if q["sql"].startswith("INSERT")]
+            self.assertEqual(len(inserts), 2)
+        order_numbers = list(Order.objects.values_list("order_number", flat=True))
+        self.assertEqual(len(set(order_numbers)), 110)
+        self.assertEqual(order_numbers, sorted(order_numbers))
+
+
+class SequenceAllocatorTests(TestCase):
+    def test_numbers_come_from_the_block_once_committed(self):
+        allocator = SequenceAllocator("test", block_size=10)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(allocator.allocate(3), [1, 2, 3])
+        with self.assertNumQueries(0):
+            self.assertEqual(allocator.allocate(2), [4, 5])
+        self.assertEqual(Sequence.objects.get(name="test").value, 10)
+
+    def test_uncommitted_block_is_not_reused(self):
+        allocator = SequenceAllocator("test", block_size=10)
+        self.assertEqual(allocator.allocate(1), [1])
+        self.assertEqual(allocator.allocate(1), [11])
+
+    def test_allocation_larger_than_a_block(self):
+        allocator = SequenceAllocator("test", block_size=10)
+        self.assertEqual(allocator.allocate(25), list(range(1, 26)))
+
+    def test_order_numbers_continue_from_existing_orders(self):
+        self.assertEqual(Sequence.objects.get(name="order_number").value, 0)
+        customer = Customer.objects.create(
+            name="customer", contact_number="9999999999", email="a@b.c"
+        )
+        product = Product.objects.create(name="pen", weight="1.00")
+        body = self.client.post(
+            reverse("create-orders"),
+            {
+                "customer": customer.id,
+                "order_date": date.today().isoformat(),
+                "address": "street",
+                "order_items": [{"product": product.id, "quantity": 1}],
+            },
+            content_type="application/json",
+        ).json()
+        self.assertEqual(body["data"]["order_number"], "ORD00001")
+
+
+def allocate_numbers(allocator, rounds):
+    numbers = []
+    for size in range(rounds):
+        numbers.extend(allocator.allocate(size % 3 + 1))
+    connections[allocator.using].close()
+    return numbers
+
+
+def allocate_in_process(alias, rounds):
+    return allocate_numbers(
+        SequenceAllocator("order_number", block_size=7, using=alias), rounds
+    )
+
+
+class SequenceConcurrencyTests(SimpleTestCase):
+    """
+    Threads and forked processes allocate from the same sequence row in a
+    SQLite file; no number may be handed out twice.
+    """
+
+    alias = "sequence_concurrency"
+    rounds = 40
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(handle)
+        connections.settings[self.alias] = dict(
+            connections.settings["default"], NAME=self.path, OPTIONS={"timeout": 30}
+        )
+        with connections[self.alias].schema_editor() as editor:
+            editor.create_model(Sequence)
+        connections[self.alias].close()
+
+    def tearDown(self):
+        connections[self.alias].close()
+        del connections[self.alias]
+        del connections.settings[self.alias]
+        os.remove(self.path)
+
+    def test_threads_and_processes_never_share_numbers(self):
+        shared = SequenceAllocator("order_number", block_size=7, using=self.alias)
+        allocators = [shared] * 4 + [
+            SequenceAllocator("order_number", block_size=7, using=self.alias)
+            for _ in range(4)
+        ]
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda allocator: results.append(
+                    allocate_numbers(allocator, self.rounds)
+                ),
+                args=[allocator],
+            )
+            for allocator in allocators
+        ]
+
+        with multiprocessing.get_context("fork").Pool(4) as pool:
+            processes = pool.starmap_async(
+                allocate_in_process, [(self.alias, self.rounds)] * 4
+            )
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            results.extend(processes.get(timeout=60))
+
+        numbers = [number for numbers in results for number in numbers]
+        per_worker = sum(size % 3 + 1 for size in range(self.rounds))
+        self.assertEqual(len(numbers), 12 * per_worker)
+        self.assertEqual(len(numbers), len(set(numbers)))
+
+
+class SqlitePragmaTests(SimpleTestCase):
+    alias = "sqlite_pragmas"
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(handle)
+        connections.settings[self.alias] = dict(
+            connections.settings["default"], NAME=self.path
+        )
+
+    def tearDown(self):
+        connections[self.alias].close()
+        del connections[self.alias]
+        del connections.settings[self.alias]
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+    def pragma(self, name):
+        with connections[self.alias].cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_default_profile_keeps_sqlite_defaults(self):
+        self.assertEqual(self.pragma("journal_mode"), "delete")
+
+    def test_production_pragmas_are_applied_to_new_connections(self):
+        pragmas = {
+            "journal_mode": "wal",
+            "synchronous": "normal",
+            "busy_timeout": 5000,
+            "cache_size": -64000,
+        }
+        with override_settings(SQLITE_PRAGMAS=pragmas):
+            self.assertEqual(self.pragma("journal_mode"), "wal")
+            self.assertEqual(self.pragma("synchronous"), 1)
+            self.assertEqual(self.pragma("busy_timeout"), 5000)
+            self.assertEqual(self.pragma("cache_size"), -64000)
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class ReplicaRouterTests(TestCase):
+    """The replica is a separate, empty SQLite file, so lag is easy to see."""
+
+    alias = "replica"
+
+    def setUp(self):
+        super().setUp()
+        handle, self.path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(handle)
+        connections.settings[self.alias] = dict(
+            connections.settings["default"], NAME=self.path
+        )
+        with connections[self.alias].schema_editor() as editor:
+            for model in apps.get_app_config("app").get_models():
+                editor.create_model(model)
+        Customer.objects.using(self.alias).create(
+            name="replica customer", contact_number="1", email="a@example.com"
+        )
+        Customer.objects.create(
+            name="primary customer", contact_number="1", email="a@example.com"
+        )
+        Product.objects.create(name="pen", weight="1.00")
+
+    def tearDown(self):
+        connections[self.alias].close()
+        del connections[self.alias]
+        del connections.settings[self.alias]
+        os.remove(self.path)
+        super().tearDown()
+
+    def names(self, client, url_name):
+        body = client.get(reverse(url_name)).json()
+        return [row["name"] for row in body["data"]] if body["code"] == 200 else []
+
+    def test_list_reads_go_to_the_replica(self):
+        self.assertEqual(
+            self.names(self.client, "create-customers"), ["replica customer"]
+        )
+        self.assertEqual(self.names(self.client, "create-products"), [])
+        customer = Customer.objects.get()
+        Order.objects.create(
+            customer=customer,
+            order_number="ORD00001",
+            order_date=date.today(),
+            address="street",
+        )
+        self.assertEqual(self.client.get(reverse("create-orders")).json()["code"], 404)
+
+    def test_writes_go_to_the_primary_and_pin_the_client(self):
+        response = self.client.post(
+            reverse("create-customers"),
+            {"name": "new", "contact_number": "1", "email": "a@example.com"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.json()["code"], 200)
+        self.assertEqual(response.cookies[PIN_COOKIE]["max-age"], 10)
+        self.assertTrue(Customer.objects.filter(name="new").exists())
+        self.assertFalse(Customer.objects.using(self.alias).filter(name="new"))
+
+        # The writer reads its own write, other clients still use the replica.
+        self.assertEqual(
+            self.names(self.client, "create-customers"),
+            ["primary customer", "new"],
+        )
+        self.assertEqual(self.names(Client(), "create-customers"), ["replica customer"])
+
+    def test_cached_replica_reads_follow_the_replica(self):
+        self.assertEqual(self.names(Client(), "create-customers"), ["replica customer"])
+
+        # The replica catches up with the primary (no signals, like a sync).
+        Customer.objects.using(self.alias).bulk_create(
+            [Customer(name="primary customer", contact_number="1", email="a@b.c")]
+        )
+        Sequence.objects.using(self.alias).bulk_create(
+            [Sequence(name="version:app.customer", value=get_versions(Customer)[0])]
+        )
+        self.assertEqual(
+            self.names(Client(), "create-customers"),
+            ["replica customer", "primary customer"],
+        )
+
+    def test_etag_does_not_depend_on_the_database(self):
+        url = reverse("create-products")
+        Sequence.objects.using(self.alias).bulk_create(
+            [Sequence(name="version:app.product", value=get_versions(Product)[0])]
+        )
+        pinned = Client()
+        pinned.cookies[PIN_COOKIE] = "1"
+        etag = Client().get(url)["ETag"]
+        self.assertEqual(pinned.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_other_reads_use_the_primary(self):
+        self.assertEqual(get_read_alias(), "default")
+        body = self.client.get(reverse("search"), {"q": "primary"}).json()
+        self.assertEqual(body["code"], 200)
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas_no_pin(self):
+        response = self.client.post(
+            reverse("create-products"),
+            {"name": "pen", "weight": "1.00"},
+            content_type="application/json",
+        )
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+
+class OrderFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice, cls.bob = Customer.objects.bulk_create(
+            [
+                Customer(name="alice", contact_number="1", email="a@example.com"),
+                Customer(name="bob", contact_number="2", email="b@example.com"),
+            ]
+        )
+        pen, book, lamp = Product.objects.bulk_create(
+            [
+                Product(name="pen", weight="0.25"),
+                Product(name="book", weight="1.50"),
+                Product(name="lamp", weight="4.00"),
+            ]
+        )
+        cls.orders = []
+        for number, (customer, day, address, products) in enumerate(
+            [
+                (cls.alice, date(2024, 1, 10), "12 Main Street", [pen, book]),
+                (cls.alice, date(2024, 2, 15), "7 Park Lane", [pen]),
+                (cls.bob, date(2024, 2, 20), "12 Mill Road", [book, lamp]),
+                (cls.bob, date(2024, 3, 1), "12 main street", [pen, book, lamp]),
+            ]
+        ):
+            order = Order.objects.create(
+                order_number=f"ORD{number:05}",
+                customer=customer,
+                order_date=day,
+                address=address,
+            )
+            Order_item.objects.bulk_create(
+                Order_item(
+                    order=order, product=product, quantity=1, weight=product.weight
+                )
+                for product in products
+            )
+            cls.orders.append(order)
+
+    def get_ids(self, name, params):
+        body = self.client.get(reverse(name), params).json()
+        return [order["id"] for order in body["data"]] if body["code"] == 200 else []
+
+    def test_filters_combine(self):
+        o1, o2, o3, o4 = self.orders
+        for params, expected in [
+            ({"customer": "alice"}, [o1, o2]),
+            ({"customer_id": self.bob.id}, [o3, o4]),
+            ({"products": "book"}, [o1, o3, o4]),
+            ({"products": "pen,lamp"}, [o1, o2, o3, o4]),
+            ({"products": "pen,lamp", "products_match": "all"}, [o4]),
+            ({"products": "pen,book,pen", "products_match": "all"}, [o1, o4]),
+            ({"products": "nothing"}, []),
+            ({"start": "2024-02-01", "end": "2024-02-29"}, [o2, o3]),
+            ({"start": "2024-02-20"}, [o3, o4]),
+            ({"address": "12 M"}, [o1, o3]),
+            ({"customer": "bob", "products": "pen"}, [o4]),
+            ({"customer": "alice", "products": "book", "end": "2024-01-31"}, [o1]),
+            ({"customer": "alice", "customer_id": self.bob.id}, []),
+            ({"products": "", "customer": ""}, [o1, o2, o3, o4]),
+        ]:
+            for name in ("create-orders", "async-orders"):
+                with self.subTest(url=name, params=params):
+                    self.assertEqual(
+                        self.get_ids(name, params), [order.id for order in expected]
+                    )
+
+    def test_cursor_keeps_the_filters(self):
+        params = {"customer": "bob", "products": "book", "limit": 1}
+        body = self.client.get(reverse("create-orders"), params).json()
+        self.assertEqual(body["data"][0]["id"], self.orders[2].id)
+
+        cursor = body["next"]
+        body = self.client.get(reverse("create-orders"), dict(params, cursor=cursor))
+        self.assertEqual(body.json()["data"][0]["id"], self.orders[3].id)
+
+        params["products_match"] = "all"
+        body = self.client.get(reverse("create-orders"), dict(params, cursor=cursor))
+        self.assertEqual(body.json()["code"], 400)
+
+    def test_invalid_filters(self):
+        for params, field in [
+            ({"start": "2024-13-01"}, "start"),
+            ({"customer_id": "x"}, "customer_id"),
+            ({"customer_id": "99999999999999999999"}, "customer_id"),
+            ({"customer_id": "0"}, "customer_id"),
+            ({"products_match": "some"}, "products_match"),
+            ({"start": "2024-02-01", "end": "2024-01-01"}, "non_field_errors"),
+        ]:
+            with self.subTest(params=params):
+                body = self.client.get(reverse("create-orders"), params).json()
+                self.assertEqual(body["code"], 400)
+                self.assertIn(field, body["data"])
+
+    def explain(self, params):
+        orders, _ = filter_orders(
+            OrdersAPI().get_queryset(), QueryDict(urlencode(params))
+        )
+        orders = FastOrderSerializer.prepare(orders).order_by("id")[:51]
+        return str(orders.query), orders.explain()
+
+    @skipUnless(connection.vendor == "sqlite", "SQLite query plans")
+    def test_query_plans_use_the_indexes(self):
+        for params, index in [
+            ({"customer_id": self.bob.id, "start": "2024-02-01"}, "customer_date"),
+            ({"start": "2024-02-01", "end": "2024-02-29"}, "order_date"),
+            ({"address": "12 M"}, "address"),
+        ]:
+            with self.subTest(params=params):
+                _, plan = self.explain(params)
+                self.assertIn(f"INDEX app_order_{index} (", plan)
+
+        for match in ("any", "all"):
+            with self.subTest(products_match=match):
+                sql, plan = self.explain(
+                    {"products": "pen,book", "products_match": match}
+                )
+                self.assertIn("EXISTS", sql)
+                self.assertNotIn("DISTINCT", sql)
+                self.assertIn(
+                    "SEARCH U0 USING COVERING INDEX app_order_item_order_product", plan
+                )
+                self.assertNotIn("SCAN U0", plan)
+
+
+class OrderValidationTests(OrderDataMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = Customer.objects.create(
+            name="customer", contact_number="9999999999", email="a@b.c"
+        )
+        cls.products = Product.objects.bulk_create(
+            Product(name=f"product {i}", weight="0.10") for i in range(200)
+        )
+
+    def test_products_are_resolved_with_one_query(self):
+        serializer = OrderSerializer(
+            data=self.order_data(
+                order_items=[
+                    {"product": product.id, "quantity": 1} for product in self.products
+                ]
+            )
+        )
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+        product_queries = [q for q in queries if '"app_product"' in q["sql"]]
+        self.assertEqual(len(product_queries), 1)
+        self.assertEqual(len(queries), 2)
+
+    def test_item_errors_are_unchanged(self):
+        serializer = OrderSerializer(
+            data=self.order_data(
+                order_items=[
+                    {"product": self.products[0].id, "quantity": 1},
+                    {"product": 0, "quantity": 1},
+                    {"product": "abc", "quantity": 1},
+                    {"product": True, "quantity": 1},
+                ]
+            )
+        )
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(
+            serializer.errors["order_items"],
+            [
+                {},
+                {"product": ['Invalid pk "0" - object does not exist.']},
+                {"product": ["Incorrect type. Expected pk value, received str."]},
+                {"product": ["Incorrect type. Expected pk value, received bool."]},
+            ],
+        )
+
+    def test_weight_limit_uses_the_fetched_products(self):
+        serializer = OrderSerializer(
+            data=self.order_data(
+                order_items=[
+                    {"product": product.id, "quantity": 8} for product in self.products
+                ]
+            )
+        )
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(
+            serializer.errors["non_field_errors"],
+            ["In a order wight can not be more than 150kg."],
+        )
+
+
+class OrderUpdateTests(OrderDataMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = Customer.objects.create(
+            name="customer", contact_number="9999999999", email="a@b.c"
+        )
+        cls.products = Product.objects.bulk_create(
+            Product(name=f"product {i}", weight="0.10") for i in range(120)
+        )
+
+    def put(self, order, quantities):
+        return self.client.put(
+            reverse("update-orders", args=[order.id]),
+            self.order_data(quantities, address="new street"),
+            content_type="application/json",
+        ).json()
+
+    def test_items_are_inserted_changed_and_removed(self):
+        order = self.create_order([1, 1, 1])
+        unchanged = order.order_items.get(product=self.products[0])
+        body = self.put(order, [1, 5, 0, 2])
+        self.assertEqual(body["code"], 200)
+        self.assertEqual(
+            body["data"]["order_items"],
+            [
+                {"product": self.products[0].id, "quantity": 1},
+                {"product": self.products[1].id, "quantity": 5},
+                {"product": self.products[3].id, "quantity": 2},
+            ],
+        )
+        self.assertEqual(order.order_items.get(product=self.products[0]), unchanged)
+        self.assertEqual(Order.objects.get().address, "new street")
+
+    def test_unchanged_items_are_not_written(self):
+        order = self.create_order([1, 2, 3])
+        with CaptureQueriesContext(connection) as queries:
+            self.put(order, [1, 2, 3])
+        item_writes = [
+            q
+            for q in queries
+            if '"app_order_item"' in q["sql"] and not q["sql"].startswith("SELECT")
+        ]
+        self.assertEqual(item_writes, [])
+
+    def test_query_count_does_not_depend_on_item_count(self):
+        counts = []
+        for size in (20, 100):
+            order = self.create_order([1] * size)
+            half = size // 2
+            with CaptureQueriesContext(connection) as queries:
+                self.put(order, [0] * 5 + [2] * (half - 5) + [1] * half + [3] * 10)
+            counts.append(len(queries))
+            order.delete()
+        self.assertEqual(counts[0], counts[1])
+
+
+class OrderTotalsTests(OrderDataMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = Customer.objects.create(
+            name="customer", contact_number="9999999999", email="a@example.com"
+        )
+        cls.products = Product.objects.bulk_create(
+            [
+                Product(name="pen", weight="0.25"),
+                Product(name="book", weight="1.50"),
+                Product(name="lamp", weight="4.00"),
+            ]
+        )
+
+    def assertTotals(self, order, total_weight, item_count):
+        order.refresh_from_db()
+        self.assertEqual(
+            (order.total_weight, order.item_count),
+            (Decimal(total_weight), item_count),
+        )
+        expected = (order.total_weight, order.item_count)
+        rebuild_totals(Order.objects.filter(pk=order.pk))
+        order.refresh_from_db()
+        self.assertEqual((order.total_weight, order.item_count), expected)
+
+    def test_create_and_update_keep_totals(self):
+        order = self.create_order([2, 1])
+        self.assertTotals(order, "2.00", 3)
+
+        body = self.client.put(
+            reverse("update-orders", args=[order.id]),
+            self.order_data([0, 3, 1]),
+            content_type="application/json",
+        ).json()
+        self.assertEqual(body["data"]["total_weight"], "8.50")
+        self.assertEqual(body["data"]["item_count"], 4)
+        self.assertTotals(order, "8.50", 4)
+
+    def test_totals_are_read_only(self):
+        data = dict(self.order_data([1]), total_weight="99.00", item_count=99)
+        order = self.client.post(
+            reverse("create-orders"), data, content_type="application/json"
+        ).json()["data"]
+        self.assertEqual((order["total_weight"], order["item_count"]), ("0.25", 1))
+
+    def test_bulk_create_stores_totals(self):
+        body = self.client.post(
+            reverse("bulk-create-orders"),
+            [self.order_data([4]), self.order_data([0, 0, 2])],
+            content_type="application/json",
+        ).json()
+        orders = Order.objects.filter(
+            id__in=[result["id"] for result in body["data"]]
+        ).order_by("id")
+        self.assertEqual(
+            [(order.total_weight, order.item_count) for order in orders],
+            [(Decimal("1.00"), 4), (Decimal("8.00"), 2)],
+        )
+
+    def test_filter_by_weight(self):
+        light = self.create_order([1])
+        heavy = self.create_order([0, 0, 3])
+        for params, expected in [
+            ({"min_weight": "1"}, [heavy]),
+            ({"max_weight": "0.25"}, [light]),
+            ({"min_weight": "0.25", "max_weight": "12"}, [light, heavy]),
+        ]:
+            for name in ("create-orders", "async-orders"):
+                with self.subTest(url=name, params=params):
+                    body = self.client.get(reverse(name), params).json()
+                    self.assertEqual(
+                        [order["id"] for order in body["data"]],
+                        [order.id for order in expected],
+                    )
+
+        body = self.client.get(reverse("create-orders"), {"min_weight": "x"}).json()
+        self.assertEqual(body["code"], 400)
+        self.assertIn("min_weight", body["data"])
+
+    def test_admin_keeps_totals(self):
+        order = self.create_order([2, 1])
+        self.client.force_login(
+            User.objects.create_superuser("admin", "admin@example.com", "admin")
+        )
+
+        item = order.order_items.get(product=self.products[0])
+        self.client.post(
+            reverse("admin:app_order_item_change", args=[item.id]),
+            {"order": order.id, "product": self.products[2].id, "quantity": 1},
+        )
+        self.assertTotals(order, "5.50", 2)
+
+        pen, book, lamp = self.products
+        self.client.post(
+            reverse("admin:app_product_change", args=[lamp.id]),
+            {"name": "lamp", "weight": "5.00"},
+        )
+        self.assertTotals(order, "6.50", 2)
+
+        self.client.post(
+            reverse("admin:app_order_item_delete", args=[item.id]), {"post": "yes"}
+        )
+        self.assertTotals(order, "1.50", 1)
+
+        self.client.post(
+            reverse("admin:app_product_delete", args=[book.id]), {"post": "yes"}
+        )
+        self.assertTotals(order, "0", 0)
+
+    def test_rebuild_command(self):
+        orders = [self.create_order([1, 2]), self.create_order([0, 1, 1])]
+        Order.objects.update(total_weight=0, item_count=0)
+        out = io.StringIO()
+        call_command("rebuild_order_totals", batch_size=1, stdout=out)
+        self.assertIn("2 orders", out.getvalue())
+        self.assertTotals(orders[0], "3.25", 3)
+        self.assertTotals(orders[1], "5.50", 2)
+
+
+class SalesRollupTests(OrderDataMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customers = Customer.objects.bulk_create(
+            Customer(name=name, contact_number="1", email=f"{name}@example.com")
+            for name in ("ann", "bob")
+        )
+        cls.products = Product.objects.bulk_create(
+            [
+                Product(name="pen", weight="0.10"),
+                Product(name="book", weight="1.25"),
+                Product(name="lamp", weight="4.00"),
+            ]
+        )
+        cls.today = date.today()
+        cls.tomorrow = cls.today + timedelta(days=1)
+
+    def get_sales(self):
+        return {
+            model: sorted(
+                model.objects.filter(quantity__gt=0).values_list(
+                    key, "day", "quantity", "weight"
+                )
+            )
+            for model, key in (
+                (DailyProductSales, "product_id"),
+                (DailyCustomerSales, "customer_id"),
+            )
+        }
+
+    def get_expected_sales(self):
+        # Aggregate the order history, the query the rollups replace.
+        items = Order_item.objects.all()
+        expected = {}
+        for model, key in (
+            (DailyProductSales, "product_id"),
+            (DailyCustomerSales, "order__customer_id"),
+        ):
+            totals = {}
+            for item in items.values(key, "order__order_date", "quantity", "weight"):
+                total = totals.setdefault(
+                    (item[key], item["order__order_date"]), [0, 0]
+                )
+                total[0] += item["quantity"]
+                total[1] += item["weight"]
+            expected[model] = sorted(
+                (key_id, day, quantity, weight)
+                for (key_id, day), (quantity, weight) in totals.items()
+            )
+        return expected
+
+    def test_order_writes_update_rollups(self):
+        ann, bob = self.customers
+        first = self.create_order([3, 1], customer=ann)
+        self.create_order([7], customer=bob)
+        self.client.post(
+            reverse("bulk-create-orders"),
+            [self.order_data([0, 2, 1], customer=ann, day=self.tomorrow)],
+            content_type="application/json",
+        )
+        self.assertEqual(self.get_sales(), self.get_expected_sales())
+        self.assertEqual(
+            DailyProductSales.objects.get(product=self.products[0]).weight,
+            Decimal("1.00"),
+        )
+
+        for data in [
+            self.order_data([1, 1, 2], customer=ann),
+            self.order_data([1, 1, 2], customer=bob),
+            self.order_data([0, 4], customer=bob, day=self.tomorrow),
+        ]:
+            with self.subTest(data=data):
+                self.client.put(
+                    reverse("update-orders", args=[first.id]),
+                    data,
+                    content_type="application/json",
+                )
+                self.assertEqual(self.get_sales(), self.get_expected_sales())
+
+    def test_update_diffs_against_the_stored_order(self):
+        ann, bob = self.customers
+        order = self.create_order([1, 1], customer=ann)
+        # Loaded before another request updates the order.
+        stale = Order.objects.get(pk=order.id)
+        self.client.put(
+            reverse("update-orders", args=[order.id]),
+            self.order_data([0, 2, 1], customer=bob, day=self.tomorrow),
+            content_type="application/json",
+        )
+
+        serializer = OrderSerializer(
+            instance=stale,
+            data=self.order_data([3, 0, 1], customer=ann),
+        )
+        self.assertTrue(serializer.is_valid())
+        serializer.save()
+        self.assertEqual(self.get_sales(), self.get_expected_sales())
+        order.refresh_from_db()
+        self.assertEqual((order.total_weight, order.item_count), (Decimal("4.30"), 4))
+        self.assertEqual(
+            (serializer.data["total_weight"], serializer.data["item_count"]),
+            ("4.30", 4),
+        )
+
+    def test_update_subtracts_the_counted_weight(self):
+        ann, _ = self.customers
+        pen, book, _ = self.products
+        order = self.create_order([3, 1], customer=ann)
+        Product.objects.filter(pk=pen.pk).update(weight="0.50")
+        self.client.put(
+            reverse("update-orders", args=[order.id]),
+            self.order_data([0, 1, 1], customer=ann),
+            content_type="application/json",
+        )
+        self.assertEqual(self.get_sales(), self.get_expected_sales())
+        sales = DailyProductSales.objects.get(product=pen)
+        self.assertEqual((sales.quantity, sales.weight), (0, Decimal("0.00")))
+
+    def test_saves_and_deletes_outside_the_api_update_rollups(self):
+        ann, bob = self.customers
+        pen, book, lamp = self.products
+        first = self.create_order([3, 1], customer=ann)
+        second = self.create_order([1, 0, 1], customer=bob)
+        self.create_order([2, 2], customer=bob, day=self.tomorrow)
+        url = reverse("sales-analytics")
+        self.client.get(url)  # cached
+
+        def check():
+            self.assertEqual(self.get_sales(), self.get_expected_sales())
+            # The cached analytics follow the rollups.
+            cached = self.client.get(url).json()
+            get_cache().clear()
+            self.assertEqual(cached, self.client.get(url).json())
+
+        first.order_date = self.tomorrow
+        first.save()
+        check()
+
+        self.client.force_login(
+            User.objects.create_superuser("admin", "admin@example.com", "admin")
+        )
+        item = first.order_items.get(product=pen)
+        self.client.post(
+            reverse("admin:app_order_item_change", args=[item.id]),
+            {"order": first.id, "product": lamp.id, "quantity": 2},
+        )
+        check()
+
+        Order_item.objects.create(
+            order=first, product=Product.objects.get(pk=pen.pk), quantity=4
+        )
+        check()
+        second.delete()
+        check()
+        self.client.post(
+            reverse("admin:app_product_delete", args=[book.id]), {"post": "yes"}
+        )
+        check()
+        Customer.objects.filter(pk=bob.pk).delete()
+        check()
+        self.client.post(
+            reverse("admin:app_order_item_delete", args=[item.id]), {"post": "yes"}
+        )
+        check()
+        self.assertEqual(Order_item.objects.count(), 1)
+
+    def test_unchanged_update_does_not_write_rollups(self):
+        ann, _ = self.customers
+        order = self.create_order([1, 2], customer=ann)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.put(
+                reverse("update-orders", args=[order.id]),
+                self.order_data([1, 2], customer=ann),
+                content_type="application/json",
+            )
+        self.assertFalse([q for q in queries if "sales" in q["sql"]])
+
+    def test_analytics_endpoint(self):
+        ann, bob = self.customers
+        pen, book, _ = self.products
+        self.create_order([3, 1], customer=ann)
+        self.create_order([0, 5], customer=bob, day=self.tomorrow)
+        url = reverse("sales-analytics")
+
+        body = self.client.get(url).json()
+        self.assertEqual(
+            body["data"],
+            [
+                {"product": book.id, "quantity": 6, "weight": "7.50"},
+                {"product": pen.id, "quantity": 3, "weight": "0.30"},
+            ],
+        )
+        body = self.client.get(
+            url, {"by": "customers", "start": self.tomorrow.isoformat()}
+        ).json()
+        self.assertEqual(
+            body["data"], [{"customer": bob.id, "quantity": 5, "weight": "6.25"}]
+        )
+        body = self.client.get(url, {"id": book.id, "limit": 1}).json()
+        self.assertEqual(
+            body["data"],
+            [
+                {"day": self.today.isoformat(), "quantity": 1, "weight": "1.25"},
+                {"day": self.tomorrow.isoformat(), "quantity": 5, "weight": "6.25"},
+            ],
+        )
+
+        body = self.client.get(url, {"end": (self.today - timedelta(days=1))}).json()
+        self.assertEqual(body["code"], 404)
+        body = self.client.get(
+            url, {"start": self.tomorrow.isoformat(), "end": self.today.isoformat()}
+        ).json()
+        self.assertEqual(body["code"], 400)
+        body = self.client.get(url, {"by": "days"}).json()
+        self.assertIn("by", body["data"])
+        body = self.client.get(url, {"id": "99999999999999999999"}).json()
+        self.assertIn("id", body["data"])
+
+    def test_backfill_command(self):
+        ann, bob = self.customers
+        self.create_order([3, 1], customer=ann)
+        self.create_order([2, 0, 1], customer=bob, day=self.tomorrow)
+        self.create_order([1, 1, 1], customer=ann, day=self.tomorrow)
+        expected = self.get_sales()
+        DailyProductSales.objects.update(quantity=0)
+
+        out = io.StringIO()
+        call_command("backfill_sales", batch_size=2, stdout=out)
+        self.assertIn("3 orders", out.getvalue())
+        self.assertEqual(self.get_sales(), expected)
+
+
+class ImportDataTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as file:
+            file.write(content)
+        return path
+
+    def write_ndjson(self, name, rows):
+        return self.write(
+            name,
+            "".join(
+                row if isinstance(row, str) else json.dumps(row) + "\n" for row in rows
+            ),
+        )
+
+    def import_data(self, *args, **options):
+        out = io.StringIO()
+        call_command("import_data", *args, stdout=out, **options)
+        return out.getvalue()
+
+    def read_rejects(self, path):
+        with open(path + ".rejects.ndjson") as file:
+            return [json.loads(line) for line in file]
+
+    def test_import_customers_from_csv(self):
+        Customer.objects.create(name="taken", contact_number="1", email="t@example.com")
+        path = self.write(
+            "customers.csv",
+            "name,contact_number,email\n"
+            "Ann Smith,1,ann@example.com\n"
+            "taken,2,x@example.com\n"
+            "bob,3,not an email\n"
+            "Ann Smith,4,ann2@example.com\n"
+            "carl,5,carl@example.com\n",
+        )
+        out = self.import_data("customers", path, batch_size=2)
+        self.assertIn("Imported 2 customers, rejected 3", out)
+        self.assertEqual(
+            sorted(Customer.objects.values_list("name", flat=True)),
+            ["Ann Smith", "carl", "taken"],
+        )
+        rejects = self.read_rejects(path)
+        self.assertEqual([reject["row"] for reject in rejects], [2, 3, 4])
+        self.assertEqual(
+            rejects[0]["errors"], {"name": ["taken name is already exists"]}
+        )
+        self.assertIn("email", rejects[1]["errors"])
+        self.assertEqual(
+            rejects[2]["errors"], {"name": ["Ann Smith name is already exists"]}
+        )
+
+        # Imported rows are searchable and visible in the cached list.
+        body = self.client.get(reverse("search"), {"q": "smi"}).json()
+        self.assertEqual([row["name"] for row in body["data"]], ["Ann Smith"])
+
+    def test_import_products_from_ndjson(self):
+        path = self.write_ndjson(
+            "products.ndjson",
+            [
+                {"name": "pen", "weight": "0.10"},
+                {"name": "anvil", "weight": "30.00"},
+                "not json\n",
+                [1, 2],
+                {"name": "lamp", "weight": 4},
+            ],
+        )
+        out = self.import_data("products", path)
+        self.assertIn("Imported 2 products, rejected 3", out)
+        self.assertEqual(
+            [reject["row"] for reject in self.read_rejects(path)], [2, 3, 4]
+        )
+
+    def test_import_orders(self):
+        customer = Customer.objects.create(
+            name="ann", contact_number="1", email="ann@example.com"
+        )
+        pen = Product.objects.create(name="pen", weight="2.00")
+        anvil = Product.objects.create(name="anvil", weight="25.00")
+        past = date(2020, 1, 31)
+        items = [{"product": pen.id, "quantity": 3}]
+        path = self.write_ndjson(
+            "orders.ndjson",
+            [
+                {
+                    "customer": customer.id,
+                    "order_date": str(past),
+                    "address": "a",
+                    "order_items": items,
+                },
+                {
+                    "customer": customer.id,
+                    "order_date": str(past),
+                    "address": "b",
+                    "order_items": [{"product": anvil.id, "quantity": 7}],
+                },
+                {
+                    "customer": 0,
+                    "order_date": str(past),
+                    "address": "c",
+                    "order_items": items,
+                },
+            ],
+        )
+        out = self.import_data("orders", path)
+        self.assertIn("Imported 1 orders, rejected 2", out)
+        order = Order.objects.get()
+        self.assertEqual(
+            (order.order_date, order.total_weight, order.item_count),
+            (past, Decimal("6.00"), 3),
+        )
+        self.assertTrue(order.order_number.startswith("ORD"))
+        self.assertEqual(
+            DailyProductSales.objects.get(product=pen, day=past).quantity, 3
+        )
+        self.assertEqual(
+            [sorted(reject["errors"]) for reject in self.read_rejects(path)],
+            [["non_field_errors"], ["customer"]],
+        )
+
+    def test_csv_order_items_are_json(self):
+        customer = Customer.objects.create(
+            name="ann", contact_number="1", email="ann@example.com"
+        )
+        pen = Product.objects.create(name="pen", weight="2.00")
+        path = self.write(
+            "orders.csv",
+            "customer,order_date,address,order_items\n"
+            f'{customer.id},2020-01-31,street,"[{{""product"": {pen.id}, ""quantity"": 2}}]"\n'
+            f"{customer.id},2020-01-31,street,[oops\n",
+        )
+        out = self.import_data("orders", path)
+        self.assertIn("Imported 1 orders, rejected 1", out)
+        self.assertEqual(Order.objects.get().item_count, 2)
+
+    def test_resume_after_the_last_committed_chunk(self):
+        path = self.write_ndjson(
+            "customers.ndjson",
+            [
+                {
+                    "name": f"customer {i}",
+                    "contact_number": "1",
+                    "email": "c@example.com",
+                }
+                for i in range(5)
+            ]
+            + [{"name": "customer 0", "contact_number": "1", "email": "c@example.com"}],
+        )
+        save = ImportProgress.save
+
+        def fail_on_last_chunk(progress, *args, **kwargs):
+            # The last chunk is inserted and its reject written, then the
+            # process dies before the chunk commits.
+            if progress.rows == 6:
+                raise RuntimeError("interrupted")
+            return save(progress, *args, **kwargs)
+
+        with mock.patch.object(ImportProgress, "save", fail_on_last_chunk):
+            with self.assertRaises(RuntimeError):
+                self.import_data("customers", path, batch_size=2)
+        self.assertEqual(Customer.objects.count(), 4)
+        self.assertEqual([reject["row"] for reject in self.read_rejects(path)], [6])
+
+        out = self.import_data("customers", path, batch_size=2)
+        self.assertIn("Resuming after row 4", out)
+        self.assertIn("Imported 5 customers, rejected 1", out)
+        self.assertEqual(Customer.objects.count(), 5)
+        self.assertEqual([reject["row"] for reject in self.read_rejects(path)], [6])
+
+        out = self.import_data("customers", path)
+        self.assertIn("Imported 5 customers, rejected 1", out)
+        self.assertEqual(Customer.objects.count(), 5)
+
+        out = self.import_data("customers", path, restart=True)
+        self.assertIn("Imported 0 customers, rejected 6", out)
+
+
+class BenchmarkCommandTests(TestCase):
+    def test_seed_data(self):
+        out = io.StringIO()
+        call_command(
+            "seed_data", customers=20, products=50, orders=300, days=30, stdout=out
+        )
+        self.assertIn("Seeded 20 customers, 50 products and 300 orders", out.getvalue())
+        self.assertEqual(Order.objects.count(), 300)
+
+        counts = [order.order_items.count() for order in Order.objects.all()]
+        self.assertGreater(len(set(counts)), 3)
+        self.assertAlmostEqual(sum(counts) / len(counts), 3, delta=1)
+        sales = Order_item.objects.values("product").annotate(total=Count("id"))
+        top = max(row["total"] for row in sales)
+        self.assertGreater(top, 5 * min(row["total"] for row in sales))
+        self.assertGreater(Order.objects.values("order_date").distinct().count(), 20)
+        order = Order.objects.first()
+        self.assertEqual(
+            order.item_count,
+            sum(order.order_items.values_list("quantity", flat=True)),
+        )
+
+        Customer.objects.all().delete()
+        with self.assertRaises(CommandError):
+            call_command("seed_data", customers=0, products=0, orders=1, stdout=out)
+
+    def test_bench_endpoints_covers_every_route(self):
+        path = os.path.join(tempfile.mkdtemp(), "results.json")
+        self.addCleanup(os.remove, path)
+        call_command(
+            "bench_endpoints",
+            customers=5,
+            products=5,
+            orders=20,
+            requests=2,
+            output=path,
+            stdout=io.StringIO(),
+        )
+        with open(path) as file:
+            report = json.load(file)
+
+        self.assertEqual(
+            {key.split()[0] for key in report["results"]},
+            {pattern.name for pattern in urls.urlpatterns},
+        )
+        for key, result in report["results"].items():
+            with self.subTest(endpoint=key):
+                self.assertEqual(result["status"], 200)
+                self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+                self.assertIn("queries", result)
+                self.assertIn("peak_memory_kb", result)
+        # Benchmark rows are rolled back.
+        self.assertEqual(Order.objects.count(), 0)
+
+
+class MetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(customers=3, products=5, orders=8)
+
+    def setUp(self):
+        super().setUp()
+        registry.clear()
+
+    def get_metrics(self):
+        response = self.client.get("/metrics")
+        self.assertEqual(response["Content-Type"], CONTENT_TYPE)
+        samples = {}
+        for line in response.content.decode().splitlines():
+            if not line.startswith("#"):
+                name, value = line.rsplit(" ", 1)
+                samples[name] = float(value)
+        return samples
+
+    def test_request_metrics_per_route(self):
+        response = self.client.get(reverse("create-orders"))
+        samples = self.get_metrics()
+        labels = 'route="create-orders",method="GET"'
+        self.assertEqual(samples[f"app_request_duration_seconds_count{{{labels}}}"], 1)
+        self.assertEqual(samples[f'app_requests_total{{{labels},status="200"}}'], 1)
+        # The versions query, the orders and their items.
+        self.assertEqual(samples[f'app_sql_queries_bucket{{{labels},le="2"}}'], 0)
+        self.assertEqual(samples[f'app_sql_queries_bucket{{{labels},le="5"}}'], 1)
+        self.assertEqual(samples[f"app_sql_queries_sum{{{labels}}}"], 3)
+        self.assertGreater(samples[f"app_sql_duration_seconds_total{{{labels}}}"], 0)
+        self.assertGreater(
+            samples[f"app_serializer_duration_seconds_total{{{labels}}}"], 0
+        )
+        self.assertEqual(
+            samples[f"app_response_size_bytes_sum{{{labels}}}"],
+            len(response.content),
+        )
+        self.assertEqual(
+            samples[f'app_response_size_bytes_bucket{{{labels},le="+Inf"}}'], 1
+        )
+
+    def test_streamed_response_is_recorded_when_sent(self):
+        response = self.client.get(reverse("export-orders"))
+        self.assertNotIn("export-orders", self.client.get("/metrics").content.decode())
+        content = b"".join(response.streaming_content)
+
+        samples = self.get_metrics()
+        labels = 'route="export-orders",method="GET"'
+        self.assertEqual(samples[f"app_sql_queries_sum{{{labels}}}"], 2)
+        self.assertEqual(
+            samples[f"app_response_size_bytes_sum{{{labels}}}"], len(content)
+        )
+
+    async def test_async_views_are_recorded(self):
+        await self.async_client.get(reverse("async-orders"))
+        response = await self.async_client.get("/metrics")
+        self.assertIn(
+            'app_sql_queries_sum{route="async-orders",method="GET"} 2',
+            response.content.decode(),
+        )
+
+    def test_slow_request_log(self):
+        with self.assertNoLogs("app.slow_requests"):
+            self.client.get(reverse("create-customers"))
+        get_cache().clear()
+        with override_settings(SLOW_REQUEST_SECONDS=0):
+            with self.assertLogs("app.slow_requests") as logs:
+                self.client.get(reverse("create-customers"))
+        self.assertIn("2 queries", logs.output[0])
+        self.assertIn('FROM "app_customer"', logs.output[0])
+
+
+class UniqueNameTests(TestCase):
+    def post(self, name, data, **extra):
+        return self.client.post(
+            reverse(name), dict(data, **extra), content_type="application/json"
+        ).json()
+
+    def test_duplicate_names_return_the_same_errors(self):
+        customer = {
+            "name": "ann",
+            "contact_number": "9999999999",
+            "email": "a@example.com",
+        }
+        self.assertEqual(self.post("create-customers", customer)["code"], 200)
+        self.assertEqual(
+            self.post("create-customers", customer),
+            {
+                "code": 400,
+                "data": {"name": ["ann name is already exists"]},
+                "message": "Bad request",
+            },
+        )
+
+        product = {"name": "pen", "weight": "1.00"}
+        self.assertEqual(self.post("create-products", product)["code"], 200)
+        self.assertEqual(
+            self.post("create-products", product)["data"],
+            {"name": ["pen is already exists in products"]},
+        )
+        self.assertEqual(Product.objects.count(), 1)
+
+    def test_create_does_not_pre_check_the_name(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.post("create-products", {"name": "pen", "weight": "1.00"})
+        selects = [q for q in queries if q["sql"].startswith("SELECT")]
+        self.assertEqual(selects, [])
+
+    def test_customer_can_be_updated_without_renaming(self):
+        customer = Customer.objects.create(
+            name="ann", contact_number="9999999999", email="a@b.c"
+        )
+        Customer.objects.create(name="bob", contact_number="9999999999", email="a@b.c")
+        url = reverse("update-customers", args=[customer.id])
+        data = {"name": "ann", "contact_number": "8888888888", "email": "a@example.com"}
+        body = self.client.put(url, data, content_type="application/json").json()
+        self.assertEqual(body["code"], 200)
+
+        data["name"] = "bob"
+        body = self.client.put(url, data, content_type="application/json").json()
+        self.assertEqual(body["data"], {"name": ["bob name is already exists"]})
+        self.assertEqual(Customer.objects.get(id=customer.id).name, "ann")
+
+    def test_other_integrity_errors_are_not_name_errors(self):
+        data = {"name": "ann", "contact_number": "9999999999", "email": "a@example.com"}
+        serializer = CustomerSerializer(data=data)
+        self.assertTrue(serializer.is_valid())
+        error = IntegrityError("NOT NULL constraint failed: app_customer.email")
+        with mock.patch.object(Customer, "save", side_effect=error):
+            with self.assertRaises(IntegrityError):
+                serializer.save()
+
+
+class UniqueNamesMigrationTests(TransactionTestCase):
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate([("app", target)])
+        return executor.loader.project_state(("app", target)).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes("app")[0][1])
+
+    def test_duplicates_are_renamed_before_the_constraints(self):
+        old = self.migrate("0004_sequence")
+        Customer = old.get_model("app", "Customer")
+        Product = old.get_model("app", "Product")
+        Order = old.get_model("app", "Order")
+        old.get_model("app", "Sequence").objects.filter(name="order_number").update(
+            value=2
+        )
+        customers = [
+            Customer.objects.create(name="ann", contact_number="1", email="a@b.c")
+            for _ in range(2)
+        ]
+        Customer.objects.create(name="ann (%d)" % customers[1].id, email="a@b.c")
+        Product.objects.create(name="pen", weight=1)
+        pen = Product.objects.create(name="pen", weight=1)
+        orders = [
+            Order.objects.create(
+                order_number=number, customer=customers[0], order_date=date.today()
+            )
+            for number in ["ORD00001", "ORD00002", "ORD00002", "ORD00003"]
+        ]
+
+        new = self.migrate("0005_unique_names_and_indexes")
+        names = new.get_model("app", "Customer").objects.order_by("id")
+        self.assertEqual(
+            list(names.values_list("name", flat=True)),
+            [
+                "ann",
+                f"ann ({customers[1].id}) ({customers[1].id})",
+                f"ann ({customers[1].id})",
+            ],
+        )
+        self.assertEqual(
+            new.get_model("app", "Product").objects.get(id=pen.id).name,
+            f"pen ({pen.id})",
+        )
+        numbers = new.get_model("app", "Order").objects.order_by("id")
+        self.assertEqual(
+            list(numbers.values_list("order_number", flat=True)),
+            ["ORD00001", "ORD00002", "ORD00004", "ORD00003"],
+        )
+        self.assertEqual(
+            new.get_model("app", "Sequence").objects.get(name="order_number").value, 4
+        )
+
+
+class ResponseCacheTests(TestCase):
+    def test_hits_only_query_the_versions(self):
+        Product.objects.create(name="pen", weight="1.00")
+        url = reverse("create-products")
+        first = self.client.get(url)
+        with self.assertNumQueries(1):
+            second = self.client.get(url)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(first["Content-Type"], "application/json")
+        self.assertEqual(second["Content-Type"], "application/json")
+        stats = self.client.get(reverse("cache-stats")).json()["data"]
+        self.assertEqual(stats, {"hits": 1, "misses": 1})
+
+    def test_stats_survive_culling_of_the_cached_responses(self):
+        url = reverse("create-products")
+        self.client.get(url)
+        get_cache().clear()
+        self.client.get(url)
+        stats = self.client.get(reverse("cache-stats")).json()["data"]
+        self.assertEqual(stats, {"hits": 0, "misses": 2})
+        self.assertIn(
+            'app_response_cache_lookups_total{result="misses"} 2',
+            self.client.get(reverse("metrics")).content.decode(),
+        )
+
+    def test_writes_invalidate_cached_responses(self):
+        url = reverse("create-products")
+        product = Product.objects.create(name="pen", weight="1.00")
+        self.client.get(url)
+        product.weight = "2.00"
+        product.save()
+        body = self.client.get(url).json()
+        self.assertEqual(body["data"][0]["weight"], "2.00")
+
+        product.delete()
+        self.assertEqual(self.client.get(url).json()["code"], 404)
+
+        self.client.post(
+            reverse("create-products"),
+            {"name": "ink", "weight": "1.00"},
+            content_type="application/json",
+        )
+        self.assertEqual(self.client.get(url).json()["data"][0]["name"], "ink")
+
+    def test_query_string_is_part_of_the_key(self):
+        Customer.objects.bulk_create(
+            Customer(name=f"c{i}", contact_number="1", email="a@example.com")
+            for i in range(3)
+        )
+        url = reverse("create-customers")
+        self.assertEqual(len(self.client.get(url, {"limit": 1}).json()["data"]), 1)
+        self.assertEqual(len(self.client.get(url, {"limit": 2}).json()["data"]), 2)
+
+    def test_versions_are_shared_between_processes(self):
+        url = reverse("create-products")
+        product = Product.objects.create(name="pen", weight="1.00")
+        self.client.get(url)
+
+        # A write in another worker process, with a cache of its own.
+        other = dict(
+            settings.CACHES,
+            responses={
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "other worker",
+            },
+        )
+        before = get_versions(Product)[0]
+        with override_settings(CACHES=other):
+            product.weight = "2.00"
+            product.save()
+        self.assertEqual(get_versions(Product)[0], before + 1)
+        self.assertEqual(self.client.get(url).json()["data"][0]["weight"], "2.00")
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(customers=3, products=3, orders=5)
+
+    def test_matching_etag_is_answered_by_the_versions_query(self):
+        for name in ("create-customers", "create-products", "create-orders"):
+            url = reverse(name)
+            with self.subTest(url=name):
+                response = self.client.get(url, {"limit": 2})
+                etag = response["ETag"]
+                with self.assertNumQueries(1):
+                    response = self.client.get(
+                        url, {"limit": 2}, HTTP_IF_NONE_MATCH=etag
+                    )
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response["ETag"], etag)
+                self.assertEqual(response.content, b"")
+
+    def test_etag_changes_with_writes_and_query_string(self):
+        url = reverse("create-orders")
+        customer = Customer.objects.first()
+        etag = self.client.get(url, {"customer": customer.name})["ETag"]
+        self.assertNotEqual(self.client.get(url)["ETag"], etag)
+
+        customer.contact_number = "1111111111"
+        customer.save()
+        response = self.client.get(
+            url, {"customer": customer.name}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_etag_is_the_same_in_every_process(self):
+        url = reverse("create-customers")
+        etag = self.client.get(url)["ETag"]
+        # Another worker process, with a cache of its own.
+        other = dict(
+            settings.CACHES,
+            responses={
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "other worker",
+            },
+        )
+        with override_settings(CACHES=other):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_cached_responses_carry_the_etag(self):
+        url = reverse("create-products")
+        first = self.client.get(url)
+        second = self.client.get(url, HTTP_IF_NONE_MATCH='"stale", ' + first["ETag"])
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(self.client.get(url)["ETag"], first["ETag"])
+
+
+class SchemaTests(SimpleTestCase):
+    def setUp(self):
+        get_schema.cache_clear()
+        self.addCleanup(get_schema.cache_clear)
+
+    def test_stored_schema_is_up_to_date(self):
+        self.assertEqual(check_schema(None), [])
+
+    def test_schema_is_served_without_generating_it(self):
+        with mock.patch("app.schema.generate_schema", side_effect=AssertionError):
+            response = self.client.get(reverse("openapi-schema"))
+            self.assertEqual(response.content, read_schema())
+            self.assertEqual(response["Content-Type"], "application/json")
+            response = self.client.get(
+                reverse("openapi-schema"), HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+            self.assertEqual(response.status_code, 304)
+
+    def test_docs_load_the_stored_schema(self):
+        response = self.client.get(reverse("schema-swagger-ui"))
+        self.assertContains(response, reverse("openapi-schema"))
+
+    def test_drift_is_flagged_and_regenerated(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "openapi.json")
+            with open(path, "w") as file:
+                file.write("{}")
+            with override_settings(OPENAPI_SCHEMA_PATH=path):
+                self.assertEqual(
+                    [error.id for error in check_schema(None)], ["app.W001"]
+                )
+                with self.assertRaises(SystemExit):
+                    call_command("generate_schema", "--check", stderr=io.StringIO())
+                call_command("generate_schema", stdout=io.StringIO())
+                self.assertEqual(check_schema(None), [])
+
+
+class ApiDocsModeTests(SimpleTestCase):
+    script = (
+        "import sys, django; django.setup(); import e_commerce.urls; "
+        "from django.urls import reverse, NoReverseMatch\n"
+        "try: reverse('schema-swagger-ui'); docs = True\n"
+        "except NoReverseMatch: docs = False\n"
+        "print('drf_yasg' in sys.modules, docs)"
+    )
+
+    def start(self, mode):
+        return subprocess.run(
+            [sys.executable, "-c", self.script],
+            env=dict(
+                os.environ, API_DOCS=mode, DJANGO_SETTINGS_MODULE="e_commerce.settings"
+            ),
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.split()
+
+    def test_docs_load_according_to_the_mode(self):
+        self.assertEqual(self.start("eager"), ["True", "True"])
+        self.assertEqual(self.start("lazy"), ["False", "True"])
+        self.assertEqual(self.start("off"), ["False", "False"])
+
+
+class OrderExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(customers=3, products=5, orders=7)
+
+    def export(self, **params):
+        response = self.client.get(reverse("export-orders"), params)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content).decode()
+
+    def expected(self, orders=None):
+        orders = orders or Order.objects.all()
+        return OrderSerializer(
+            orders.order_by("id").prefetch_related(
+                Prefetch("order_items", queryset=Order_item.objects.order_by("id"))
+            ),
+            many=True,
+        ).data
+
+    def test_ndjson_streams_one_order_per_line(self):
+        with mock.patch.object(OrdersExportAPI, "chunk_size", 3):
+            response, content = self.export()
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(rows, json.loads(json.dumps(self.expected())))
+
+    def test_json_array(self):
+        with mock.patch.object(OrdersExportAPI, "chunk_size", 3):
+            response, content = self.export(output="json")
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(json.loads(content), json.loads(json.dumps(self.expected())))
+
+    def test_empty_export_is_a_valid_document(self):
+        _, content = self.export(output="json", customer="nobody")
+        self.assertEqual(json.loads(content), [])
+        _, content = self.export(customer="nobody")
+        self.assertEqual(content, "")
+
+    def test_filters_match_the_order_list(self):
+        customer = Order.objects.first().customer
+        _, content = self.export(output="json", customer=customer.name)
+        self.assertEqual(
+            json.loads(content),
+            json.loads(json.dumps(self.expected(customer.order_set.all()))),
+        )
+
+    def test_items_are_prefetched_per_chunk(self):
+        with mock.patch.object(OrdersExportAPI, "chunk_size", 3):
+            with CaptureQueriesContext(connection) as queries:
+                self.export()
+        # One query for the orders, one items query per chunk.
+        self.assertEqual(len(queries), 1 + math.ceil(7 / 3))
+
+    def test_unknown_output_is_rejected(self):
+        body = self.client.get(reverse("export-orders"), {"output": "xml"}).json()
+        self.assertEqual(body["code"], 400)
+
+
+class FastReadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(customers=5, products=8, orders=12)
+        Product.objects.create(name="round", weight=3)
+        Product.objects.create(name="tiny", weight="0.5")
+
+    def assertSameBytes(self, view, url, params=None):
+        responses = []
+        for fast_read in (False, True):
+            get_cache().clear()
+            with mock.patch.object(view, "fast_read", fast_read):
+                responses.append(self.client.get(url, params or {}))
+        self.assertEqual(responses[0].json()["code"], 200)
+        self.assertEqual(responses[0].content, responses[1].content)
+
+    def test_output_matches_model_serializers(self):
+        self.assertSameBytes(CustomersAPI, reverse("create-customers"))
+        self.assertSameBytes(ProductsAPI, reverse("create-products"))
+        self.assertSameBytes(OrdersAPI, reverse("create-orders"))
+        self.assertSameBytes(OrdersAPI, reverse("create-orders"), {"limit": 5})
+        customer = Order.objects.first().customer.name
+        self.assertSameBytes(
+            OrdersAPI, reverse("create-orders"), {"customer": customer}
+        )
+
+    def test_order_page_takes_two_queries(self):
+        # Besides the versions query of the response cache.
+        with self.assertNumQueries(3):
+            self.client.get(reverse("create-orders"))
+
+
+class FieldsetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(customers=3, products=4, orders=6)
+
+    def get(self, url_name, params):
+        with CaptureQueriesContext(connection) as queries:
+            body = self.client.get(reverse(url_name), params).json()
+        # Leave out the versions query of the response cache.
+        return body, [
+            query["sql"] for query in queries if "app_sequence" not in query["sql"]
+        ]
+
+    def test_fields_narrow_output_and_select(self):
+        body, queries = self.get(
+            "create-orders", {"fields": "id,order_number,order_date"}
+        )
+        self.assertEqual(body["code"], 200)
+        self.assertEqual(set(body["data"][0]), {"id", "order_number", "order_date"})
+        # No items query, no address column.
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("address", queries[0])
+
+        body, queries = self.get("create-products", {"fields": "name"})
+        self.assertEqual(body["data"][0], {"name": Product.objects.first().name})
+        self.assertNotIn("weight", queries[0])
+
+        body = self.client.get(reverse("async-products"), {"fields": "weight"}).json()
+        self.assertEqual(set(body["data"][0]), {"weight"})
+
+    def test_expand_embeds_related_objects_with_joins(self):
+        body, queries = self.get(
+            "create-orders", {"expand": "customer,order_items.product", "limit": 2}
+        )
+        self.assertEqual(len(queries), 2)
+        self.assertIn("JOIN", queries[0])
+        self.assertIn("JOIN", queries[1])
+
+        order = Order.objects.get(id=body["data"][0]["id"])
+        self.assertEqual(
+            body["data"][0]["customer"],
+            CustomerSerializer(order.customer).data,
+        )
+        item = order.order_items.order_by("id").first()
+        self.assertEqual(
+            body["data"][0]["order_items"][0],
+            {
+                "product": ProductSerializer(item.product).data,
+                "quantity": item.quantity,
+            },
+        )
+
+    def test_plain_reads_do_not_join(self):
+        _, queries = self.get("create-orders", {})
+        self.assertNotIn("JOIN", queries[0])
+        self.assertNotIn("JOIN", queries[1])
+
+    def test_expand_only_applies_to_requested_fields(self):
+        body, queries = self.get(
+            "create-orders", {"fields": "id,customer", "expand": "customer"}
+        )
+        self.assertEqual(set(body["data"][0]), {"id", "customer"})
+        self.assertEqual(
+            set(body["data"][0]["customer"]), {"id", "name", "contact_number", "email"}
+        )
+        self.assertEqual(len(queries), 1)
+
+    def test_unknown_names_are_rejected(self):
+        body, _ = self.get("create-orders", {"fields": "id,secret", "expand": "x"})
+        self.assertEqual(body["code"], 400)
+        self.assertEqual(set(body["data"]), {"fields", "expand"})
+        body, _ = self.get("create-customers", {"expand": "orders"})
+        self.assertEqual(body["code"], 400)
+
+
+class CompressionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(customers=5, products=10, orders=40)
+
+    def test_accept_encoding_negotiation(self):
+        self.assertEqual(get_encoding("gzip, deflate, br"), "gzip")
+        self.assertEqual(get_encoding("deflate"), "deflate")
+        self.assertEqual(get_encoding("gzip;q=0.5, deflate"), "deflate")
+        self.assertEqual(get_encoding("*;q=0.1, gzip;q=0"), "deflate")
+        self.assertIsNone(get_encoding("br"))
+        self.assertIsNone(get_encoding(""))
+        self.assertIsNone(get_encoding("identity, *;q=0"))
+
+    def test_large_responses_are_compressed(self):
+        url = reverse("create-orders")
+        plain = self.client.get(url)
+        self.assertNotIn("Content-Encoding", plain)
+        self.assertIn("Accept-Encoding", plain["Vary"])
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertEqual(response["Content-Length"], str(len(response.content)))
+        self.assertEqual(response["ETag"], "W/" + plain["ETag"])
+
+        response = self.client.get(
+            url, HTTP_ACCEPT_ENCODING="deflate", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="deflate")
+        self.assertEqual(response["Content-Encoding"], "deflate")
+        self.assertEqual(zlib.decompress(response.content), plain.content)
+
+    def test_small_responses_are_sent_as_they_are(self):
+        response = self.client.get(reverse("cache-stats"), HTTP_ACCEPT_ENCODING="gzip")
+        self.assertNotIn("Content-Encoding", response)
+        self.assertEqual(response.json()["code"], 200)
+
+    def test_streamed_responses_are_compressed(self):
+        url = reverse("export-orders")
+        plain = b"".join(self.client.get(url).streaming_content)
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), plain)
+
+    def test_compact_renderer_matches_drf_output(self):
+        data = {
+            "weight": Decimal("1.50"),
+            "total": Decimal("100.00"),
+            "day": date(2024, 2, 29),
+            "name": "caf\u00e9\u2028",
+        }
+        expected = {
+            "weight": "1.50",
+            "total": "100.00",
+            "day": "2024-02-29",
+            "name": "caf\u00e9\u2028",
+        }
+        self.assertEqual(
+            CompactJSONRenderer().render(data), JSONRenderer().render(expected)
+        )
+        self.assertEqual(
+            CompactJSONRenderer().render(data, "application/json; indent=2"),
+            JSONRenderer().render(expected, "application/json; indent=2"),
+        )
+
+
+class AsyncReadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(customers=5, products=8, orders=12)
+
+    def test_lists_match_sync_endpoints(self):
+        customer = Order.objects.first().customer.name
+        for sync_name, async_name, params in [
+            ("create-customers", "async-customers", {}),
+            ("create-products", "async-products", {"limit": 3}),
+            ("create-orders", "async-orders", {}),
+            ("create-orders", "async-orders", {"customer": customer}),
+        ]:
+            with self.subTest(url=async_name, params=params):
+                expected = self.client.get(reverse(sync_name), params)
+                response = self.client.get(reverse(async_name), params)
+                self.assertEqual(response["Content-Type"], "application/json")
+                self.assertEqual(response.content, expected.content)
+
+    def test_cursors_are_shared_with_sync_endpoints(self):
+        page = self.client.get(reverse("create-orders"), {"limit": 5}).json()
+        expected = self.client.get(
+            reverse("create-orders"), {"limit": 5, "cursor": page["next"]}
+        )
+        response = self.client.get(
+            reverse("async-orders"), {"limit": 5, "cursor": page["next"]}
+        )
+        self.assertEqual(response.content, expected.content)
+
+        response = self.client.get(reverse("async-orders"), {"cursor": "bad"})
+        self.assertEqual(response.json()["code"], 400)
+
+    async def test_detail_reads(self):
+        order = await Order.objects.order_by("id").alast()
+        response = await self.async_client.get(
+            reverse("async-order-detail", args=[order.id])
+        )
+        listed = await self.async_client.get(reverse("async-orders"), {"limit": 500})
+        self.assertEqual(response.json()["code"], 200)
+        self.assertEqual(response.json()["data"], listed.json()["data"][-1])
+
+        customer = await Customer.objects.afirst()
+        response = await self.async_client.get(
+            reverse("async-customer-detail", args=[customer.id])
+        )
+        self.assertEqual(response.json()["data"]["email"], customer.email)
+
+        response = await self.async_client.get(
+            reverse("async-product-detail", args=[0])
+        )
+        self.assertEqual(response.json()["code"], 404)
+
+    async def test_only_get_is_allowed(self):
+        response = await self.async_client.post(reverse("async-customers"), {})
+        self.assertEqual(response.status_code, 405)
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ann = Customer.objects.create(
+            name="Ann Smith", contact_number="1", email="ann.smith@example.com"
+        )
+        cls.anna = Customer.objects.create(
+            name="Anna Jones", contact_number="1", email="jones@example.com"
+        )
+        cls.bob = Customer.objects.create(
+            name="Bob Smithers", contact_number="1", email="bob@example.org"
+        )
+        cls.pen = Product.objects.create(name="Blue pen", weight="1.00")
+        cls.pencil = Product.objects.create(name="Pencil", weight="1.00")
+
+    def search(self, **params):
+        return self.client.get(reverse("search"), params).json()
+
+    def names(self, body):
+        return sorted(row["name"] for row in body["data"])
+
+    def test_prefix_and_token_queries(self):
+        self.assertEqual(self.names(self.search(q="ann")), ["Ann Smith", "Anna Jones"])
+        self.assertEqual(
+            self.names(self.search(q="smi")), ["Ann Smith", "Bob Smithers"]
+        )
+        self.assertEqual(self.names(self.search(q="an smi")), ["Ann Smith"])
+        self.assertEqual(self.names(self.search(q="example org")), ["Bob Smithers"])
+        self.assertEqual(
+            self.names(self.search(q="pen", type="products")), ["Blue pen", "Pencil"]
+        )
+
+    def test_index_follows_saves_and_deletes(self):
+        self.bob.name = "Robert Brown"
+        self.bob.save()
+        self.assertEqual(self.names(self.search(q="smi")), ["Ann Smith"])
+        self.assertEqual(self.names(self.search(q="rob")), ["Robert Brown"])
+        self.pencil.delete()
+        self.assertEqual(
+            self.names(self.search(q="pen", type="products")), ["Blue pen"]
+        )
+        self.assertEqual(self.search(q="zzz")["code"], 404)
+
+    def test_orders_of_matching_customers(self):
+        orders = Order.objects.bulk_create(
+            Order(
+                order_number=f"ORD{i:05d}",
+                customer=customer,
+                order_date=date.today(),
+                address="street",
+            )
+            for i, customer in enumerate([self.ann, self.bob, self.anna, self.ann])
+        )
+        body = self.search(q="ann smith", type="orders")
+        self.assertEqual(
+            [row["id"] for row in body["data"]], [orders[0].id, orders[3].id]
+        )
+
+    def test_orders_of_all_matching_customers(self):
+        customers = Customer.objects.bulk_create(
+            Customer(name=f"Smith {i}", contact_number="1", email="s@example.com")
+            for i in range(120)
+        )
+        search.index(Customer, customers)
+        orders = Order.objects.bulk_create(
+            Order(
+                order_number=f"ORD{i:05d}",
+                customer=customer,
+                order_date=date.today(),
+                address="street",
+            )
+            for i, customer in enumerate(customers)
+        )
+        ids = []
+        params = {"q": "smith", "type": "orders", "limit": 50}
+        while True:
+            body = self.search(**params)
+            ids += [row["id"] for row in body["data"]]
+            if not body["next"]:
+                break
+            params["cursor"] = body["next"]
+        self.assertEqual(ids, [order.id for order in orders])
+
+    def test_rebuild_search_index(self):
+        Customer.objects.filter(id=self.bob.id).update(name="Robert Brown")
+        self.assertEqual(self.search(q="rob")["code"], 404)
+        out = io.StringIO()
+        call_command("rebuild_search_index", stdout=out)
+        self.assertIn("Rebuilt the search index of customers.", out.getvalue())
+        self.assertEqual(self.names(self.search(q="rob")), ["Robert Brown"])
+        self.assertEqual(self.names(self.search(q="smi")), ["Ann Smith"])
+
+    def test_query_is_required(self):
+        self.assertEqual(self.search(q="  ")["code"], 400)
+        self.assertEqual(self.search(q="ann", type="invoices")["code"], 400)
+
+    def test_search_uses_the_fts_index(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.search(q="ann")
+        self.assertIn("MATCH", queries[0]["sql"])
+        self.assertEqual(len(queries), 2)
@@ -0,0 +1,49 @@
+from decimal import Decimal
+
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .cache import bump_version
+from .models import Order, Order_item
+
+
+def get_item_totals(items):
+    """Total weight and item count (sum of quantities) of ``(product, quantity)``."""
+    total_weight, item_count = Decimal(0), 0
+    for product, quantity in items:
+        total_weight += product.weight * quantity
+        item_count += quantity
+    return total_weight, item_count
+
+
+def add_totals(orders, weight, count):
+    """Shift the totals of ``orders`` (a queryset) by a delta in the database."""
+    if not weight and not count:
+        return
+    orders.update(
+        total_weight=F("total_weight") + weight, item_count=F("item_count") + count
+    )
+    bump_version(Order)
+
+
+def rebuild_totals(orders):
+    """Recompute the totals of ``orders`` (a queryset) from their items."""
+    items = Order_item.objects.filter(order=OuterRef("pk")).values("order")
+    weight_field = Order._meta.get_field("total_weight")
+    orders.update(
+        total_weight=Coalesce(
+            Subquery(
+                items.annotate(
+                    weight=Sum(
+                        F("product__weight") * F("quantity"), output_field=weight_field
+                    )
+                ).values("weight")
+            ),
+            Value(Decimal(0)),
+            output_field=weight_field,
+        ),
+        item_count=Coalesce(
+            Subquery(items.annotate(count=Sum("quantity")).values("count")), 0
+        ),
+    )
+    bump_version(Order)
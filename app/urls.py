@@ -1,10 +1,16 @@
 from django.urls import path
+from app import async_views
 from app.views import (
     CustomersAPI,
     CustomersUpdateAPI,
     ProductsAPI,
     OrdersAPI,
+    OrdersBulkAPI,
+    OrdersExportAPI,
     OrdersUpdateAPI,
+    CacheStatsAPI,
+    SearchAPI,
+    SalesAPI,
 )
 
 urlpatterns = [
@@ -14,5 +20,28 @@ urlpatterns = [
     ),
     path("api/products/", ProductsAPI.as_view(), name="create-products"),
     path("api/orders/", OrdersAPI.as_view(), name="create-orders"),
+    path("api/orders/bulk/", OrdersBulkAPI.as_view(), name="bulk-create-orders"),
+    path("api/orders/export/", OrdersExportAPI.as_view(), name="export-orders"),
     path("api/orders/<int:id>/", OrdersUpdateAPI.as_view(), name="update-orders"),
+    path("api/cache/stats/", CacheStatsAPI.as_view(), name="cache-stats"),
+    path("api/search/", SearchAPI.as_view(), name="search"),
+    path("api/analytics/sales/", SalesAPI.as_view(), name="sales-analytics"),
+    path("api/async/customers/", async_views.customers_list, name="async-customers"),
+    path(
+        "api/async/customers/<int:id>/",
+        async_views.customers_detail,
+        name="async-customer-detail",
+    ),
+    path("api/async/products/", async_views.products_list, name="async-products"),
+    path(
+        "api/async/products/<int:id>/",
+        async_views.products_detail,
+        name="async-product-detail",
+    ),
+    path("api/async/orders/", async_views.orders_list, name="async-orders"),
+    path(
+        "api/async/orders/<int:id>/",
+        async_views.orders_detail,
+        name="async-order-detail",
+    ),
 ]
@@ -1,12 +1,23 @@
+import functools
+import itertools
+import os
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.db.models import F
 from rest_framework.response import Response
 
+from .models import Sequence
+
 
-def get_response(code_status, payload, msg):
+def get_response(code_status, payload, msg, **extra):
     return Response(
         {
             "code": code_status,
             "data": payload,
             "message": msg,
+            **extra,
         }
     )
 
@@ -23,9 +34,71 @@ def get_status_msg(key):
     return status_msg.get(key)
 
 
-def Generate_Order_Number(latest_order):
-    if latest_order and latest_order.order_number:
-        order_number = int(latest_order.order_number[3:]) + 1
-    else:
-        order_number = 1
-    return f"ORD{order_number:05d}"
+class SequenceAllocator:
+    """
+    Hands out numbers from a ``Sequence`` row. Each reservation bumps the row
+    by a whole block inside a transaction, so concurrent processes never get
+    overlapping ranges; the rest of the block is served from memory without
+    touching the database. Unused numbers are lost when a process exits.
+    """
+
+    def __init__(self, name, block_size=None, using=DEFAULT_DB_ALIAS):
+        self.name = name
+        self.block_size = block_size
+        self.using = using
+        self.lock = threading.RLock()
+        self.block = iter(())
+        self.pid = os.getpid()
+
+    def reserve(self, count):
+        sequences = Sequence.objects.using(self.using).filter(name=self.name)
+        while True:
+            try:
+                with transaction.atomic(using=self.using):
+                    if not sequences.update(value=F("value") + count):
+                        Sequence.objects.using(self.using).create(
+                            name=self.name, value=count
+                        )
+                    end = sequences.values_list("value", flat=True).get()
+                    return range(end - count + 1, end + 1)
+            except IntegrityError:
+                # Another process created the row first; bump it instead.
+                continue
+
+    def keep(self, block):
+        with self.lock:
+            self.block = iter(block)
+
+    def allocate(self, count=1):
+        with self.lock:
+            if self.pid != os.getpid():
+                # Forked workers must not reuse the parent's block.
+                self.block, self.pid = iter(()), os.getpid()
+
+            numbers = list(itertools.islice(self.block, count))
+            if len(numbers) == count:
+                return numbers
+
+            block_size = self.block_size or settings.ORDER_NUMBER_BLOCK_SIZE
+            needed = count - len(numbers)
+            block = self.reserve(max(needed, block_size))
+            numbers.extend(block[:needed])
+
+            # The rest of the block is only reusable once the reservation is
+            # committed; a rolled back reservation hands the range back.
+            self.block = iter(())
+            transaction.on_commit(
+                functools.partial(self.keep, block[needed:]), using=self.using
+            )
+            return numbers
+
+
+order_number_sequence = SequenceAllocator("order_number")
+
+
+def Generate_Order_Number():
+    return Generate_Order_Numbers(1)[0]
+
+
+def Generate_Order_Numbers(count):
+    return [f"ORD{number:05d}" for number in order_number_sequence.allocate(count)]
@@ -1,60 +1,174 @@
-from django.shortcuts import render, HttpResponse
-from rest_framework.response import Response
+import itertools
+import json
+import sys
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Prefetch, Sum
+from django.http import StreamingHttpResponse
 from rest_framework.views import APIView
 from rest_framework import status
-
-from drf_yasg.utils import swagger_auto_schema
-from drf_yasg import openapi
-
-from .utils import get_response, get_status_msg, Generate_Order_Number
+from rest_framework.exceptions import ValidationError
+from rest_framework.utils import encoders
+
+from .utils import (
+    get_response,
+    get_status_msg,
+    Generate_Order_Number,
+    Generate_Order_Numbers,
+)
+from .pagination import paginate, get_page_size, InvalidCursor
+from .search import get_tokens, search_ids, search_queryset
+from .cache import cache_response, conditional_get, get_stats
+from .db import read_from_replica
 
 from .models import (
     Customer,
     Product,
     Order,
+    Order_item,
+    DailyProductSales,
+    DailyCustomerSales,
 )
 
 from .serializer import (
     CustomerSerializer,
     ProductSerializer,
     OrderSerializer,
+    OrderFilterSerializer,
+    SalesQuerySerializer,
+    SalesSerializer,
+    preload_instances,
 )
+from .fast_serializer import (
+    FastCustomerSerializer,
+    FastProductSerializer,
+    FastOrderSerializer,
+    split_names,
+)
+
+
+BULK_ORDER_LIMIT = 1000
+
+
+def prefix_range(field, prefix):
+    """
+    ``field__startswith=prefix`` as a range of the index order: SQLite runs
+    ``startswith`` as ``LIKE ... ESCAPE``, which never uses an index.
+    """
+    last = ord(prefix[-1])
+    if last == sys.maxunicode:
+        return {f"{field}__startswith": prefix}
+    return {f"{field}__gte": prefix, f"{field}__lt": prefix[:-1] + chr(last + 1)}
+
+
+def filter_orders(orders, query_params):
+    """
+    Apply the order filters of ``query_params``, all combinable, and return
+    the filtered queryset with the filters a cursor is bound to. Products
+    are matched by ``EXISTS`` subqueries, so orders never need a
+    ``DISTINCT``.
+    """
+    # Empty parameters are ignored, as if they were not sent.
+    data = {name: value for name, value in query_params.items() if value}
+    query = OrderFilterSerializer(data=data)
+    if not query.is_valid():
+        raise ValidationError(query.errors)
+    params = query.validated_data
+
+    if "customer_id" in params:
+        orders = orders.filter(customer_id=params["customer_id"])
+    if "customer" in params:
+        orders = orders.filter(customer__name=params["customer"])
+    if "start" in params:
+        orders = orders.filter(order_date__gte=params["start"])
+    if "end" in params:
+        orders = orders.filter(order_date__lte=params["end"])
+    if "address" in params:
+        orders = orders.filter(**prefix_range("address", params["address"]))
+    if "min_weight" in params:
+        orders = orders.filter(total_weight__gte=params["min_weight"])
+    if "max_weight" in params:
+        orders = orders.filter(total_weight__lte=params["max_weight"])
+
+    names = split_names(params.get("products"))
+    if names:
+        items = Order_item.objects.filter(order=OuterRef("pk"))
+        if params["products_match"] == "all":
+            for name in dict.fromkeys(names):
+                orders = orders.filter(Exists(items.filter(product__name=name)))
+        else:
+            orders = orders.filter(Exists(items.filter(product__name__in=names)))
+
+    filters = {"products": None, "customer": None}
+    filters.update((name, data[name]) for name in query.fields if name in data)
+    return orders, filters
+
+
+def invalid_filter_response(exc):
+    return get_response(
+        status.HTTP_400_BAD_REQUEST, exc.detail, get_status_msg("ERROR_400")
+    )
+
+
+def invalid_cursor_response(exc):
+    return get_response(
+        status.HTTP_400_BAD_REQUEST, {"cursor": [str(exc)]}, get_status_msg("ERROR_400")
+    )
+
 
+class FastReadAPIView(APIView):
+    # List reads are served from .values() rows through the Fast*Serializer
+    # of the view instead of the ModelSerializer; fast_read = False goes
+    # back to the ModelSerializer, which gives the same bytes.
+    fast_read = True
 
-class CustomersAPI(APIView):
+
+class CustomersAPI(FastReadAPIView):
     def get_queryset(self):
         all_customers = Customer.objects.all()
         return all_customers
 
+    @read_from_replica
+    @conditional_get(Customer)
+    @cache_response(Customer)
     def get(self, request):
         all_customers = self.get_queryset()
+        serializer_class = CustomerSerializer
+        fieldset = {}
+        if self.fast_read:
+            try:
+                fieldset = FastCustomerSerializer.get_fieldset(request.query_params)
+            except ValidationError as exc:
+                return invalid_filter_response(exc)
+            all_customers = FastCustomerSerializer.prepare(all_customers, **fieldset)
+            serializer_class = FastCustomerSerializer
+
+        try:
+            all_customers, cursors = paginate(all_customers, request.query_params)
+        except InvalidCursor as exc:
+            return invalid_cursor_response(exc)
 
         if not all_customers:
             return get_response(
                 status.HTTP_404_NOT_FOUND, [], get_status_msg("DATA_NOT_FOUND")
             )
 
-        serializer = CustomerSerializer(all_customers, many=True)
+        serializer = serializer_class(all_customers, many=True, **fieldset)
         return get_response(
-            status.HTTP_200_OK, serializer.data, get_status_msg("RETRIEVE")
+            status.HTTP_200_OK, serializer.data, get_status_msg("RETRIEVE"), **cursors
         )
 
-    @swagger_auto_schema(
-        request_body=openapi.Schema(
-            type=openapi.TYPE_OBJECT,
-            properties={
-                "name": openapi.Schema(type=openapi.TYPE_STRING),
-                "contact_number": openapi.Schema(type=openapi.TYPE_STRING),
-                "email": openapi.Schema(type=openapi.TYPE_STRING),
-            },
-        )
-    )
     def post(self, request):
         data = request.data
         serializer = CustomerSerializer(data=data)
 
         if serializer.is_valid():
-            serializer.save()
+            try:
+                serializer.save()
+            except ValidationError as exc:
+                return get_response(
+                    status.HTTP_400_BAD_REQUEST, exc.detail, get_status_msg("ERROR_400")
+                )
             return get_response(
                 status.HTTP_200_OK, serializer.data, get_status_msg("CREATED")
             )
@@ -69,16 +183,6 @@ class CustomersUpdateAPI(APIView):
         customer = Customer.objects.filter(id=id).first()
         return customer
 
-    @swagger_auto_schema(
-        request_body=openapi.Schema(
-            type=openapi.TYPE_OBJECT,
-            properties={
-                "name": openapi.Schema(type=openapi.TYPE_STRING),
-                "contact_number": openapi.Schema(type=openapi.TYPE_STRING),
-                "email": openapi.Schema(type=openapi.TYPE_STRING),
-            },
-        )
-    )
     def put(self, request, id):
         customer = self.get_queryset(id)
         if not customer:
@@ -90,7 +194,12 @@ class CustomersUpdateAPI(APIView):
 
         serializer = CustomerSerializer(customer, data=data)
         if serializer.is_valid():
-            serializer.save()
+            try:
+                serializer.save()
+            except ValidationError as exc:
+                return get_response(
+                    status.HTTP_400_BAD_REQUEST, exc.detail, get_status_msg("ERROR_400")
+                )
             return get_response(
                 status.HTTP_200_OK, serializer.data, get_status_msg("UPDATED")
             )
@@ -100,39 +209,52 @@ class CustomersUpdateAPI(APIView):
         )
 
 
-class ProductsAPI(APIView):
+class ProductsAPI(FastReadAPIView):
     def get_queryset(self):
         all_products = Product.objects.all()
         return all_products
 
+    @read_from_replica
+    @conditional_get(Product)
+    @cache_response(Product)
     def get(self, request):
         all_products = self.get_queryset()
+        serializer_class = ProductSerializer
+        fieldset = {}
+        if self.fast_read:
+            try:
+                fieldset = FastProductSerializer.get_fieldset(request.query_params)
+            except ValidationError as exc:
+                return invalid_filter_response(exc)
+            all_products = FastProductSerializer.prepare(all_products, **fieldset)
+            serializer_class = FastProductSerializer
+
+        try:
+            all_products, cursors = paginate(all_products, request.query_params)
+        except InvalidCursor as exc:
+            return invalid_cursor_response(exc)
 
         if not all_products:
             return get_response(
                 status.HTTP_404_NOT_FOUND, [], get_status_msg("DATA_NOT_FOUND")
             )
 
-        serializer = ProductSerializer(all_products, many=True)
+        serializer = serializer_class(all_products, many=True, **fieldset)
         return get_response(
-            status.HTTP_200_OK, serializer.data, get_status_msg("RETRIEVE")
+            status.HTTP_200_OK, serializer.data, get_status_msg("RETRIEVE"), **cursors
         )
 
-    @swagger_auto_schema(
-        request_body=openapi.Schema(
-            type=openapi.TYPE_OBJECT,
-            properties={
-                "name": openapi.Schema(type=openapi.TYPE_STRING),
-                "weight": openapi.Schema(type=openapi.TYPE_STRING),
-            },
-        )
-    )
     def post(self, request):
         data = request.data
         serializer = ProductSerializer(data=data)
 
         if serializer.is_valid():
-            serializer.save()
+            try:
+                serializer.save()
+            except ValidationError as exc:
+                return get_response(
+                    status.HTTP_400_BAD_REQUEST, exc.detail, get_status_msg("ERROR_400")
+                )
             return get_response(
                 status.HTTP_200_OK, serializer.data, get_status_msg("CREATED")
             )
@@ -142,86 +264,54 @@ class ProductsAPI(APIView):
         )
 
 
-class OrdersAPI(APIView):
+class OrdersAPI(FastReadAPIView):
     def get_queryset(self):
-        all_orders = Order.objects.all()
+        all_orders = Order.objects.prefetch_related(
+            Prefetch("order_items", queryset=Order_item.objects.order_by("id"))
+        )
         return all_orders
 
-    @swagger_auto_schema(
-        manual_parameters=[
-            openapi.Parameter(
-                "products",
-                openapi.IN_QUERY,
-                description="List of products separated by commas",
-                type=openapi.TYPE_STRING,
-            ),
-            openapi.Parameter(
-                "customer",
-                openapi.IN_QUERY,
-                description="Customer name",
-                type=openapi.TYPE_STRING,
-            ),
-        ],
-        responses={
-            200: openapi.Response(
-                description="List of orders", schema=OrderSerializer(many=True)
-            ),
-            404: "Not Found",
-        },
-    )
+    @read_from_replica
+    # Customer and product names are matched by the filters.
+    @conditional_get(Order, Customer, Product)
     def get(self, request):
-        products_param = request.query_params.get("products", None)
-        customer_param = request.query_params.get("customer", None)
-
-        if products_param:
-            orders = Order.objects.filter(
-                order_items__product__name__in=products_param.split(",")
-            ).distinct()
-        elif customer_param:
-            orders = Order.objects.filter(customer__name=customer_param)
-        else:
-            orders = self.get_queryset()
+        try:
+            orders, filters = filter_orders(self.get_queryset(), request.query_params)
+        except ValidationError as exc:
+            return invalid_filter_response(exc)
+
+        serializer_class = OrderSerializer
+        fieldset = {}
+        if self.fast_read:
+            try:
+                fieldset = FastOrderSerializer.get_fieldset(request.query_params)
+            except ValidationError as exc:
+                return invalid_filter_response(exc)
+            orders = FastOrderSerializer.prepare(orders, **fieldset)
+            serializer_class = FastOrderSerializer
+
+        try:
+            orders, cursors = paginate(orders, request.query_params, filters)
+        except InvalidCursor as exc:
+            return invalid_cursor_response(exc)
 
         if not orders:
             return get_response(
                 status.HTTP_404_NOT_FOUND, [], get_status_msg("DATA_NOT_FOUND")
             )
 
-        serializer = OrderSerializer(orders, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
-
-    @swagger_auto_schema(
-        request_body=openapi.Schema(
-            type=openapi.TYPE_OBJECT,
-            properties={
-                "customer": openapi.Schema(type=openapi.TYPE_INTEGER),
-                "order_date": openapi.Schema(type=openapi.TYPE_STRING, format="date"),
-                "address": openapi.Schema(type=openapi.TYPE_STRING),
-                "order_items": openapi.Schema(
-                    type=openapi.TYPE_ARRAY,
-                    items=openapi.Schema(
-                        type=openapi.TYPE_OBJECT,
-                        properties={
-                            "product": openapi.Schema(type=openapi.TYPE_INTEGER),
-                            "quantity": openapi.Schema(type=openapi.TYPE_INTEGER),
-                        },
-                    ),
-                ),
-            },
+        serializer = serializer_class(orders, many=True, **fieldset)
+        return get_response(
+            status.HTTP_200_OK, serializer.data, get_status_msg("RETRIEVE"), **cursors
         )
-    )
+
     def post(self, request, format=None):
         data = request.data
 
         serializer = OrderSerializer(data=data)
-        latest_order = self.get_queryset().order_by("-id").first()
-
-        order_number = Generate_Order_Number(latest_order)
-
-        data["order_number"] = order_number
 
         if serializer.is_valid():
-            serializer.save()
+            serializer.save(order_number=Generate_Order_Number())
             return get_response(
                 status.HTTP_200_OK, serializer.data, get_status_msg("CREATED")
             )
@@ -231,28 +321,127 @@ class OrdersAPI(APIView):
         )
 
 
-class OrdersUpdateAPI(APIView):
+class OrdersExportAPI(APIView):
+    chunk_size = 500
+    content_types = {
+        "ndjson": "application/x-ndjson",
+        "json": "application/json",
+    }
 
-    @swagger_auto_schema(
-        request_body=openapi.Schema(
-            type=openapi.TYPE_OBJECT,
-            properties={
-                "customer": openapi.Schema(type=openapi.TYPE_INTEGER),
-                "order_date": openapi.Schema(type=openapi.TYPE_STRING, format="date"),
-                "address": openapi.Schema(type=openapi.TYPE_STRING),
-                "order_items": openapi.Schema(
-                    type=openapi.TYPE_ARRAY,
-                    items=openapi.Schema(
-                        type=openapi.TYPE_OBJECT,
-                        properties={
-                            "product": openapi.Schema(type=openapi.TYPE_INTEGER),
-                            "quantity": openapi.Schema(type=openapi.TYPE_INTEGER),
-                        },
-                    ),
-                ),
-            },
+    def get_queryset(self):
+        all_orders = Order.objects.prefetch_related(
+            Prefetch("order_items", queryset=Order_item.objects.order_by("id"))
         )
-    )
+        return all_orders
+
+    def stream(self, orders, output):
+        # iterator() fetches chunk_size orders at a time and prefetches the
+        # items of each chunk, so memory does not grow with the table.
+        rows = orders.order_by("id").iterator(chunk_size=self.chunk_size)
+        first = True
+        if output == "json":
+            yield "["
+        while True:
+            chunk = list(itertools.islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            encoded = [
+                json.dumps(
+                    order,
+                    cls=encoders.JSONEncoder,
+                    ensure_ascii=False,
+                    separators=(",", ":"),
+                )
+                for order in OrderSerializer(chunk, many=True).data
+            ]
+            if output == "json":
+                yield ("" if first else ",") + ",".join(encoded)
+            else:
+                yield "".join(line + "\n" for line in encoded)
+            first = False
+        if output == "json":
+            yield "]"
+
+    def get(self, request):
+        output = request.query_params.get("output", "ndjson")
+        if output not in self.content_types:
+            return get_response(
+                status.HTTP_400_BAD_REQUEST,
+                {"output": [f"Expected one of: {', '.join(self.content_types)}."]},
+                get_status_msg("ERROR_400"),
+            )
+
+        try:
+            orders, _ = filter_orders(self.get_queryset(), request.query_params)
+        except ValidationError as exc:
+            return invalid_filter_response(exc)
+        return StreamingHttpResponse(
+            self.stream(orders, output), content_type=self.content_types[output]
+        )
+
+
+class OrdersBulkAPI(APIView):
+    def post(self, request, format=None):
+        data = request.data
+        if not isinstance(data, list) or not 0 < len(data) <= BULK_ORDER_LIMIT:
+            return get_response(
+                status.HTTP_400_BAD_REQUEST,
+                {
+                    "non_field_errors": [
+                        f"Expected a list of 1 to {BULK_ORDER_LIMIT} orders."
+                    ]
+                },
+                get_status_msg("ERROR_400"),
+            )
+
+        # Resolve the customers and products of every order up front so that
+        # validating N orders costs two queries instead of one per reference.
+        context = {}
+        OrderSerializer.preload(context, data)
+        preload_instances(
+            context,
+            Customer.objects.all(),
+            [
+                order_data.get("customer")
+                for order_data in data
+                if isinstance(order_data, dict)
+            ],
+        )
+
+        results = []
+        valid_orders = []
+        for index, order_data in enumerate(data):
+            serializer = OrderSerializer(data=order_data, context=context)
+            if serializer.is_valid():
+                valid_orders.append(serializer.validated_data)
+                results.append({"index": index, "status": "created"})
+            else:
+                results.append(
+                    {"index": index, "status": "error", "errors": serializer.errors}
+                )
+
+        if not valid_orders:
+            return get_response(
+                status.HTTP_400_BAD_REQUEST, results, get_status_msg("ERROR_400")
+            )
+
+        order_numbers = Generate_Order_Numbers(len(valid_orders))
+        for validated_data, order_number in zip(valid_orders, order_numbers):
+            validated_data["order_number"] = order_number
+
+        with transaction.atomic():
+            orders = OrderSerializer(many=True).create(valid_orders)
+
+        created = iter(orders)
+        for result in results:
+            if result["status"] == "created":
+                order = next(created)
+                result.update(id=order.id, order_number=order.order_number)
+
+        return get_response(status.HTTP_200_OK, results, get_status_msg("CREATED"))
+
+
+class OrdersUpdateAPI(APIView):
     def put(self, request, id, format=None):
         try:
             order = Order.objects.get(id=id)
@@ -264,8 +453,6 @@ class OrdersUpdateAPI(APIView):
         data = request.data
         serializer = OrderSerializer(instance=order, data=data)
 
-        data["order_number"] = order.order_number
-
         if serializer.is_valid():
             serializer.save()
             return get_response(
@@ -275,3 +462,108 @@ class OrdersUpdateAPI(APIView):
         return get_response(
             status.HTTP_400_BAD_REQUEST, serializer.errors, get_status_msg("ERROR_400")
         )
+
+
+class CacheStatsAPI(APIView):
+    def get(self, request):
+        return get_response(status.HTTP_200_OK, get_stats(), get_status_msg("RETRIEVE"))
+
+
+class SearchAPI(APIView):
+    search_types = {
+        "customers": (Customer, FastCustomerSerializer),
+        "products": (Product, FastProductSerializer),
+    }
+
+    def get(self, request):
+        query = request.query_params.get("q", "")
+        search_type = request.query_params.get("type", "customers")
+        errors = {}
+        if not get_tokens(query):
+            errors["q"] = ["This field is required."]
+        if search_type not in [*self.search_types, "orders"]:
+            errors["type"] = ["Expected one of: customers, products, orders."]
+        if errors:
+            return get_response(
+                status.HTTP_400_BAD_REQUEST, errors, get_status_msg("ERROR_400")
+            )
+
+        cursors = {}
+        if search_type == "orders":
+            # The orders of every matching customer, paginated by the cursor.
+            orders = FastOrderSerializer.prepare(
+                Order.objects.filter(
+                    customer__in=search_queryset(Customer, query).values("id")
+                )
+            )
+            filters = {"q": query, "type": search_type}
+            try:
+                orders, cursors = paginate(orders, request.query_params, filters)
+            except InvalidCursor as exc:
+                return invalid_cursor_response(exc)
+            data = FastOrderSerializer(orders, many=True).data
+        else:
+            model, serializer_class = self.search_types[search_type]
+            ids = search_ids(model, query, get_page_size(request.query_params))
+            rows = serializer_class.prepare(model.objects.filter(id__in=ids))
+            rows = {row["id"]: row for row in rows}
+            # Keep the relevance order of the search index.
+            data = serializer_class(
+                [rows[pk] for pk in ids if pk in rows], many=True
+            ).data
+
+        if not data:
+            return get_response(
+                status.HTTP_404_NOT_FOUND, [], get_status_msg("DATA_NOT_FOUND")
+            )
+
+        return get_response(
+            status.HTTP_200_OK, data, get_status_msg("RETRIEVE"), **cursors
+        )
+
+
+class SalesAPI(APIView):
+    # Reads the daily rollups only, never Order_item.
+    rollups = {
+        "products": (DailyProductSales, "product"),
+        "customers": (DailyCustomerSales, "customer"),
+    }
+
+    @cache_response(DailyProductSales, DailyCustomerSales)
+    def get(self, request):
+        query = SalesQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return get_response(
+                status.HTTP_400_BAD_REQUEST, query.errors, get_status_msg("ERROR_400")
+            )
+
+        model, key = self.rollups[query.validated_data["by"]]
+        sales = model.objects.all()
+        if "start" in query.validated_data:
+            sales = sales.filter(day__gte=query.validated_data["start"])
+        if "end" in query.validated_data:
+            sales = sales.filter(day__lte=query.validated_data["end"])
+
+        if "id" in query.validated_data:
+            # Daily series of one product or customer.
+            sales = (
+                sales.filter(**{key: query.validated_data["id"]})
+                .order_by("day")
+                .values("day", "quantity", "weight")
+            )
+        else:
+            # Top products or customers over the range.
+            sales = (
+                sales.values(key)
+                .annotate(quantity=Sum("quantity"), weight=Sum("weight"))
+                .order_by("-quantity", key)[: get_page_size(request.query_params)]
+            )
+
+        serializer = SalesSerializer(sales, many=True)
+        if not serializer.data:
+            return get_response(
+                status.HTTP_404_NOT_FOUND, [], get_status_msg("DATA_NOT_FOUND")
+            )
+        return get_response(
+            status.HTTP_200_OK, serializer.data, get_status_msg("RETRIEVE")
+        )
@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 
+import importlib.util
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -40,10 +42,12 @@ INSTALLED_APPS = [
     'rest_framework',
 
     'app',
-    'drf_yasg',
 ]
 
 MIDDLEWARE = [
+    'app.metrics.MetricsMiddleware',
+    'app.compression.CompressionMiddleware',
+    'app.db.ReplicaPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -80,10 +84,82 @@ WSGI_APPLICATION = 'e_commerce.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('DATABASE_PATH', BASE_DIR / 'db.sqlite3'),
     }
 }
 
+# DB_PROFILE=production keeps connections open between requests (with a
+# health check before reuse) and tunes SQLite: WAL lets readers and the
+# writer work concurrently, synchronous=NORMAL is durable in WAL mode except
+# for the last transactions on power loss. SQLITE_PRAGMAS are applied to
+# every new connection by app.db.
+
+DB_PROFILE = os.environ.get('DB_PROFILE', 'default')
+
+SQLITE_PRAGMAS = {}
+
+if DB_PROFILE == 'production':
+    DATABASES['default'].update(
+        CONN_MAX_AGE=int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+        CONN_HEALTH_CHECKS=True,
+    )
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'wal',
+        'synchronous': 'normal',
+        'busy_timeout': 5000,
+        'cache_size': -64000,
+        'mmap_size': 268435456,
+        'temp_store': 'memory',
+    }
+
+# Read replicas: DATABASE_REPLICA_PATHS is a comma separated list of SQLite
+# files kept in sync with the primary (locally: manage.py sync_replicas).
+# List reads of customers, products and orders go to a random replica;
+# clients that just wrote read from the primary for REPLICA_PIN_SECONDS.
+
+DATABASE_REPLICAS = []
+
+for number, path in enumerate(
+    filter(None, os.environ.get('DATABASE_REPLICA_PATHS', '').split(',')), 1
+):
+    DATABASES[f'replica_{number}'] = dict(
+        DATABASES['default'], NAME=path, TEST={'MIRROR': 'default'}
+    )
+    DATABASE_REPLICAS.append(f'replica_{number}')
+
+DATABASE_ROUTERS = ['app.db.ReplicaRouter']
+
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 10))
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+#
+# Rendered list responses are cached in the "responses" cache under the
+# model versions, which are kept in the database (app.cache), so a write in
+# any worker process invalidates the entries of all of them. The local memory
+# backend keeps a copy per process; use RESPONSE_CACHE=file to share entries
+# between the worker processes of one host.
+
+RESPONSE_CACHE = os.environ.get('RESPONSE_CACHE', 'locmem')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache' / 'responses',
+        'TIMEOUT': 300,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    } if RESPONSE_CACHE == 'file' else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'responses',
+        'TIMEOUT': 300,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -125,3 +201,55 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/4.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Order numbers are reserved from the database in blocks of this size per
+# worker process, so most orders are numbered without an extra query.
+
+ORDER_NUMBER_BLOCK_SIZE = 50
+
+# Requests slower than this many seconds are logged to app.slow_requests
+# with their SQL. Off unless SLOW_REQUEST_SECONDS is set.
+
+SLOW_REQUEST_SECONDS = (
+    float(os.environ['SLOW_REQUEST_SECONDS'])
+    if os.environ.get('SLOW_REQUEST_SECONDS')
+    else None
+)
+
+# OpenAPI schema generated by manage.py generate_schema and served from
+# /openapi.json; the swagger and redoc pages load it from there.
+#
+# API_DOCS=lazy (default) imports drf_yasg and builds the view documentation
+# on the first docs request; drf_yasg is not an installed app then, only its
+# templates and static files are used. API_DOCS=eager loads everything at
+# startup, API_DOCS=off removes the docs routes.
+
+API_DOCS = os.environ.get('API_DOCS', 'lazy')
+
+if API_DOCS == 'eager':
+    INSTALLED_APPS.append('drf_yasg')
+elif API_DOCS == 'lazy':
+    DRF_YASG_DIR = Path(importlib.util.find_spec('drf_yasg').origin).parent
+    TEMPLATES[0]['DIRS'].append(DRF_YASG_DIR / 'templates')
+    STATICFILES_DIRS = [DRF_YASG_DIR / 'static']
+
+OPENAPI_SCHEMA_PATH = BASE_DIR / 'openapi.json'
+
+SWAGGER_SETTINGS = {'SPEC_URL': 'openapi-schema'}
+
+REDOC_SETTINGS = {'SPEC_URL': 'openapi-schema'}
+
+# JSON, NDJSON and text responses are gzip or deflate compressed for clients
+# that accept it, when the body has at least COMPRESSION_MIN_BYTES (streamed
+# bodies always). COMPRESSION_LEVEL is the zlib level, 1 (fast) to 9.
+
+COMPRESSION_MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', 1024))
+
+COMPRESSION_LEVEL = int(os.environ.get('COMPRESSION_LEVEL', 6))
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'app.renderers.CompactJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}